@@ -1,12 +1,11 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-import json
 import os
 
-import aiohttp
 import requests
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_animation")
 logflag = os.getenv("LOGFLAG", False)
@@ -19,6 +18,7 @@ class OpeaAnimation(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.ANIMATION.name.lower(), description, config)
         self.base_url = os.getenv("WAV2LIP_ENDPOINT", "http://localhost:7860")
+        self.client = get_http_client(self.base_url, trust_env=False)
         health_status = self.check_health()
         if not health_status:
             logger.error("OpeaAnimation health check failed.")
@@ -31,11 +31,8 @@ class OpeaAnimation(OpeaComponent):
         """
         inputs = {"audio": input}
 
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(url=f"{self.base_url}/v1/wav2lip", data=json.dumps(inputs), proxy=None)
-            json_data = await response.json()
-            outfile = json_data["wav2lip_result"]
-        return outfile
+        response = await self.client.post("/v1/wav2lip", json=inputs)
+        return response.json()["wav2lip_result"]
 
     def check_health(self) -> bool:
         """Checks the health of the animation service.
@@ -1,14 +1,15 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import os
 from typing import List
 
+import aiohttp
 import requests
 from fastapi import File, Form, UploadFile
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
+from comps.cores.common.http_client import get_http_client
 from comps.cores.proto.api_protocol import AudioTranscriptionResponse
 
 logger = CustomLogger("opea_whisper")
@@ -26,6 +27,7 @@ class OpeaWhisperAsr(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.ASR.name.lower(), description, config)
         self.base_url = os.getenv("ASR_ENDPOINT", "http://localhost:7066")
+        self.client = get_http_client(self.base_url)
         health_status = self.check_health()
         if not health_status:
             logger.error("OpeaWhisperAsr health check failed.")
@@ -44,10 +46,9 @@ class OpeaWhisperAsr(OpeaComponent):
         # Read the uploaded file
         file_contents = await file.read()
 
-        # Prepare the files and data
-        files = {
-            "file": (file.filename, file_contents, file.content_type),
-        }
+        # Prepare the form with the file and data
+        form = aiohttp.FormData()
+        form.add_field("file", file_contents, filename=file.filename, content_type=file.content_type)
         data = {
             "model": model,
             "language": language,
@@ -57,10 +58,13 @@ class OpeaWhisperAsr(OpeaComponent):
             "timestamp_granularities": timestamp_granularities,
         }
 
-        # Send the file and model to the server
-        response = await asyncio.to_thread(
-            requests.post, f"{self.base_url}/v1/audio/transcriptions", files=files, data=data
-        )
+        for key, value in data.items():
+            if value is not None:
+                for item in value if isinstance(value, list) else [value]:
+                    form.add_field(key, str(item))
+
+        # Send the file and model to the server, a form can only be sent once
+        response = await self.client.post("/v1/audio/transcriptions", data=form, retry=False)
         res = response.json()["text"]
         return AudioTranscriptionResponse(text=res)
 
@@ -80,3 +84,7 @@ class OpeaWhisperAsr(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
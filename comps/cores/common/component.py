@@ -1,12 +1,21 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
+import importlib
+import os
+import weakref
 from abc import ABC, abstractmethod
 
 from ..mega.logger import CustomLogger
 
 logger = CustomLogger("OpeaComponent")
 
+# max seconds a health check of a component may take
+HEALTH_CHECK_TIMEOUT = float(os.getenv("COMPONENT_HEALTH_CHECK_TIMEOUT", 10))
+# seconds between the health checks of a component until it is ready
+HEALTH_CHECK_INTERVAL = float(os.getenv("COMPONENT_HEALTH_CHECK_INTERVAL", 5))
+
 
 class OpeaComponent(ABC):
     """The OpeaComponent class serves as the base class for all components in the GenAIComps.
@@ -64,6 +73,17 @@ class OpeaComponent(ABC):
         """
         raise NotImplementedError("The 'check_health' method must be implemented by subclasses.")
 
+    async def check_health_async(self) -> bool:
+        """Checks the health of the component without blocking the event loop.
+
+        Runs `check_health` in a worker thread by default, components querying a service override it with an
+        async request, e.g. with the health check of their shared HTTP client.
+
+        Returns:
+            bool: True if the component is healthy, False otherwise.
+        """
+        return await asyncio.to_thread(self.check_health)
+
     @abstractmethod
     async def invoke(self, *args, **kwargs):
         """Invoke service accessing using the component.
@@ -90,9 +110,12 @@ class OpeaComponentRegistry:
     """Registry class to manage component instances.
 
     This registry allows storing, retrieving, and managing component instances by their names.
+    Components can also be registered lazily by their import path, so that a microservice only imports the
+    integration it uses, along with its dependencies.
     """
 
     _registry = {}
+    _lazy_registry = {}  # name => "module:Class", imported on first retrieval
 
     @classmethod
     def register(cls, name):
@@ -106,10 +129,21 @@ class OpeaComponentRegistry:
             if name in cls._registry:
                 raise ValueError(f"A component with the name '{name}' is already registered.")
             cls._registry[name] = component_class
+            cls._lazy_registry.pop(name, None)
             return component_class
 
         return decorator
 
+    @classmethod
+    def register_lazy(cls, components: dict):
+        """Register component classes by their import path, imported when they are first retrieved.
+
+        :param components: The "module:Class" paths of the component classes, by name
+        """
+        for name, path in components.items():
+            if name not in cls._registry:
+                cls._lazy_registry[name] = path
+
     @classmethod
     def get(cls, name):
         """Retrieve a component class by its name.
@@ -117,6 +151,12 @@ class OpeaComponentRegistry:
         :param name: The name of the component class to retrieve
         :return: The component class
         """
+        if name not in cls._registry and name in cls._lazy_registry:
+            module_name, class_name = cls._lazy_registry[name].split(":")
+            # importing the module usually registers the class already
+            component_class = getattr(importlib.import_module(module_name), class_name)
+            cls._registry.setdefault(name, component_class)
+            cls._lazy_registry.pop(name, None)
         if name not in cls._registry:
             raise KeyError(f"No component found with the name '{name}'.")
         return cls._registry[name]
@@ -129,14 +169,20 @@ class OpeaComponentRegistry:
         """
         if name in cls._registry:
             del cls._registry[name]
+        cls._lazy_registry.pop(name, None)
 
 
 class OpeaComponentLoader:
     """Loader class to dynamically load and invoke components.
 
     This loader retrieves components from the registry and invokes their functionality.
+    It also tracks the readiness of the component: once the service is started, the health of the component
+    is checked in the background, with a timeout, until it succeeds. The readiness of all the loaders of the
+    process is reported by the /v1/ready endpoint of the microservices.
     """
 
+    _loaders = weakref.WeakSet()
+
     def __init__(self, component_name, **kwargs):
         """Initialize the loader with a component retrieved from the registry and instantiate it.
 
@@ -144,12 +190,58 @@ class OpeaComponentLoader:
         :param kwargs: Additional parameters for the component's initialization
         """
         kwargs["name"] = component_name
+        self.component_name = component_name
+        self.ready = False
+        self._readiness_task = None
 
         # Retrieve the component class from the registry
         component_class = OpeaComponentRegistry.get(component_name)
 
         # Instantiate the component with the given arguments
         self.component = component_class(**kwargs)
+        OpeaComponentLoader._loaders.add(self)
+
+    async def check_readiness(self, timeout: float = HEALTH_CHECK_TIMEOUT) -> bool:
+        """Check the health of the component, updating its readiness.
+
+        :param timeout: Max seconds the check may take, it fails past it
+        :return: Whether the component is ready
+        """
+        try:
+            self.ready = bool(await asyncio.wait_for(self.component.check_health_async(), timeout))
+        except asyncio.TimeoutError:
+            logger.error(f"Health check of {self.component_name} timed out after {timeout}s.")
+            self.ready = False
+        except Exception as e:
+            logger.error(f"Health check of {self.component_name} failed: {e}")
+            self.ready = False
+        return self.ready
+
+    async def wait_until_ready(self, interval: float = HEALTH_CHECK_INTERVAL):
+        """Check the health of the component every `interval` seconds until it succeeds."""
+        while not await self.check_readiness():
+            logger.warning(f"{self.component_name} is not ready, retrying in {interval}s.")
+            await asyncio.sleep(interval)
+        logger.info(f"{self.component_name} is ready.")
+
+    @classmethod
+    def start_readiness_checks(cls):
+        """Check the readiness of the loaded components concurrently in the background of the running loop."""
+        for loader in list(cls._loaders):
+            if not loader.ready and loader._readiness_task is None:
+                loader._readiness_task = asyncio.get_running_loop().create_task(loader.wait_until_ready())
+
+    @classmethod
+    def stop_readiness_checks(cls):
+        for loader in list(cls._loaders):
+            if loader._readiness_task is not None:
+                loader._readiness_task.cancel()
+                loader._readiness_task = None
+
+    @classmethod
+    def readiness(cls) -> dict:
+        """Get the readiness of the loaded components, by name."""
+        return {loader.component_name: loader.ready for loader in list(cls._loaders)}
 
     async def invoke(self, *args, **kwargs):
         """Invoke the loaded component's execute method.
@@ -0,0 +1,244 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import aiohttp
+from prometheus_client import Counter, Histogram
+
+from ..mega.fast_json import loads
+from ..mega.logger import CustomLogger
+
+logger = CustomLogger("comps-core-http-client")
+
+# max connections kept open to an upstream service
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100))
+# seconds an idle connection is kept alive
+HTTP_CLIENT_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_CLIENT_KEEPALIVE_TIMEOUT", 60))
+# total and connection timeouts in seconds of a request
+HTTP_CLIENT_TIMEOUT = float(os.getenv("HTTP_CLIENT_TIMEOUT", 600))
+HTTP_CLIENT_CONNECT_TIMEOUT = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", 10))
+# retries of a request failing to connect or answered by 502, 503 or 504, after a random delay up to
+# backoff * 2 ** attempt seconds (exponential backoff with full jitter)
+HTTP_CLIENT_RETRIES = int(os.getenv("HTTP_CLIENT_RETRIES", 2))
+HTTP_CLIENT_BACKOFF = float(os.getenv("HTTP_CLIENT_BACKOFF", 0.1))
+RETRY_STATUSES = (502, 503, 504)
+# methods retried by default, the requests of the others may have been processed before failing
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class HTTPResponse:
+    """Response of an upstream service, read entirely."""
+
+    def __init__(self, response: aiohttp.ClientResponse, content: bytes):
+        self.status = response.status
+        self.headers = response.headers
+        self.content = content
+        self._response = response
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self._response.get_encoding())
+
+    def json(self):
+        return loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise aiohttp.ClientResponseError(
+                self._response.request_info,
+                self._response.history,
+                status=self.status,
+                message=self.text,
+                headers=self.headers,
+            )
+
+
+class AsyncHTTPClient:
+    """Keep-alive HTTP client of an upstream service, pooling its connections.
+
+    The aiohttp session is created on first use in the running event loop, and again if the loop changes.
+    Idempotent requests failing to connect or answered by a transient error status are retried with exponential
+    backoff and jitter, the others only when asked for. Timeouts and dropped connections are never retried.
+    The latency and status of the requests are exported by upstream.
+    """
+
+    _metrics = None
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = None,
+        timeout: float = None,
+        connect_timeout: float = None,
+        retries: int = None,
+        backoff: float = None,
+        trust_env: bool = True,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections or HTTP_CLIENT_MAX_CONNECTIONS
+        self.timeout = timeout or HTTP_CLIENT_TIMEOUT
+        self.connect_timeout = connect_timeout or HTTP_CLIENT_CONNECT_TIMEOUT
+        self.retries = HTTP_CLIENT_RETRIES if retries is None else retries
+        self.backoff = HTTP_CLIENT_BACKOFF if backoff is None else backoff
+        # use the proxies of the env
+        self.trust_env = trust_env
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+
+    @classmethod
+    def _get_metrics(cls):
+        with cls._lock:
+            # shared by every client of the process
+            if cls._metrics is None:
+                cls._metrics = (
+                    Histogram(
+                        "component_upstream_request_latency",
+                        "Latency in seconds of the requests to an upstream service (histogram)",
+                        ["upstream"],
+                    ),
+                    Counter(
+                        "component_upstream_requests",
+                        "Requests to an upstream service, by response status or error",
+                        ["upstream", "status"],
+                    ),
+                )
+        return cls._metrics
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None:
+                self._close_stale_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections, keepalive_timeout=HTTP_CLIENT_KEEPALIVE_TIMEOUT
+            )
+            timeout = aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, trust_env=self.trust_env)
+            self._loop = loop
+        return self._session
+
+    def _close_stale_session(self):
+        """Close the session of the previous event loop, it cannot be awaited from the running one."""
+        if self._session.closed:
+            return
+        if self._loop.is_running():
+            # the loop runs in another thread
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop)
+        else:
+            # the connections are gone with the loop
+            self._session.detach()
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}" if path.startswith("/") or not path else f"{self.base_url}/{path}"
+
+    async def stream(
+        self, method: str, path: str = "", retry: Optional[bool] = None, **kwargs
+    ) -> aiohttp.ClientResponse:
+        """Send a request and get its response as soon as the headers are received, to read its body as a stream.
+
+        The caller must release the response once read.
+
+        :param method: The HTTP method
+        :param path: The path of the request, relative to the base URL
+        :param retry: Whether to retry the request on failure, by default only for the idempotent methods. Only safe
+            for a request that can be processed twice, with a body that can be sent again
+        :param kwargs: The arguments of aiohttp.ClientSession.request
+        """
+        histogram, counter = self._get_metrics()
+        url = self.url(path)
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if retry else 1
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except aiohttp.ClientConnectorError as e:
+                # the request was not sent
+                counter.labels(self.base_url, "error").inc()
+                if attempt == attempts - 1:
+                    raise
+                logger.warning(f"Request to {url} failed: {e!r}, retrying")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                counter.labels(self.base_url, "error").inc()
+                raise
+            else:
+                histogram.labels(self.base_url).observe(time.perf_counter() - start)
+                counter.labels(self.base_url, str(response.status)).inc()
+                if response.status not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+                response.release()
+                logger.warning(f"Request to {url} answered {response.status}, retrying")
+            await asyncio.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+    async def request(self, method: str, path: str = "", retry: Optional[bool] = None, **kwargs) -> HTTPResponse:
+        """Send a request and read its response.
+
+        :param method: The HTTP method
+        :param path: The path of the request, relative to the base URL
+        :param retry: Whether to retry the request on failure, by default only for the idempotent methods. Only safe
+            for a request that can be processed twice, with a body that can be sent again
+        :param kwargs: The arguments of aiohttp.ClientSession.request
+        """
+        response = await self.stream(method, path, retry, **kwargs)
+        try:
+            return HTTPResponse(response, await response.read())
+        finally:
+            response.release()
+
+    async def get(self, path: str = "", **kwargs) -> HTTPResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str = "", **kwargs) -> HTTPResponse:
+        return await self.request("POST", path, **kwargs)
+
+    async def check_health(self, path: str = "/health", timeout: float = None) -> bool:
+        """Check that a GET of the health endpoint of the service answers with status 200, within the connection
+        timeout by default."""
+        try:
+            timeout = aiohttp.ClientTimeout(total=timeout or self.connect_timeout)
+            response = await self.get(path, retry=False, timeout=timeout)
+            return response.status == 200
+        except Exception as e:
+            logger.error(f"Health check of {self.url(path)} failed: {e!r}")
+            return False
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(base_url: str, **kwargs) -> AsyncHTTPClient:
+    """Get the shared client of an upstream service, created with the given arguments on first call.
+
+    Arguments differing from the ones of the existing client are ignored with a warning.
+
+    :param base_url: The base URL of the service
+    :param kwargs: The arguments of AsyncHTTPClient, to override the limits, timeouts and retries of the env
+    """
+    base_url = base_url.rstrip("/")
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            return _clients.setdefault(base_url, AsyncHTTPClient(base_url, **kwargs))
+    conflicts = {key: value for key, value in kwargs.items() if value is not None and getattr(client, key) != value}
+    if conflicts:
+        logger.warning(f"The client of {base_url} already exists, ignoring {conflicts}")
+    return client
@@ -0,0 +1,69 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import heapq
+import itertools
+
+from fastapi import HTTPException
+
+
+class AdmissionController:
+    """Limit the number of requests a megaservice runs at the same time.
+
+    Requests over `max_concurrency` wait in a bounded queue, served by priority (lower first) and then in
+    FIFO order. A request is rejected with HTTP 429 when the queue is full or when it waited more than
+    `queue_timeout` seconds, so overload is shed early instead of slowing down every request in flight.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue_size: int = 0, queue_timeout: float = 0):
+        """Init the controller.
+
+        :param max_concurrency: max number of requests run at the same time, 0 means no limit
+        :param max_queue_size: max number of requests waiting for admission, 0 rejects at once when busy
+        :param queue_timeout: max seconds a request waits for admission, 0 means no timeout
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0
+
+    async def acquire(self, priority: int = 0):
+        """Wait for a slot to run a request, raising HTTPException(429) when the request is shed."""
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            return
+        if self.queued >= self.max_queue_size:
+            raise HTTPException(status_code=429, detail="Too many requests, the service queue is full.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout or None)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the timeout
+                self.release()
+            else:
+                self.queued -= 1
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise HTTPException(status_code=429, detail="Too many requests, timed out waiting in the service queue.")
+
+    def release(self):
+        """Free the slot of a finished request, handing it over to the next request in the queue."""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self.queued -= 1
+                waiter.set_result(None)
+                return
+        self.active -= 1
@@ -1,67 +1,228 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import numpy as np
+import glob
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
 
 # name => statistic dict
 statistics_dict = {}
 
+# relative error of the latency quantiles
+SKETCH_RELATIVE_ACCURACY = 0.01
+# sliding windows reported besides the whole uptime, in seconds
+STATISTICS_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+# width in seconds of the time slots the sliding windows are made of
+STATISTICS_SLOT_WIDTH = 10
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a bounded relative error (DDSketch).
+
+    Values are counted in logarithmic buckets, so the memory depends on the range of the values and not on their
+    number, and the sketches of several processes or time slots can be merged by adding their bucket counts.
+    """
+
+    MIN_VALUE = 1e-9  # smaller values are counted as zero
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = defaultdict(int)  # bucket key => count
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        if value > self.MIN_VALUE:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        for key, count in other.buckets.items():
+            self.buckets[key] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                value = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def average(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def state(self) -> dict:
+        return {
+            "buckets": list(self.buckets.items()),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    def merge_state(self, state: dict):
+        for key, count in state["buckets"]:
+            self.buckets[key] += count
+        self.zero_count += state["zero_count"]
+        self.count += state["count"]
+        self.sum += state["sum"]
+        if state["count"]:
+            self.min = min(self.min, state["min"])
+            self.max = max(self.max, state["max"])
+
+
+class WindowedSketch:
+    """Quantile sketch of the whole uptime, plus one per time slot to query the sliding windows."""
+
+    def __init__(self):
+        self.total = QuantileSketch()
+        self.slots = {}  # slot index => QuantileSketch, only the slots of the longest window are kept
+
+    def add(self, value: float, now: float):
+        self.total.add(value)
+        slot = int(now // STATISTICS_SLOT_WIDTH)
+        if slot not in self.slots:
+            self.slots[slot] = QuantileSketch()
+            self._prune(slot)
+        self.slots[slot].add(value)
+
+    def _prune(self, slot: int):
+        oldest = slot - max(STATISTICS_WINDOWS.values()) // STATISTICS_SLOT_WIDTH
+        for old_slot in [old_slot for old_slot in self.slots if old_slot < oldest]:
+            del self.slots[old_slot]
+
+    def window(self, seconds: float, now: float) -> QuantileSketch:
+        """Merge the slots overlapping the last `seconds` seconds."""
+        oldest = int((now - seconds) // STATISTICS_SLOT_WIDTH)
+        sketch = QuantileSketch()
+        for slot, slot_sketch in self.slots.items():
+            if slot >= oldest:
+                sketch.merge(slot_sketch)
+        return sketch
+
+    def state(self) -> dict:
+        return {"total": self.total.state(), "slots": [[slot, sketch.state()] for slot, sketch in self.slots.items()]}
+
+    def merge_state(self, state: dict):
+        self.total.merge_state(state["total"])
+        for slot, sketch_state in state["slots"]:
+            self.slots.setdefault(slot, QuantileSketch()).merge_state(sketch_state)
+        if self.slots:
+            self._prune(max(self.slots))
+
+
+def _latency_statistics(sketch: QuantileSketch, suffix: str = "") -> dict:
+    return {
+        f"p50_latency{suffix}": sketch.quantile(0.5),
+        f"p99_latency{suffix}": sketch.quantile(0.99),
+        f"average_latency{suffix}": sketch.average(),
+    }
+
 
 class BaseStatistics:
-    """Base class to store in-memory statistics of an entity for measurement in one service."""
+    """Base class to store in-memory statistics of an entity for measurement in one service.
+
+    Latencies are kept in quantile sketches, so the memory stays bounded whatever the uptime. The sketches are
+    guarded by a lock, as the sync handlers record their latencies from the threadpool.
+    """
 
     def __init__(
         self,
     ):
-        self.response_times = []  # store responses time for all requests
-        self.first_token_latencies = []  # store first token latencies for all requests
+        # reentrant, to read several statistics at once
+        self._lock = threading.RLock()
+        self.response_times = WindowedSketch()  # responses time of the requests
+        self.first_token_latencies = WindowedSketch()  # first token latencies of the requests
+        self.inter_token_latencies = WindowedSketch()  # average inter-token latency of each request
 
-    def append_latency(self, latency, first_token_latency=None):
-        self.response_times.append(latency)
-        if first_token_latency:
-            self.first_token_latencies.append(first_token_latency)
+    def append_latency(self, latency, first_token_latency=None, inter_token_latency=None, token_count=None):
+        """Record the latencies of a request.
 
-    def calculate_statistics(self):
-        if not self.response_times:
+        The average inter-token latency of a stream is derived from its number of tokens when not given.
+        """
+        now = time.time()
+        if first_token_latency and inter_token_latency is None and token_count and token_count > 1:
+            inter_token_latency = (latency - first_token_latency) / (token_count - 1)
+        with self._lock:
+            self.response_times.add(latency, now)
+            if first_token_latency:
+                self.first_token_latencies.add(first_token_latency, now)
+            if inter_token_latency:
+                self.inter_token_latencies.add(inter_token_latency, now)
+
+    def state(self) -> dict:
+        """Get the sketches, to be merged into the statistics of another process."""
+        with self._lock:
             return {
-                "p50_latency": None,
-                "p99_latency": None,
-                "average_latency": None,
+                "response_times": self.response_times.state(),
+                "first_token_latencies": self.first_token_latencies.state(),
+                "inter_token_latencies": self.inter_token_latencies.state(),
             }
-        # Calculate the P50 (median)
-        p50 = np.percentile(self.response_times, 50)
 
-        # Calculate the P99
-        p99 = np.percentile(self.response_times, 99)
+    def merge_state(self, state: dict):
+        with self._lock:
+            self.response_times.merge_state(state["response_times"])
+            self.first_token_latencies.merge_state(state["first_token_latencies"])
+            self.inter_token_latencies.merge_state(state["inter_token_latencies"])
 
-        avg = np.average(self.response_times)
-
-        return {
-            "p50_latency": p50,
-            "p99_latency": p99,
-            "average_latency": avg,
-        }
+    def calculate_statistics(self):
+        with self._lock:
+            result = _latency_statistics(self.response_times.total)
+            result["request_count"] = self.response_times.total.count
+        return result
 
     def calculate_first_token_statistics(self):
-        if not self.first_token_latencies:
-            return {
-                "p50_latency_first_token": None,
-                "p99_latency_first_token": None,
-                "average_latency_first_token": None,
-            }
-        # Calculate the P50 (median)
-        p50 = np.percentile(self.first_token_latencies, 50)
+        with self._lock:
+            return _latency_statistics(self.first_token_latencies.total, "_first_token")
 
-        # Calculate the P99
-        p99 = np.percentile(self.first_token_latencies, 99)
+    def calculate_inter_token_statistics(self):
+        with self._lock:
+            return _latency_statistics(self.inter_token_latencies.total, "_inter_token")
 
-        avg = np.average(self.first_token_latencies)
+    def calculate_window_statistics(self):
+        """Calculate the statistics of each sliding window, with the throughput in requests per second."""
+        with self._lock:
+            return self._window_statistics(time.time())
 
-        return {
-            "p50_latency_first_token": p50,
-            "p99_latency_first_token": p99,
-            "average_latency_first_token": avg,
-        }
+    def _window_statistics(self, now: float) -> dict:
+        results = {}
+        for window, seconds in STATISTICS_WINDOWS.items():
+            response_times = self.response_times.window(seconds, now)
+            # the window covers its oldest slot entirely, which started before now - seconds
+            span = now - (now - seconds) // STATISTICS_SLOT_WIDTH * STATISTICS_SLOT_WIDTH
+            result = _latency_statistics(response_times)
+            result["request_count"] = response_times.count
+            result["throughput"] = response_times.count / span
+            result.update(_latency_statistics(self.first_token_latencies.window(seconds, now), "_first_token"))
+            result.update(_latency_statistics(self.inter_token_latencies.window(seconds, now), "_inter_token"))
+            results[window] = result
+        return results
 
 
 def register_statistics(
@@ -75,11 +236,37 @@ def register_statistics(
     return decorator
 
 
-def collect_all_statistics():
+def dump_statistics(path: str):
+    """Write the statistics of this process to `path`, for collect_all_statistics() to aggregate them."""
+    state = {name: statistic.state() for name, statistic in statistics_dict.items()}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def collect_all_statistics(statistics_dir: Optional[str] = None):
+    """Calculate the statistics of this process, or aggregate the ones dumped in `statistics_dir` by every worker
+    process of a service."""
+    statistics = statistics_dict
+    if statistics_dir is not None:
+        statistics = defaultdict(BaseStatistics)
+        for path in glob.glob(os.path.join(statistics_dir, "*.json")):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, statistic_state in state.items():
+                statistics[name].merge_state(statistic_state)
+
     results = {}
-    if statistics_dict:
-        for name, statistic in statistics_dict.items():
-            tmp_dict = statistic.calculate_statistics()
-            tmp_dict.update(statistic.calculate_first_token_statistics())
+    if statistics:
+        for name, statistic in list(statistics.items()):
+            with statistic._lock:
+                tmp_dict = statistic.calculate_statistics()
+                tmp_dict.update(statistic.calculate_first_token_statistics())
+                tmp_dict.update(statistic.calculate_inter_token_statistics())
+                tmp_dict["windows"] = statistic.calculate_window_statistics()
             results.update({name: tmp_dict})
     return results
@@ -0,0 +1,220 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+from .logger import CustomLogger
+
+logger = CustomLogger("comps-core-cache")
+
+
+def canonical_hash(data) -> str:
+    """Hash JSON-like data independently of the order of its keys."""
+    text = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-process cache bounded by number of entries, total size and time to live, evicting the least recently
+    used.
+
+    The size of the entries is only tracked with a `max_bytes` budget, measured by `sizeof` (len by default).
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable = len,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (expire_at, value)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expire_at, value = entry
+        if expire_at is not None and expire_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                return
+            self.nbytes += size
+        expire_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (expire_at, value)
+        while (self.max_size is not None and len(self._entries) > self.max_size) or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, value = self._entries.pop(key)
+        if self.max_bytes is not None:
+            self.nbytes -= self.sizeof(value)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResultCache:
+    """Cache of JSON results, kept in an in-process LRU and optionally shared through Redis.
+
+    Values are stored serialized, so callers can modify the results they get without altering the cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = 600,
+        redis_url: Optional[str] = None,
+        prefix: str = "opea:cache:",
+    ):
+        self.local = LRUCache(max_size, ttl)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis = None
+        if redis_url:
+            from redis import asyncio as aioredis
+
+            self.redis = aioredis.from_url(redis_url)
+
+    async def get(self, key: str):
+        text = self.local.get(key)
+        if text is None and self.redis is not None:
+            try:
+                text = await self.redis.get(self.prefix + key)
+            except Exception as e:
+                logger.error(f"Redis cache read failed: {e}")
+            if text is not None:
+                self.local.set(key, text)
+        return None if text is None else json.loads(text)
+
+    async def set(self, key: str, value):
+        text = json.dumps(value)
+        self.local.set(key, text)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.prefix + key, text, ex=int(self.ttl) if self.ttl else None)
+            except Exception as e:
+                logger.error(f"Redis cache write failed: {e}")
+
+
+class EmbeddingCache:
+    """Content-addressed cache of embedding vectors, kept in an in-process LRU bounded in bytes and optionally
+    shared through Redis.
+
+    Vectors are stored as their raw bytes, keyed by the hash of the model and the text they embed. Lookups and
+    updates work on whole batches, so only the texts missing from both tiers need to be embedded.
+    """
+
+    _metrics = None
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        redis_url: Optional[str] = None,
+        prefix: str = "opea:embedding:",
+    ):
+        self.name = name
+        self.local = LRUCache(max_size=None, ttl=ttl, max_bytes=max_bytes)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.redis = None
+        if redis_url:
+            from redis import asyncio as aioredis
+
+            self.redis = aioredis.from_url(redis_url)
+
+    @classmethod
+    def _get_metrics(cls):
+        with cls._lock:
+            # shared by every cache of the process
+            if cls._metrics is None:
+                cls._metrics = (
+                    Counter(
+                        "component_embedding_cache_hits",
+                        "Embeddings found in the cache, by tier (local or redis)",
+                        ["cache", "tier"],
+                    ),
+                    Counter("component_embedding_cache_misses", "Embeddings missing from the cache", ["cache"]),
+                    Gauge(
+                        "component_embedding_cache_hit_ratio", "Ratio of the embeddings found in the cache", ["cache"]
+                    ),
+                    Gauge("component_embedding_cache_bytes", "Size of the embeddings kept in memory", ["cache"]),
+                )
+        return cls._metrics
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get the vectors of the keys, None for the ones missing from the cache."""
+        hits, misses, hit_ratio, _ = self._get_metrics()
+        values = [self.local.get(key) for key in keys]
+        local_hits = sum(value is not None for value in values)
+        redis_hits = 0
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing and self.redis is not None:
+            try:
+                found = await self.redis.mget([self.prefix + keys[i] for i in missing])
+            except Exception as e:
+                logger.error(f"Redis cache read failed: {e}")
+                found = [None] * len(missing)
+            for i, value in zip(missing, found):
+                if value is not None:
+                    values[i] = value
+                    self.local.set(keys[i], value)
+                    redis_hits += 1
+
+        self.hits += local_hits + redis_hits
+        self.misses += len(keys) - local_hits - redis_hits
+        hits.labels(self.name, "local").inc(local_hits)
+        hits.labels(self.name, "redis").inc(redis_hits)
+        misses.labels(self.name).inc(len(keys) - local_hits - redis_hits)
+        hit_ratio.labels(self.name).set(self.hit_ratio)
+        return values
+
+    async def set_many(self, items: Dict[str, bytes]):
+        for key, value in items.items():
+            self.local.set(key, value)
+        self._get_metrics()[3].labels(self.name).set(self.local.nbytes)
+        if self.redis is not None and items:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key, value in items.items():
+                        pipe.set(self.prefix + key, value, ex=int(self.ttl) if self.ttl else None)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis cache write failed: {e}")
@@ -2,11 +2,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from collections import OrderedDict, defaultdict
-from copy import deepcopy
 
 
 class DAG(object):
     def __init__(self):
+        self._revision = 0
+        self._plan = None
         self.reset_graph()
 
     def add_node(self, node_name: str):
@@ -14,6 +15,8 @@ class DAG(object):
         if node_name in graph:
             raise KeyError("node %s already exists" % node_name)
         graph[node_name] = set()
+        self.reverse_graph[node_name] = {}
+        self._revision += 1
 
     def add_node_if_not_exists(self, node_name):
         try:
@@ -25,11 +28,11 @@ class DAG(object):
         graph = self.graph
         if node_name not in graph:
             raise KeyError("node %s does not exist" % node_name)
-        graph.pop(node_name)
-
-        for node, edges in graph.items():
-            if node_name in edges:
-                edges.remove(node_name)
+        for dep_node in graph.pop(node_name):
+            self.reverse_graph[dep_node].pop(node_name, None)
+        for ind_node in self.reverse_graph.pop(node_name):
+            graph[ind_node].discard(node_name)
+        self._revision += 1
 
     def delete_node_if_exists(self, node_name):
         try:
@@ -41,23 +44,41 @@ class DAG(object):
         graph = self.graph
         if ind_node not in graph or dep_node not in graph:
             raise KeyError("one or more nodes do not exist in graph")
-        test_graph = deepcopy(graph)
-        test_graph[ind_node].add(dep_node)
-        is_valid = self.validate(test_graph)
-        if is_valid:
-            graph[ind_node].add(dep_node)
-        else:
+        if dep_node in graph[ind_node]:
+            return
+        # the new edge closes a cycle only if ind_node is already reachable from dep_node
+        if self._reachable(dep_node, ind_node):
             raise Exception("validation error!")
+        graph[ind_node].add(dep_node)
+        self.reverse_graph[dep_node][ind_node] = None
+        self._revision += 1
+
+    def _reachable(self, source, target):
+        graph = self.graph
+        stack = [source]
+        seen = {source}
+        while stack:
+            node = stack.pop()
+            if node == target:
+                return True
+            for dep_node in graph[node]:
+                if dep_node not in seen:
+                    seen.add(dep_node)
+                    stack.append(dep_node)
+        return False
 
     def delete_edge(self, ind_node, dep_node):
         graph = self.graph
         if dep_node not in graph.get(ind_node, []):
             raise KeyError("this edge does not exist in graph")
         graph[ind_node].remove(dep_node)
+        self.reverse_graph[dep_node].pop(ind_node, None)
+        self._revision += 1
 
     def predecessors(self, node):
-        graph = self.graph
-        return [key for key in graph if node in graph[key]]
+        if node not in self.reverse_graph:
+            return []
+        return list(self.reverse_graph[node])
 
     def downstream(self, node) -> list:
         graph = self.graph
@@ -84,17 +105,30 @@ class DAG(object):
         return [key for key in graph if not graph[key]]
 
     def from_dict(self, graph_dict):
+        """Load the graph from a {node: [dependent nodes]} dict, validating it once as a whole."""
         self.reset_graph()
+        graph = self.graph
         for new_node in graph_dict.keys():
             self.add_node(new_node)
         for ind_node, dep_nodes in graph_dict.items():
             if not isinstance(dep_nodes, list):
+                self.reset_graph()
                 raise TypeError("dict values must be lists")
             for dep_node in dep_nodes:
-                self.add_edge(ind_node, dep_node)
+                if dep_node not in graph:
+                    self.reset_graph()
+                    raise KeyError("one or more nodes do not exist in graph")
+                graph[ind_node].add(dep_node)
+                self.reverse_graph[dep_node][ind_node] = None
+        self._revision += 1
+        if not self.validate():
+            self.reset_graph()
+            raise Exception("validation error!")
 
     def reset_graph(self):
         self.graph = OrderedDict()
+        self.reverse_graph = {}  # node -> {predecessor: None}, kept in edge insertion order
+        self._revision += 1
 
     def ind_nodes(self, graph=None):
         graph = graph if graph is not None else self.graph
@@ -140,3 +174,140 @@ class DAG(object):
 
     def size(self):
         return len(self.graph)
+
+    def execution_plan(self):
+        """Get the ExecutionPlan of the graph, compiled once per graph revision.
+
+        The graph must be changed through the DAG methods for the cached plan to be invalidated.
+        """
+        if self._plan is None or self._plan.revision != self._revision:
+            self._plan = ExecutionPlan(self.graph, self._revision)
+        return self._plan
+
+
+class ExecutionPlan(object):
+    """Immutable, index based snapshot of a DAG used to schedule requests without copying the graph."""
+
+    def __init__(self, graph, revision=0):
+        self.revision = revision
+        self.nodes = list(graph.keys())  # insertion order
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.successors = [[self.index[dep] for dep in graph[node]] for node in self.nodes]
+        self.predecessors = [[] for _ in self.nodes]
+        for i, succs in enumerate(self.successors):
+            for j in succs:
+                self.predecessors[j].append(i)
+        self.in_degree = [len(preds) for preds in self.predecessors]
+        self.ind_nodes = [i for i, degree in enumerate(self.in_degree) if not degree]
+        self.order = []  # topological order
+        in_degree = list(self.in_degree)
+        ready = list(self.ind_nodes)
+        while ready:
+            i = ready.pop()
+            self.order.append(i)
+            for j in self.successors[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    ready.append(j)
+        if len(self.order) != len(self.nodes):
+            raise ValueError("graph is not acyclic")
+
+
+class RuntimeGraph(DAG):
+    """Per-request overlay of an ExecutionPlan.
+
+    Deleted edges and nodes are recorded on the overlay, the plan itself is never modified.
+    """
+
+    def __init__(self, plan: ExecutionPlan):
+        self.plan = plan
+        self.pruned_edges = set()  # {(ind_index, dep_index)}
+        self.deleted_nodes = set()  # {index}
+
+    @property
+    def graph(self):
+        plan = self.plan
+        return OrderedDict(
+            (plan.nodes[i], {plan.nodes[j] for j in self._successors(i)})
+            for i in range(len(plan.nodes))
+            if i not in self.deleted_nodes
+        )
+
+    def _index(self, node):
+        i = self.plan.index.get(node)
+        if i is None or i in self.deleted_nodes:
+            raise KeyError("node %s is not in graph" % node)
+        return i
+
+    def _successors(self, i):
+        return [j for j in self.plan.successors[i] if j not in self.deleted_nodes and (i, j) not in self.pruned_edges]
+
+    def _predecessors(self, j):
+        return [i for i in self.plan.predecessors[j] if i not in self.deleted_nodes and (i, j) not in self.pruned_edges]
+
+    def add_node(self, node_name):
+        raise TypeError("nodes can not be added to a runtime graph")
+
+    def add_edge(self, ind_node, dep_node):
+        raise TypeError("edges can not be added to a runtime graph")
+
+    def reset_graph(self):
+        raise TypeError("a runtime graph can not be reset")
+
+    def delete_node(self, node_name):
+        self.deleted_nodes.add(self._index(node_name))
+
+    def delete_edge(self, ind_node, dep_node):
+        i, j = self.plan.index.get(ind_node), self.plan.index.get(dep_node)
+        if i is None or j is None or j not in self._successors(i) or i in self.deleted_nodes:
+            raise KeyError("this edge does not exist in graph")
+        self.pruned_edges.add((i, j))
+
+    def predecessors(self, node):
+        return [self.plan.nodes[i] for i in self._predecessors(self._index(node))]
+
+    def downstream(self, node) -> list:
+        return [self.plan.nodes[j] for j in self._successors(self._index(node))]
+
+    def all_downstreams(self, node):
+        nodes = [self._index(node)]
+        nodes_seen = set()
+        i = 0
+        while i < len(nodes):
+            for j in self._successors(nodes[i]):
+                if j not in nodes_seen:
+                    nodes_seen.add(j)
+                    nodes.append(j)
+            i += 1
+        return [self.plan.nodes[j] for j in self.plan.order if j in nodes_seen]
+
+    def all_leaves(self):
+        return [
+            node for i, node in enumerate(self.plan.nodes) if i not in self.deleted_nodes and not self._successors(i)
+        ]
+
+    def ind_nodes(self, graph=None):
+        if graph is not None:
+            return super().ind_nodes(graph)
+        return [
+            node for i, node in enumerate(self.plan.nodes) if i not in self.deleted_nodes and not self._predecessors(i)
+        ]
+
+    def topological_sort(self, graph=None):
+        if graph is not None:
+            return super().topological_sort(graph)
+        return [self.plan.nodes[i] for i in self.plan.order if i not in self.deleted_nodes]
+
+    def keep_reachable(self):
+        """Delete the nodes that can not be reached from the plan's independent nodes, in O(V+E)."""
+        seen = set(i for i in self.plan.ind_nodes if i not in self.deleted_nodes)
+        stack = list(seen)
+        while stack:
+            for j in self._successors(stack.pop()):
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(j)
+        self.deleted_nodes.update(i for i in range(len(self.plan.nodes)) if i not in seen)
+
+    def size(self):
+        return len(self.plan.nodes) - len(self.deleted_nodes)
@@ -0,0 +1,70 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Serialize the types orjson does not support natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if hasattr(obj, "tolist"):
+        # numpy arrays of dtypes unsupported by orjson, or not contiguous
+        return obj.tolist()
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed."""
+    if orjson is None:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def loads(data):
+    """Parse JSON bytes or text, with orjson when it is installed."""
+    return json.loads(data) if orjson is None else orjson.loads(data)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered by orjson, which also serializes numpy arrays and pydantic models.
+
+    Handlers of large numeric payloads such as embeddings can return it directly, to skip the conversion of
+    their result to Python lists and dicts by FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class OrjsonRequest(Request):
+    """Request parsing its JSON body with orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = loads(await self.body())
+        return self._json
+
+
+class OrjsonRoute(APIRoute):
+    """Route parsing the JSON request bodies with orjson."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(OrjsonRequest(request.scope, request.receive))
+
+        return route_handler
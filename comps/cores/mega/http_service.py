@@ -4,16 +4,41 @@
 import asyncio
 import logging
 import multiprocessing
+import os
 import re
+import shutil
+import signal
+import tempfile
+import threading
+import tracemalloc
 from typing import Optional
 
-from fastapi import FastAPI
-from fastapi.responses import Response
+from fastapi import FastAPI, HTTPException
+from fastapi.datastructures import Default
+from fastapi.responses import PlainTextResponse, Response
 from prometheus_fastapi_instrumentator import Instrumentator
 from uvicorn import Config, Server
 
+from ..common.component import OpeaComponentLoader
+from ..telemetry.opea_telemetry import in_memory_exporter
 from .base_service import BaseService
-from .base_statistics import collect_all_statistics
+from .base_statistics import collect_all_statistics, dump_statistics
+from .fast_json import OrjsonResponse, OrjsonRoute
+from .profiler import EventLoopMonitor, SamplingProfiler, memory_snapshot
+
+# number of processes serving a service, each one runs its own event loop on the shared port
+WORKERS = int(os.getenv("MICROSERVICE_WORKERS", 1))
+# interval in seconds at which each worker process publishes its statistics for /v1/statistics
+STATISTICS_SYNC_INTERVAL = float(os.getenv("MICROSERVICE_STATISTICS_SYNC_INTERVAL", 5))
+# serve the /v1/profile routes
+PROFILING = os.getenv("MICROSERVICE_PROFILING", "false").lower() in ("true", "1")
+# export the event loop lag and log the stack of the calls blocking the event loop longer than the threshold
+LOOP_MONITOR = os.getenv("MICROSERVICE_LOOP_MONITOR", "false").lower() in ("true", "1")
+LOOP_SLOW_CALLBACK_THRESHOLD = float(os.getenv("MICROSERVICE_LOOP_SLOW_CALLBACK_THRESHOLD", 0.25))
+# also run the event loop in asyncio debug mode, logging every callback slower than the threshold
+LOOP_DEBUG = os.getenv("MICROSERVICE_LOOP_DEBUG", "false").lower() in ("true", "1")
+# max duration in seconds of a CPU profile taken by GET /v1/profile/cpu
+MAX_PROFILE_SECONDS = 300
 
 
 class HTTPService(BaseService):
@@ -26,17 +51,28 @@ class HTTPService(BaseService):
         self,
         uvicorn_kwargs: Optional[dict] = None,
         cors: Optional[bool] = True,
+        workers: Optional[int] = None,
         **kwargs,
     ):
         """Initialize the HTTPService
         :param uvicorn_kwargs: Dictionary of kwargs arguments that will be passed to Uvicorn server when starting the server
         :param cors: If set, a CORS middleware is added to FastAPI frontend to allow cross-origin access.
+        :param workers: Number of processes forked to serve the requests on the same port, defaults to the
+            MICROSERVICE_WORKERS env variable. Set PROMETHEUS_MULTIPROC_DIR to aggregate the metrics of the workers.
 
         :param kwargs: keyword args
         """
         super().__init__(**kwargs)
         self.uvicorn_kwargs = uvicorn_kwargs or {}
         self.cors = cors
+        self.workers = workers or WORKERS
+        self._socket = None
+        self._worker_processes = []
+        self._statistics_dir = None
+        self._profiler = SamplingProfiler()
+        self._loop_monitor = EventLoopMonitor(
+            self.title, slow_callback_threshold=LOOP_SLOW_CALLBACK_THRESHOLD, debug=LOOP_DEBUG
+        )
         self._app = self._create_app()
         Instrumentator().instrument(self._app).expose(self._app)
 
@@ -51,7 +87,10 @@ class HTTPService(BaseService):
 
         :return: a FastAPI application.
         """
-        app = FastAPI(title=self.title, description=self.description)
+        # orjson renders the responses of the routes without response model, while the routes with one keep
+        # the serialization of FastAPI straight to JSON bytes by pydantic, which a non default class disables
+        app = FastAPI(title=self.title, description=self.description, default_response_class=Default(OrjsonResponse))
+        app.router.route_class = OrjsonRoute
 
         if self.cors:
             from fastapi.middleware.cors import CORSMiddleware
@@ -81,6 +120,17 @@ class HTTPService(BaseService):
             """Health check."""
             return Response(status_code=200)
 
+        @app.get(
+            path="/v1/ready",
+            summary="Get the readiness of the components of GenAI microservice",
+            tags=["Debug"],
+        )
+        async def _ready():
+            """Get whether the dependencies of the components are reachable, answering 503 until they all are."""
+            components = OpeaComponentLoader.readiness()
+            ready = all(components.values())
+            return OrjsonResponse({"ready": ready, "components": components}, status_code=200 if ready else 503)
+
         @app.get(
             path="/v1/statistics",
             summary="Get the statistics of GenAI services",
@@ -88,11 +138,83 @@ class HTTPService(BaseService):
         )
         async def _get_statistics():
             """Get the statistics of GenAI services."""
-            result = collect_all_statistics()
+            if self._statistics_dir is not None:
+                # aggregate the statistics of every worker process
+                dump_statistics(self._statistics_path)
+            result = collect_all_statistics(self._statistics_dir)
             return result
 
+        @app.get(
+            path="/v1/traces",
+            summary="Get the latest traces of GenAI services",
+            tags=["Debug"],
+        )
+        async def _get_traces(limit: int = 20):
+            """Get the latest traces kept in memory, when tracing is on."""
+            return in_memory_exporter.recent_traces(limit)
+
+        if PROFILING:
+            self._add_profiling_routes(app)
+
         return app
 
+    def _add_profiling_routes(self, app):
+        """Add the /v1/profile routes, they cost nothing until a profile is started."""
+
+        @app.post(path="/v1/profile/cpu/start", summary="Start sampling the stacks of the service", tags=["Debug"])
+        async def _start_cpu_profile(interval: float = 0.005):
+            """Start the sampling profiler, stop it with /v1/profile/cpu/stop to get the collapsed stacks."""
+            if self._profiler.running:
+                raise HTTPException(status_code=409, detail="A CPU profile is already running.")
+            self._profiler.interval = interval
+            self._profiler.start()
+            return {"status": "started"}
+
+        @app.post(path="/v1/profile/cpu/stop", summary="Stop sampling the stacks of the service", tags=["Debug"])
+        async def _stop_cpu_profile():
+            """Stop the sampling profiler and get the collapsed stacks, ready for flame graph tools."""
+            if not self._profiler.running:
+                raise HTTPException(status_code=409, detail="No CPU profile is running.")
+            return PlainTextResponse(self._profiler.stop())
+
+        @app.get(path="/v1/profile/cpu", summary="Sample the stacks of the service for a while", tags=["Debug"])
+        async def _cpu_profile(seconds: float = 10, interval: float = 0.005):
+            """Run the sampling profiler for `seconds` and get the collapsed stacks."""
+            if not 0 < seconds <= MAX_PROFILE_SECONDS:
+                raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_PROFILE_SECONDS}].")
+            await _start_cpu_profile(interval)
+            await asyncio.sleep(seconds)
+            return await _stop_cpu_profile()
+
+        @app.post(path="/v1/profile/memory/start", summary="Start tracing the memory allocations", tags=["Debug"])
+        async def _start_memory_profile(frames: int = 1):
+            """Start tracemalloc, keeping `frames` frames of traceback per allocation."""
+            if tracemalloc.is_tracing():
+                raise HTTPException(status_code=409, detail="Memory tracing is already started.")
+            tracemalloc.start(frames)
+            return {"status": "started"}
+
+        @app.get(path="/v1/profile/memory", summary="Get the top memory allocations", tags=["Debug"])
+        async def _memory_profile(limit: int = 25, key_type: str = "lineno"):
+            """Get the top allocations since memory tracing was started, grouped by `key_type`."""
+            try:
+                return memory_snapshot(limit, key_type)
+            except RuntimeError as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @app.post(path="/v1/profile/memory/stop", summary="Stop tracing the memory allocations", tags=["Debug"])
+        async def _stop_memory_profile():
+            """Stop tracemalloc and free its traces."""
+            tracemalloc.stop()
+            return {"status": "stopped"}
+
+        @app.get(path="/v1/profile/loop", summary="Get the event loop lag", tags=["Debug"])
+        async def _loop_profile():
+            """Get the latest event loop scheduling delay in seconds."""
+            return {"lag": self._loop_monitor.lag}
+
     def add_startup_event(self, func):
         @self.app.on_event("startup")
         async def startup_event():
@@ -136,12 +258,100 @@ class HTTPService(BaseService):
         )
         logging.getLogger("uvicorn.access").addFilter(lambda record: "/v1/health_check" not in record.getMessage())
         self.logger.info(f"Uvicorn server setup on port {self.primary_port}")
-        await self.server.setup_server()
+        if self.workers > 1:
+            # the workers share the socket bound here, each one starts the app itself
+            self._socket = self.server.config.bind_socket()
+        else:
+            await self.server.setup_server()
         self.logger.info("HTTP server setup successful")
 
     async def execute_server(self):
         """Run the HTTP server indefinitely."""
-        await self.server.start_server()
+        self._start_loop_monitor()
+        OpeaComponentLoader.start_readiness_checks()
+        try:
+            await self.server.start_server()
+        finally:
+            OpeaComponentLoader.stop_readiness_checks()
+            self._loop_monitor.stop()
+
+    def _start_loop_monitor(self):
+        if LOOP_MONITOR or PROFILING:
+            self._loop_monitor.start()
+
+    @property
+    def _statistics_path(self):
+        return os.path.join(self._statistics_dir, f"statistics_{os.getpid()}.json")
+
+    def _start_workers(self):
+        """Fork the worker processes and wait for them, they are terminated along with this process."""
+        if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+            self.logger.warning(
+                f"Running {self.workers} workers without PROMETHEUS_MULTIPROC_DIR, /metrics only reports the worker "
+                "serving the scrape"
+            )
+        self._statistics_dir = tempfile.mkdtemp(prefix="opea-statistics-")
+        context = multiprocessing.get_context("fork")
+        self._worker_processes = [
+            context.Process(target=self._run_worker, name=f"{self.title}-worker-{i}") for i in range(self.workers)
+        ]
+
+        def terminate(signum, frame):
+            raise SystemExit(0)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, terminate)
+        try:
+            for process in self._worker_processes:
+                process.start()
+            self.logger.info(f"Started {self.workers} workers on port {self.primary_port}")
+            for process in self._worker_processes:
+                process.join()
+        finally:
+            self._stop_workers()
+
+    def _stop_workers(self):
+        for process in self._worker_processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self._worker_processes:
+            process.join()
+            if "PROMETHEUS_MULTIPROC_DIR" in os.environ and process.pid is not None:
+                from prometheus_client import multiprocess
+
+                multiprocess.mark_process_dead(process.pid)
+        self._worker_processes = []
+        if self._statistics_dir is not None:
+            shutil.rmtree(self._statistics_dir, ignore_errors=True)
+            self._statistics_dir = None
+
+    def _run_worker(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.event_loop)
+        self.event_loop.run_until_complete(self._serve_worker())
+
+    async def _serve_worker(self):
+        self.event_loop.add_signal_handler(signal.SIGTERM, setattr, self.server, "should_exit", True)
+        await self.server.setup_server(sockets=[self._socket])
+        sync_task = asyncio.create_task(self._sync_statistics())
+        self._start_loop_monitor()
+        OpeaComponentLoader.start_readiness_checks()
+        try:
+            await self.server.start_server()
+        finally:
+            sync_task.cancel()
+            OpeaComponentLoader.stop_readiness_checks()
+            self._loop_monitor.stop()
+        await self.server.shutdown()
+
+    async def _sync_statistics(self):
+        while True:
+            try:
+                dump_statistics(self._statistics_path)
+            except OSError as e:
+                self.logger.warning(f"Failed to publish the worker statistics: {e}")
+            await asyncio.sleep(STATISTICS_SYNC_INTERVAL)
 
     async def terminate_server(self):
         """Terminate the HTTP server and free resources allocated when setting up the server."""
@@ -159,10 +369,23 @@ class HTTPService(BaseService):
         """Running method to block the main thread.
 
         This method runs the event loop until a Future is done. It is designed to be called in the main thread to keep it busy.
+        With several workers, it forks them and waits for them instead.
         """
-        self.event_loop.run_until_complete(self.execute_server())
+        if self.workers > 1:
+            self._start_workers()
+        else:
+            self.event_loop.run_until_complete(self.execute_server())
 
     def stop(self):
+        if self.workers > 1:
+            self._stop_workers()
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+            self.event_loop.stop()
+            self.event_loop.close()
+            self.logger.close()
+            return
         self.event_loop.run_until_complete(self.terminate_server())
         self.event_loop.stop()
         self.event_loop.close()
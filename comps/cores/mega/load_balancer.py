@@ -0,0 +1,81 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import random
+import time
+from typing import List
+
+from .logger import CustomLogger
+
+logger = CustomLogger("comps-core-load-balancer")
+
+LEAST_PENDING = "least_pending"
+POWER_OF_TWO = "power_of_two"
+
+
+class Replica:
+    """One endpoint of a replicated microservice and its load/health state."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.pending = 0  # requests sent to the replica and not finished yet
+        self.fails = 0  # consecutive failed requests
+        self.ejected_until = 0.0  # monotonic time until which the replica receives no traffic
+
+    def __repr__(self):
+        return f"Replica(endpoint={self.endpoint}, pending={self.pending}, fails={self.fails})"
+
+
+class ReplicaPool:
+    """Route the requests of one node over its replicas.
+
+    A replica is picked by least pending requests, or by the less loaded of two random replicas
+    (power of two choices). A replica failing `max_fails` requests in a row is ejected for
+    `fail_timeout` seconds; when every replica is ejected they are all used again.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        strategy: str = LEAST_PENDING,
+        max_fails: int = 3,
+        fail_timeout: float = 30.0,
+    ):
+        if not endpoints:
+            raise ValueError("a replica pool needs at least one endpoint")
+        if strategy not in (LEAST_PENDING, POWER_OF_TWO):
+            raise ValueError(f"Unsupported load balancing strategy: {strategy}")
+        self.replicas = [Replica(endpoint) for endpoint in endpoints]
+        self.strategy = strategy
+        self.max_fails = max_fails
+        self.fail_timeout = fail_timeout
+
+    def healthy(self) -> List[Replica]:
+        now = time.monotonic()
+        replicas = [replica for replica in self.replicas if replica.ejected_until <= now]
+        return replicas or self.replicas
+
+    def acquire(self) -> Replica:
+        """Pick a replica for a new request, it must be given back with release()."""
+        if len(self.replicas) == 1:
+            replica = self.replicas[0]
+        else:
+            replicas = self.healthy()
+            if self.strategy == POWER_OF_TWO and len(replicas) > 2:
+                replicas = random.sample(replicas, 2)
+            least = min(replica.pending for replica in replicas)
+            replica = random.choice([replica for replica in replicas if replica.pending == least])
+        replica.pending += 1
+        return replica
+
+    def release(self, replica: Replica, failed: bool = False):
+        """Finish a request sent to the replica, ejecting it after too many consecutive failures."""
+        replica.pending -= 1
+        if not failed:
+            replica.fails = 0
+            return
+        replica.fails += 1
+        if replica.fails >= self.max_fails and len(self.replicas) > 1:
+            replica.ejected_until = time.monotonic() + self.fail_timeout
+            replica.fails = 0
+            logger.warning(f"Eject {replica.endpoint} for {self.fail_timeout}s after {self.max_fails} failed requests")
@@ -3,10 +3,14 @@
 
 import asyncio
 import os
+import threading
+import time
 from collections import defaultdict, deque
 from enum import Enum
 from typing import Any, List, Optional, Type
 
+from prometheus_client import Histogram
+
 from ..proto.docarray import TextDoc
 from .constants import ServiceRoleType, ServiceType
 from .http_service import HTTPService
@@ -17,6 +21,41 @@ opea_microservices = {}
 
 logger = CustomLogger("micro_service")
 logflag = os.getenv("LOGFLAG", False)
+# max number of batches inferred at the same time, the next batch keeps accumulating requests meanwhile
+DYNAMIC_BATCHING_PIPELINE_DEPTH = int(os.getenv("DYNAMIC_BATCHING_PIPELINE_DEPTH", 1))
+
+
+class BatchingMetrics:
+    def __init__(self) -> None:
+        # locking for metric creation
+        self._lock = threading.Lock()
+
+        # created on demand, to avoid bogus ones for services not using dynamic batching
+        self.batch_size = None
+        self.queue_wait_time = None
+
+    def batch_update(self, service: str, batch: list[dict], batch_start: float) -> None:
+        if self.batch_size is None:
+            with self._lock:
+                # in case another thread already got here
+                if self.batch_size is None:
+                    self.queue_wait_time = Histogram(
+                        "microservice_batch_queue_wait_time",
+                        "Time a request waited in the dynamic batching queue (histogram)",
+                        ["service"],
+                    )
+                    self.batch_size = Histogram(
+                        "microservice_batch_size",
+                        "Number of requests in a dynamic batch (histogram)",
+                        ["service"],
+                        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+                    )
+        self.batch_size.labels(service).observe(len(batch))
+        for req in batch:
+            self.queue_wait_time.labels(service).observe(batch_start - req["time"])
+
+
+_batching_metrics = BatchingMetrics()
 
 
 class MicroService(HTTPService):
@@ -40,10 +79,23 @@ class MicroService(HTTPService):
         use_remote_service: Optional[bool] = False,
         description: Optional[str] = None,
         dynamic_batching: bool = False,
-        dynamic_batching_timeout: int = 1,
+        dynamic_batching_timeout: float = 0.05,
         dynamic_batching_max_batch_size: int = 32,
+        replicas: Optional[List[str]] = None,
+        load_balancing: str = "least_pending",
+        workers: Optional[int] = None,
     ):
-        """Init the microservice."""
+        """Init the microservice.
+
+        With `dynamic_batching`, the requests queued by batch_request() are inferred together by
+        dynamic_batching_infer(): a batch is run as soon as it holds `dynamic_batching_max_batch_size` requests,
+        or when its oldest request waited `dynamic_batching_timeout` seconds.
+
+        `replicas` lists the "host:port" addresses of a remote service run by several replicas, the orchestrator
+        balances the requests over them by `load_balancing` ("least_pending" or "power_of_two").
+
+        `workers` processes are forked to serve a local service on the same port, see HTTPService.
+        """
         self.service_role = service_role
         self.service_type = service_type
         self.protocol = protocol
@@ -57,6 +109,8 @@ class MicroService(HTTPService):
         self.dynamic_batching = dynamic_batching
         self.dynamic_batching_timeout = dynamic_batching_timeout
         self.dynamic_batching_max_batch_size = dynamic_batching_max_batch_size
+        self.replicas = replicas or []
+        self.load_balancing = load_balancing
         self.uvicorn_kwargs = {}
 
         if ssl_keyfile:
@@ -83,12 +137,15 @@ class MicroService(HTTPService):
                 "description": "OPEA Microservice Infrastructure",
             }
 
-            super().__init__(uvicorn_kwargs=self.uvicorn_kwargs, runtime_args=runtime_args)
+            super().__init__(uvicorn_kwargs=self.uvicorn_kwargs, runtime_args=runtime_args, workers=workers)
 
             # create a batch request processor loop if using dynamic batching
             if self.dynamic_batching:
                 self.buffer_lock = asyncio.Lock()
                 self.request_buffer = defaultdict(deque)
+                self._batch_event = asyncio.Event()
+                self._batch_slots = asyncio.Semaphore(DYNAMIC_BATCHING_PIPELINE_DEPTH)
+                self._batch_tasks = set()
                 self.add_startup_event(self._dynamic_batch_processor())
 
             self._async_setup()
@@ -96,35 +153,78 @@ class MicroService(HTTPService):
         # overwrite name
         self.name = f"{name}/{self.__class__.__name__}" if name else self.__class__.__name__
 
+    async def batch_request(self, service_type: Enum, request):
+        """Queue a request for dynamic batching and wait for its result."""
+        response = asyncio.get_running_loop().create_future()
+        self.request_buffer[service_type].append({"request": request, "response": response, "time": time.monotonic()})
+        self._batch_event.set()
+        return await response
+
     async def _dynamic_batch_processor(self):
         if logflag:
             logger.info("dynamic batch processor looping...")
         while True:
-            await asyncio.sleep(self.dynamic_batching_timeout)
-            runtime_batch: dict[Enum, list[dict]] = {}  # {ServiceType.Embedding: [{"request": xx, "response": yy}, {}]}
-
+            service_type = await self._wait_for_batch()
+            # the batch is taken from the buffer only once a pipeline slot is free, so it grows meanwhile
+            await self._batch_slots.acquire()
             async with self.buffer_lock:
-                # prepare the runtime batch, access to buffer is locked
-                if self.request_buffer:
-                    for service_type, request_lst in self.request_buffer.items():
-                        batch = []
-                        # grab min(MAX_BATCH_SIZE, REQUEST_SIZE) requests from buffer
-                        for _ in range(min(self.dynamic_batching_max_batch_size, len(request_lst))):
-                            batch.append(request_lst.popleft())
-
-                        runtime_batch[service_type] = batch
-
-            # Run batched inference on the batch and set results
-            for service_type, batch in runtime_batch.items():
-                if not batch:
+                request_lst = self.request_buffer[service_type]
+                batch = [
+                    request_lst.popleft() for _ in range(min(self.dynamic_batching_max_batch_size, len(request_lst)))
+                ]
+            task = asyncio.create_task(self._run_batch(service_type, batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _wait_for_batch(self) -> Enum:
+        """Wait for a buffer holding a full batch or a request that waited long enough, and return its type."""
+        while True:
+            self._batch_event.clear()
+            now = time.monotonic()
+            deadline = None
+            for service_type, request_lst in self.request_buffer.items():
+                if not request_lst:
                     continue
+                # requests appended straight to request_buffer are timed from when they are first seen
+                expire_at = request_lst[0].setdefault("time", now) + self.dynamic_batching_timeout
+                if len(request_lst) >= self.dynamic_batching_max_batch_size or expire_at <= now:
+                    return service_type
+                deadline = expire_at if deadline is None else min(deadline, expire_at)
+            # with an empty buffer still wake up once in a while, for the requests queued without batch_request()
+            timeout = self.dynamic_batching_timeout if deadline is None else deadline - now
+            try:
+                await asyncio.wait_for(self._batch_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_batch(self, service_type: Enum, batch: list[dict]):
+        try:
+            batch_start = time.monotonic()
+            for req in batch:
+                req.setdefault("time", batch_start)
+            _batching_metrics.batch_update(self.name, batch, batch_start)
+            try:
                 results = await self.dynamic_batching_infer(service_type, batch)
+            except Exception as e:
+                logger.error(f"Dynamic batching inference failed: {e}")
+                for req in batch:
+                    if not req["response"].done():
+                        req["response"].set_exception(e)
+                return
 
-                for req, result in zip(batch, results):
+            for req, result in zip(batch, results):
+                # the request may have been cancelled while waiting
+                if req["response"].done():
+                    continue
+                if isinstance(result, Exception):
+                    req["response"].set_exception(result)
+                else:
                     req["response"].set_result(result)
+        finally:
+            self._batch_slots.release()
 
     async def dynamic_batching_infer(self, service_type: Enum, batch: list[dict]):
-        """Need to implement."""
+        """Need to implement, returning the result of each request of the batch or the exception it failed with."""
         raise NotImplementedError("Unimplemented dynamic batching inference!")
 
     def _validate_env(self):
@@ -139,6 +239,12 @@ class MicroService(HTTPService):
     def endpoint_path(self):
         return f"{self.protocol}://{self.host}:{self.port}{self.endpoint}"
 
+    @property
+    def endpoint_paths(self):
+        if not self.replicas:
+            return [self.endpoint_path]
+        return [f"{self.protocol}://{replica}{self.endpoint}" for replica in self.replicas]
+
 
 def register_microservice(
     name: str,
@@ -156,8 +262,9 @@ def register_microservice(
     provider_endpoint: Optional[str] = None,
     methods: List[str] = ["POST"],
     dynamic_batching: bool = False,
-    dynamic_batching_timeout: int = 1,
+    dynamic_batching_timeout: float = 0.05,
     dynamic_batching_max_batch_size: int = 32,
+    workers: Optional[int] = None,
 ):
     def decorator(func):
         if name not in opea_microservices:
@@ -178,6 +285,7 @@ def register_microservice(
                 dynamic_batching=dynamic_batching,
                 dynamic_batching_timeout=dynamic_batching_timeout,
                 dynamic_batching_max_batch_size=dynamic_batching_max_batch_size,
+                workers=workers,
             )
             opea_microservices[name] = micro_service
         opea_microservices[name].app.router.add_api_route(endpoint, func, methods=methods)
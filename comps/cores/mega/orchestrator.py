@@ -3,29 +3,58 @@
 
 import asyncio
 import contextlib
-import copy
+import contextvars
+import inspect
 import json
 import os
 import re
 import threading
 import time
-from typing import Dict, List
+import typing
+from typing import Callable, Dict, List, Optional
 
 import aiohttp
-import requests
-from fastapi.responses import StreamingResponse
-from prometheus_client import Gauge, Histogram
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import Counter, Gauge, Histogram
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 from ..proto.docarray import LLMParams
-from ..telemetry.opea_telemetry import opea_telemetry, tracer
+from ..telemetry.opea_telemetry import TELEMETRY_IN_MEMORY, opea_telemetry, tracer
+from .admission import AdmissionController
+from .cache import ResultCache, canonical_hash
 from .constants import ServiceType
-from .dag import DAG
+from .dag import DAG, RuntimeGraph
+from .load_balancer import LEAST_PENDING, ReplicaPool
 from .logger import CustomLogger
 
 logger = CustomLogger("comps-core-orchestrator")
 LOGFLAG = os.getenv("LOGFLAG", False)
-ENABLE_OPEA_TELEMETRY = bool(os.environ.get("TELEMETRY_ENDPOINT"))
+ENABLE_OPEA_TELEMETRY = bool(os.environ.get("TELEMETRY_ENDPOINT")) or TELEMETRY_IN_MEMORY
+# connection pool shared by all the requests of one orchestrator, 0 means no limit
+CONNECTION_LIMIT = int(os.getenv("MEGASERVICE_CONNECTION_LIMIT", 0))
+CONNECTION_LIMIT_PER_HOST = int(os.getenv("MEGASERVICE_CONNECTION_LIMIT_PER_HOST", 100))
+KEEPALIVE_TIMEOUT = float(os.getenv("MEGASERVICE_KEEPALIVE_TIMEOUT", 60))
+DNS_CACHE_TTL = int(os.getenv("MEGASERVICE_DNS_CACHE_TTL", 300))
+# admission control, MEGASERVICE_MAX_CONCURRENCY=0 admits every request at once
+MAX_CONCURRENCY = int(os.getenv("MEGASERVICE_MAX_CONCURRENCY", 0))
+MAX_QUEUE_SIZE = int(os.getenv("MEGASERVICE_MAX_QUEUE_SIZE", 0))
+QUEUE_TIMEOUT = float(os.getenv("MEGASERVICE_QUEUE_TIMEOUT", 0))
+# call the microservices registered in the orchestrator process without going through HTTP
+IN_PROCESS_DISPATCH = os.getenv("MEGASERVICE_IN_PROCESS_DISPATCH", "false").lower() in ("true", "1")
+# passive health check of the replicas of a service
+REPLICA_MAX_FAILS = int(os.getenv("MEGASERVICE_REPLICA_MAX_FAILS", 3))
+REPLICA_FAIL_TIMEOUT = float(os.getenv("MEGASERVICE_REPLICA_FAIL_TIMEOUT", 30))
+# max number of sentences of one stream buffered for each of its downstream nodes
+STREAM_BUFFER_SIZE = int(os.getenv("MEGASERVICE_STREAM_BUFFER_SIZE", 16))
+# max number of sentences of one stream processed by its downstream node at the same time
+STREAM_DOWNSTREAM_WINDOW = int(os.getenv("MEGASERVICE_STREAM_DOWNSTREAM_WINDOW", 4))
+# punctuation that closes a sentence forwarded from a stream to its downstream node
+SENTENCE_PATTERN = re.compile(r".*?[.?!。，！]", re.DOTALL)
+# finishes the request scheduled in the current context, set by ServiceOrchestrator.schedule
+_request_finish = contextvars.ContextVar("request_finish", default=None)
 
 
 class OrchestratorMetrics:
@@ -39,11 +68,18 @@ class OrchestratorMetrics:
         self.inter_token_latency = None
         self.request_latency = None
         self.request_pending = None
+        self.queue_depth = None
+        self.queue_wait_time = None
+        self.request_rejected = None
+        self.cache_hits = None
+        self.cache_misses = None
 
         # initial methods to create the metrics
         self.token_update = self._token_update_create
         self.request_update = self._request_update_create
         self.pending_update = self._pending_update_create
+        self.queue_update = self._queue_update_create
+        self.cache_update = self._cache_update_create
 
     def _token_update_create(self, token_start: float, is_first: bool) -> float:
         with self._lock:
@@ -78,6 +114,35 @@ class OrchestratorMetrics:
                 self.pending_update = self._pending_update_real
         self.pending_update(increase)
 
+    def _queue_update_create(self, depth: int, wait_time: float, rejected: bool) -> None:
+        with self._lock:
+            # in case another thread already got here
+            if self.queue_update == self._queue_update_create:
+                self.queue_depth = Histogram(
+                    "megaservice_queue_depth",
+                    "Requests waiting for admission when a request arrives (histogram)",
+                    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+                )
+                self.queue_wait_time = Histogram(
+                    "megaservice_queue_wait_time", "Time a request waited for admission (histogram)"
+                )
+                self.request_rejected = Counter(
+                    "megaservice_request_rejected", "Count of requests shed by admission control (counter)"
+                )
+                self.queue_update = self._queue_update_real
+        self.queue_update(depth, wait_time, rejected)
+
+    def _cache_update_create(self, node: str, hit: bool) -> None:
+        with self._lock:
+            # in case another thread already got here
+            if self.cache_update == self._cache_update_create:
+                self.cache_hits = Counter("megaservice_cache_hits", "Count of node results served from cache", ["node"])
+                self.cache_misses = Counter(
+                    "megaservice_cache_misses", "Count of node results missing from cache", ["node"]
+                )
+                self.cache_update = self._cache_update_real
+        self.cache_update(node, hit)
+
     def _token_update_real(self, token_start: float, is_first: bool) -> float:
         now = time.monotonic()
         if is_first:
@@ -95,6 +160,18 @@ class OrchestratorMetrics:
         else:
             self.request_pending.dec()
 
+    def _cache_update_real(self, node: str, hit: bool) -> None:
+        if hit:
+            self.cache_hits.labels(node).inc()
+        else:
+            self.cache_misses.labels(node).inc()
+
+    def _queue_update_real(self, depth: int, wait_time: float, rejected: bool) -> None:
+        self.queue_depth.observe(depth)
+        self.queue_wait_time.observe(wait_time)
+        if rejected:
+            self.request_rejected.inc()
+
 
 # Prometheus metrics need to be singletons, not per Orchestrator
 _metrics = OrchestratorMetrics()
@@ -103,9 +180,54 @@ _metrics = OrchestratorMetrics()
 class ServiceOrchestrator(DAG):
     """Manage 1 or N micro services in a DAG through Python API."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        connection_limit: int = CONNECTION_LIMIT,
+        connection_limit_per_host: int = CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        stream_downstream_window: int = STREAM_DOWNSTREAM_WINDOW,
+        stream_buffer_size: int = STREAM_BUFFER_SIZE,
+        replica_max_fails: int = REPLICA_MAX_FAILS,
+        replica_fail_timeout: float = REPLICA_FAIL_TIMEOUT,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        in_process_dispatch: bool = IN_PROCESS_DISPATCH,
+    ) -> None:
+        """Init the orchestrator.
+
+        :param connection_limit: max number of open connections to all the services, 0 means no limit
+        :param connection_limit_per_host: max number of open connections to one service host, 0 means no limit
+        :param keepalive_timeout: seconds an idle connection is kept open for reuse
+        :param dns_cache_ttl: seconds a resolved service host is cached
+        :param stream_downstream_window: max number of sentences of a stream in flight to its downstream node
+        :param stream_buffer_size: max number of sentences of a stream buffered for each of its downstream nodes
+        :param replica_max_fails: consecutive failed requests after which a service replica is ejected
+        :param replica_fail_timeout: seconds an ejected service replica receives no requests
+        :param max_concurrency: max number of requests scheduled at the same time, 0 means no limit
+        :param max_queue_size: max number of requests waiting to be scheduled, more are rejected with HTTP 429
+        :param queue_timeout: max seconds a request waits to be scheduled before HTTP 429, 0 means no timeout
+        :param in_process_dispatch: call the handlers of the microservices registered in this process directly
+        """
         self.metrics = _metrics
         self.services = {}  # all services, id -> service
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.stream_downstream_window = stream_downstream_window
+        self.stream_buffer_size = stream_buffer_size
+        self.replica_max_fails = replica_max_fails
+        self.replica_fail_timeout = replica_fail_timeout
+        self._replica_pools = {}  # node -> ReplicaPool
+        self._caches = {}  # node -> ResultCache
+        self.in_process_dispatch = in_process_dispatch
+        self._local_handlers = {}  # node -> (handler, request type, response type) or None
+        self.admission = AdmissionController(max_concurrency, max_queue_size, queue_timeout)
+        self._session = None
+        self._session_loop = None
+        self._background_tasks = set()
         super().__init__()
 
     def add(self, service):
@@ -124,82 +246,235 @@ class ServiceOrchestrator(DAG):
             logger.error(e)
             return False
 
+    def enable_cache(self, service, max_size: int = 1024, ttl: Optional[float] = 600, redis_url: Optional[str] = None):
+        """Memoize the results of a deterministic service, keyed by its inputs.
+
+        A cache hit skips the request to the service. Streaming LLM/LVM requests are never cached.
+
+        :param service: the service added to the orchestrator
+        :param max_size: max number of results kept in memory, the least recently used are evicted
+        :param ttl: seconds a result is kept, None keeps it until it is evicted
+        :param redis_url: share the results with other orchestrator processes through this Redis server
+        """
+        if service.name not in self.services:
+            raise Exception(f"Service {service.name} does not exist!")
+        self._caches[service.name] = ResultCache(max_size=max_size, ttl=ttl, redis_url=redis_url)
+        return self
+
+    def local_handler(self, node: str):
+        """Get the handler of a microservice registered in this process, None if it must be reached over HTTP.
+
+        Only handlers taking a single pydantic request are called in-process, and only when
+        `in_process_dispatch` is enabled.
+
+        :return: (handler coroutine function, request type, response type or None)
+        """
+        if node in self._local_handlers:
+            return self._local_handlers[node]
+        local_handler = None
+        service = self.services[node]
+        if self.in_process_dispatch and not getattr(service, "use_remote_service", True) and hasattr(service, "app"):
+            for route in service.app.routes:
+                if getattr(route, "path", None) != service.endpoint or "POST" not in getattr(route, "methods", ()):
+                    continue
+                handler = route.endpoint
+                params = list(inspect.signature(handler).parameters.values())
+                try:
+                    hints = typing.get_type_hints(handler)
+                except Exception:
+                    break
+                request_type = hints.get(params[0].name) if len(params) == 1 else None
+                response_type = hints.get("return")
+                if (
+                    inspect.iscoroutinefunction(handler)
+                    and inspect.isclass(request_type)
+                    and issubclass(request_type, BaseModel)
+                ):
+                    if not (inspect.isclass(response_type) and issubclass(response_type, BaseModel)):
+                        response_type = None
+                    local_handler = (handler, request_type, response_type)
+                break
+        self._local_handlers[node] = local_handler
+        return local_handler
+
+    async def call_local_handler(self, local_handler, inputs):
+        """Call the handler of a microservice of this process, skipping serialization and the HTTP hop."""
+        handler, request_type, response_type = local_handler
+        request = inputs if isinstance(inputs, request_type) else request_type.model_validate(inputs)
+        result = await handler(request)
+        if isinstance(result, Response):
+            if result.media_type == "application/json":
+                return json.loads(result.body)
+            return result.body
+        if response_type is not None and isinstance(result, dict):
+            # validate like FastAPI does with the response model of the route
+            result = response_type.model_validate(result)
+        return jsonable_encoder(result)
+
+    def replica_pool(self, node: str) -> ReplicaPool:
+        """Get the pool balancing the requests of a node over the replicas of its service."""
+        pool = self._replica_pools.get(node)
+        if pool is None:
+            service = self.services[node]
+            pool = ReplicaPool(
+                service.endpoint_paths,
+                strategy=getattr(service, "load_balancing", LEAST_PENDING),
+                max_fails=self.replica_max_fails,
+                fail_timeout=self.replica_fail_timeout,
+            )
+            self._replica_pools[node] = pool
+        return pool
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        """Get the pooled client session, creating it on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            timeout = aiohttp.ClientTimeout(total=1000)
+            # the microservices are reached directly, not through the proxies of the env
+            self._session = aiohttp.ClientSession(connector=connector, trust_env=False, timeout=timeout)
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the pooled connections to the services."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _admit(self, priority: int):
+        """Wait for admission control to let the request in, raising HTTPException(429) when it is shed."""
+        if not self.admission.enabled:
+            return
+        depth = self.admission.queued
+        wait_start = time.monotonic()
+        try:
+            await self.admission.acquire(priority)
+        except HTTPException:
+            self.metrics.queue_update(depth, time.monotonic() - wait_start, True)
+            raise
+        self.metrics.queue_update(depth, time.monotonic() - wait_start, False)
+
+    def _finish_request(self):
+        self.metrics.pending_update(False)
+        if self.admission.enabled:
+            self.admission.release()
+
+    def _request_finisher(self) -> Callable[[], None]:
+        """Get the callable finishing a request, which only releases its admission slot on its first call."""
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                self._finish_request()
+
+        return finish
+
     @opea_telemetry
-    async def schedule(self, initial_inputs: Dict | BaseModel, llm_parameters: LLMParams = LLMParams(), **kwargs):
+    async def schedule(
+        self,
+        initial_inputs: Dict | BaseModel,
+        llm_parameters: LLMParams = LLMParams(),
+        priority: int = 0,
+        **kwargs,
+    ):
         req_start = time.monotonic()
+        await self._admit(priority)
         self.metrics.pending_update(True)
+        # the streams of the request may finish it from other tasks, or once their response is sent
+        finish = self._request_finisher()
+        finish_token = _request_finish.set(finish)
 
         result_dict = {}
-        runtime_graph = DAG()
-        runtime_graph.graph = copy.deepcopy(self.graph)
+        # per request overlay of the cached plan, the orchestrator graph itself is never copied
+        plan = self.execution_plan()
+        runtime_graph = RuntimeGraph(plan)
+        countdown = list(plan.in_degree)  # number of predecessors each node still waits for
+        fed = set()  # nodes with at least one finished predecessor that did not skip them
         if LOGFLAG:
             logger.info(initial_inputs)
 
-        timeout = aiohttp.ClientTimeout(total=1000)
-        async with aiohttp.ClientSession(trust_env=True, timeout=timeout) as session:
-            pending = {
-                asyncio.create_task(
-                    self.execute(session, req_start, node, initial_inputs, runtime_graph, llm_parameters, **kwargs)
+        streaming = False  # a stream returned by execute() finishes the request once it has been read
+        try:
+            session = self._client_session()
+
+            def create_task(node, inputs):
+                return asyncio.create_task(
+                    self.execute(session, req_start, node, inputs, runtime_graph, llm_parameters, **kwargs)
                 )
-                for node in self.ind_nodes()
-            }
-            ind_nodes = self.ind_nodes()
+
+            pending = {create_task(plan.nodes[i], initial_inputs) for i in plan.ind_nodes}
 
             while pending:
                 done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
                 for done_task in done:
-                    response, node = await done_task
-                    result_dict[node] = response
-
-                    # traverse the current node's downstream nodes and execute if all one's predecessors are finished
-                    downstreams = runtime_graph.downstream(node)
-
-                    # remove all the black nodes that are skipped to be forwarded to
-                    if not isinstance(response, StreamingResponse) and "downstream_black_list" in response:
-                        for black_node in response["downstream_black_list"]:
-                            for downstream in reversed(downstreams):
-                                try:
-                                    if re.findall(black_node, downstream):
-                                        if LOGFLAG:
-                                            logger.info(f"skip forwardding to {downstream}...")
-                                        runtime_graph.delete_edge(node, downstream)
-                                        downstreams.remove(downstream)
-                                except re.error as e:
-                                    logger.error("Pattern invalid! Operation cancelled.")
-                            if len(downstreams) == 0 and llm_parameters.stream:
-                                # turn the response to a StreamingResponse
-                                # to make the response uniform to UI
-                                def fake_stream(text):
-                                    yield "data: b'" + text + "'\n\n"
-                                    yield "data: [DONE]\n\n"
-
-                                result_dict[node] = StreamingResponse(
-                                    fake_stream(response["text"]), media_type="text/event-stream"
-                                )
-
-                    for d_node in downstreams:
-                        if all(i in result_dict for i in runtime_graph.predecessors(d_node)):
-                            inputs = self.process_outputs(runtime_graph.predecessors(d_node), result_dict)
-                            pending.add(
-                                asyncio.create_task(
-                                    self.execute(
-                                        session, req_start, d_node, inputs, runtime_graph, llm_parameters, **kwargs
+                    outputs, nodes = await done_task
+                    # a stream teed to several downstream nodes finishes all of them at once
+                    if not isinstance(nodes, list):
+                        outputs, nodes = [outputs], [nodes]
+                    for response, node in zip(outputs, nodes):
+                        result_dict[node] = response
+                        streaming = streaming or isinstance(response, StreamingResponse)
+
+                        downstreams = runtime_graph.downstream(node)
+
+                        # remove all the black nodes that are skipped to be forwarded to
+                        if not isinstance(response, StreamingResponse) and "downstream_black_list" in response:
+                            for black_node in response["downstream_black_list"]:
+                                for downstream in reversed(downstreams):
+                                    try:
+                                        if re.findall(black_node, downstream):
+                                            if LOGFLAG:
+                                                logger.info(f"skip forwardding to {downstream}...")
+                                            runtime_graph.delete_edge(node, downstream)
+                                            downstreams.remove(downstream)
+                                    except re.error as e:
+                                        logger.error("Pattern invalid! Operation cancelled.")
+                                if len(downstreams) == 0 and llm_parameters.stream:
+                                    # turn the response to a StreamingResponse
+                                    # to make the response uniform to UI
+                                    def fake_stream(text):
+                                        yield "data: b'" + text + "'\n\n"
+                                        yield "data: [DONE]\n\n"
+
+                                    result_dict[node] = StreamingResponse(
+                                        fake_stream(response["text"]), media_type="text/event-stream"
                                     )
-                                )
-                            )
-        nodes_to_keep = []
-        for i in ind_nodes:
-            nodes_to_keep.append(i)
-            nodes_to_keep.extend(runtime_graph.all_downstreams(i))
 
-        all_nodes = list(runtime_graph.graph.keys())
-
-        for node in all_nodes:
-            if node not in nodes_to_keep:
-                runtime_graph.delete_node_if_exists(node)
-
-        if not llm_parameters.stream:
-            self.metrics.pending_update(False)
+                        # count down the downstream nodes and execute those whose predecessors are all finished,
+                        # a node that every predecessor skipped is skipped in turn
+                        settled = [(plan.index[node], True)]
+                        while settled:
+                            i, executed = settled.pop()
+                            for j in plan.successors[i]:
+                                if executed and (i, j) not in runtime_graph.pruned_edges:
+                                    fed.add(j)
+                                countdown[j] -= 1
+                                if countdown[j] == 0:
+                                    d_node = plan.nodes[j]
+                                    if j in fed:
+                                        inputs = self.process_outputs(runtime_graph.predecessors(d_node), result_dict)
+                                        pending.add(create_task(d_node, inputs))
+                                    else:
+                                        runtime_graph.delete_node(d_node)
+                                        settled.append((j, False))
+
+            runtime_graph.keep_reachable()
+        except BaseException:
+            # the streams of a failed request are never returned
+            finish()
+            raise
+        finally:
+            _request_finish.reset(finish_token)
+            if not streaming:
+                finish()
 
         return result_dict, runtime_graph
 
@@ -230,6 +505,24 @@ class ServiceOrchestrator(DAG):
                     except Exception as e:
                         raise e
 
+    async def wrap_async_iterable(self, aiterable, is_first=True):
+
+        with tracer.start_as_current_span("llm_generate_stream") if ENABLE_OPEA_TELEMETRY else contextlib.nullcontext():
+            iterator = aiterable.__aiter__()
+            while True:
+                with (
+                    tracer.start_as_current_span("llm_generate_stream_first_token")
+                    if is_first and ENABLE_OPEA_TELEMETRY
+                    else contextlib.nullcontext()
+                ):
+                    try:
+                        token = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        # Exiting the iterable loop cleanly
+                        break
+                yield token
+                is_first = False
+
     @opea_telemetry
     async def execute(
         self,
@@ -242,7 +535,8 @@ class ServiceOrchestrator(DAG):
         **kwargs,
     ):
         # send the cur_node request/reply
-        endpoint = self.services[cur_node].endpoint_path
+        pool = self.replica_pool(cur_node)
+        finish = _request_finish.get() or (lambda: None)
         llm_parameters_dict = llm_parameters.dict()
 
         is_llm_vlm = self.services[cur_node].service_type in (ServiceType.LLM, ServiceType.LVM)
@@ -255,7 +549,6 @@ class ServiceOrchestrator(DAG):
         inputs = self.align_inputs(inputs, cur_node, runtime_graph, llm_parameters_dict, **kwargs)
 
         if is_llm_vlm and llm_parameters.stream:
-            # Still leave to sync requests.post for StreamingResponse
             if LOGFLAG:
                 logger.info(inputs)
             with (
@@ -263,60 +556,64 @@ class ServiceOrchestrator(DAG):
                 if ENABLE_OPEA_TELEMETRY
                 else contextlib.nullcontext()
             ):
-                response = requests.post(
-                    url=endpoint,
-                    data=json.dumps(inputs),
-                    headers={"Content-type": "application/json"},
-                    proxies={"http": None},
-                    stream=True,
-                    timeout=1000,
-                )
+                replica = pool.acquire()
+                try:
+                    response = await session.post(replica.endpoint, json=inputs)
+                except Exception:
+                    pool.release(replica, failed=True)
+                    raise
+
+            released = False
+
+            def release():
+                # the replica is busy until the whole stream is read, it is given back once
+                nonlocal released
+                if not released:
+                    released = True
+                    response.release()
+                    pool.release(replica, failed=response.status >= 500)
+
             downstream = runtime_graph.downstream(cur_node)
             if downstream:
-                assert len(downstream) == 1, "Not supported multiple stream downstreams yet!"
-                cur_node = downstream[0]
-                hitted_ends = [".", "?", "!", "。", "，", "！"]
-                downstream_endpoint = self.services[downstream[0]].endpoint_path
-
-            def generate():
+                streams = [
+                    StreamingResponse(
+                        self.align_stream(stream, **kwargs),
+                        media_type="text/event-stream",
+                        background=BackgroundTask(finish),
+                    )
+                    for stream in self.tee_stream(
+                        session, req_start, response, downstream, on_close=release, on_finish=finish
+                    )
+                ]
+                if len(downstream) == 1:
+                    return streams[0], downstream[0]
+                return streams, downstream
+
+            async def generate():
                 token_start = req_start
-                if response:
-                    # response.elapsed = time until first headers received
-                    buffered_chunk_str = ""
-                    is_first = True
-                    for chunk in self.wrap_iterable(response.iter_content(chunk_size=None)):
+                is_first = True
+                try:
+                    async for chunk in self.wrap_async_iterable(response.content.iter_any()):
                         if chunk:
-                            if downstream:
-                                chunk = chunk.decode("utf-8")
-                                buffered_chunk_str += self.extract_chunk_str(chunk)
-                                is_last = chunk.endswith("[DONE]\n\n")
-                                if (buffered_chunk_str and buffered_chunk_str[-1] in hitted_ends) or is_last:
-                                    res = requests.post(
-                                        url=downstream_endpoint,
-                                        data=json.dumps({"text": buffered_chunk_str}),
-                                        proxies={"http": None},
-                                    )
-                                    res_json = res.json()
-                                    if "text" in res_json:
-                                        res_txt = res_json["text"]
-                                    else:
-                                        raise Exception("Other response types not supported yet!")
-                                    buffered_chunk_str = ""  # clear
-                                    yield from self.token_generator(
-                                        res_txt, token_start, is_first=is_first, is_last=is_last
-                                    )
-                                    token_start = time.monotonic()
-                                    is_first = False
-                            else:
-                                token_start = self.metrics.token_update(token_start, is_first)
-                                is_first = False
-                                yield chunk
-
+                            token_start = self.metrics.token_update(token_start, is_first)
+                            is_first = False
+                            yield chunk
                     self.metrics.request_update(req_start)
-                    self.metrics.pending_update(False)
+                finally:
+                    close()
 
+            def close():
+                release()
+                finish()
+
+            # the generator of a response whose client left before it started never runs, the response releases
+            # the replica and finishes the request once it is closed
             return (
-                StreamingResponse(self.align_generator(generate(), **kwargs), media_type="text/event-stream"),
+                StreamingResponse(
+                    self.align_stream(generate(), **kwargs),
+                    media_type="text/event-stream",
+                    background=BackgroundTask(close),
+                ),
                 cur_node,
             )
         else:
@@ -329,24 +626,204 @@ class ServiceOrchestrator(DAG):
             else:
                 input_data = inputs
 
-            with (
-                tracer.start_as_current_span(f"{cur_node}_generate")
-                if ENABLE_OPEA_TELEMETRY
-                else contextlib.nullcontext()
-            ):
-                response = await session.post(endpoint, json=input_data)
+            cache = self._caches.get(cur_node)
+            data = None
+            if cache is not None:
+                cache_key = f"{cur_node}:{canonical_hash(input_data)}"
+                data = await cache.get(cache_key)
+                self.metrics.cache_update(cur_node, data is not None)
 
-            if response.content_type == "audio/wav":
-                audio_data = await response.read()
-                data = self.align_outputs(audio_data, cur_node, inputs, runtime_graph, llm_parameters_dict, **kwargs)
-            else:
-                # Parse as JSON
-                data = await response.json()
-                # post process
-                data = self.align_outputs(data, cur_node, inputs, runtime_graph, llm_parameters_dict, **kwargs)
+            local_handler = self.local_handler(cur_node) if data is None else None
+            if local_handler is not None:
+                with (
+                    tracer.start_as_current_span(f"{cur_node}_generate")
+                    if ENABLE_OPEA_TELEMETRY
+                    else contextlib.nullcontext()
+                ):
+                    data = await self.call_local_handler(local_handler, inputs)
+                if cache is not None and not isinstance(data, bytes):
+                    await cache.set(cache_key, data)
+            elif data is None:
+                replica = pool.acquire()
+                failed = True
+                try:
+                    with (
+                        tracer.start_as_current_span(f"{cur_node}_generate")
+                        if ENABLE_OPEA_TELEMETRY
+                        else contextlib.nullcontext()
+                    ):
+                        response = await session.post(replica.endpoint, json=input_data)
+
+                    if response.content_type == "audio/wav":
+                        data = await response.read()
+                    else:
+                        # Parse as JSON
+                        data = await response.json()
+                    failed = response.status >= 500
+                finally:
+                    pool.release(replica, failed=failed)
+
+                if cache is not None and response.status < 400 and not isinstance(data, bytes):
+                    await cache.set(cache_key, data)
+
+            # post process
+            data = self.align_outputs(data, cur_node, inputs, runtime_graph, llm_parameters_dict, **kwargs)
 
             return data, cur_node
 
+    async def read_sentences(self, response: aiohttp.ClientResponse):
+        """Read a LLM/LVM stream as (sentence, is_last) pairs."""
+        buffered_chunk_str = ""
+        async for chunk in self.wrap_async_iterable(response.content.iter_any()):
+            if chunk:
+                # one network read may carry several SSE events
+                chunk = chunk.decode("utf-8")
+                for event in re.split(r"(?<=\n\n)", chunk):
+                    buffered_chunk_str += self.extract_chunk_str(event)
+                is_last = chunk.endswith("[DONE]\n\n")
+                sentences, buffered_chunk_str = self.split_sentences(buffered_chunk_str)
+                if is_last:
+                    sentences.append(buffered_chunk_str)
+                    buffered_chunk_str = ""
+                for i, sentence in enumerate(sentences):
+                    yield sentence, is_last and i == len(sentences) - 1
+        if buffered_chunk_str:
+            # the stream ended without [DONE], flush the unfinished sentence
+            yield buffered_chunk_str, False
+
+    async def forward_sentence(self, session: aiohttp.ClientSession, node: str, text: str) -> str:
+        pool = self.replica_pool(node)
+        replica = pool.acquire()
+        failed = True
+        try:
+            res = await session.post(replica.endpoint, json={"text": text})
+            res_json = await res.json()
+            failed = res.status >= 500
+        finally:
+            pool.release(replica, failed=failed)
+        if "text" in res_json:
+            return res_json["text"]
+        raise Exception("Other response types not supported yet!")
+
+    def tee_stream(
+        self,
+        session: aiohttp.ClientSession,
+        req_start: float,
+        response,
+        downstream: List[str],
+        on_close: Optional[Callable] = None,
+        on_finish: Optional[Callable] = None,
+    ) -> List:
+        """Fan the sentences of a LLM/LVM stream out to its downstream nodes.
+
+        Each downstream node buffers at most `stream_buffer_size` sentences, so the slowest node paces the
+        reading of the stream. Its sentences are forwarded concurrently within `stream_downstream_window`
+        and the results are emitted in the original order. The nodes run whether or not their stream is read,
+        a node whose stream is closed early stops consuming.
+
+        :param on_close: called once the stream has been read
+        :param on_finish: called once the first downstream node is done, to finish the request
+        :return: one async generator of SSE tokens per downstream node
+        """
+        inputs = {node: asyncio.Queue(self.stream_buffer_size) for node in downstream}
+        outputs = {node: asyncio.Queue() for node in downstream}
+
+        def drop(node):
+            """Stop feeding a node that finished or failed, the reader skips it from now on."""
+            queue = inputs.pop(node, None)
+            if queue is None:
+                return
+            # unblock the reader if it waits for room in this buffer
+            while not queue.empty():
+                queue.get_nowait()
+            if not inputs:
+                reader.cancel()
+
+        async def read():
+            try:
+                async for item in self.read_sentences(response):
+                    for queue in list(inputs.values()):
+                        await queue.put(item)
+                item = None
+            except Exception as e:
+                item = e
+            finally:
+                if on_close is not None:
+                    on_close()
+                else:
+                    response.release()
+            for queue in list(inputs.values()):
+                await queue.put(item)
+
+        async def consume(node, is_primary):
+            window = asyncio.Semaphore(self.stream_downstream_window)
+            in_flight = asyncio.Queue()
+
+            async def dispatch():
+                # forward sentence N+1 while sentence N is still processed downstream
+                while True:
+                    item = await inputs[node].get()
+                    if item is None or isinstance(item, Exception):
+                        await in_flight.put(item)
+                        return
+                    sentence, is_last = item
+                    await window.acquire()
+                    await in_flight.put((asyncio.create_task(self.forward_sentence(session, node, sentence)), is_last))
+
+            dispatcher = asyncio.create_task(dispatch())
+            token_start = req_start
+            is_first = True
+            result = None
+            try:
+                while (item := await in_flight.get()) is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    task, is_last = item
+                    res_txt = await task
+                    window.release()
+                    for token in self.token_generator(
+                        res_txt, token_start, is_first=is_first, is_last=is_last, update_metrics=is_primary
+                    ):
+                        outputs[node].put_nowait(token)
+                    token_start = time.monotonic()
+                    is_first = False
+            except Exception as e:
+                result = e
+            finally:
+                dispatcher.cancel()
+                drop(node)
+                while not in_flight.empty():
+                    item = in_flight.get_nowait()
+                    if isinstance(item, tuple):
+                        item[0].cancel()
+                if is_primary:
+                    self.metrics.request_update(req_start)
+                    if on_finish is not None:
+                        on_finish()
+                outputs[node].put_nowait(result)
+
+        reader = asyncio.create_task(read())
+        consumers = {node: asyncio.create_task(consume(node, i == 0)) for i, node in enumerate(downstream)}
+        # the streams of some nodes may never be read, keep their tasks alive until they are done
+        for task in (reader, *consumers.values()):
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+        async def stream(node):
+            done = False
+            try:
+                while (token := await outputs[node].get()) is not None:
+                    if isinstance(token, Exception):
+                        raise token
+                    yield token
+                done = True
+            finally:
+                if not done:
+                    consumers[node].cancel()
+                    drop(node)
+
+        return [stream(node) for node in downstream]
+
     def align_inputs(self, inputs, *args, **kwargs):
         """Override this method in megaservice definition."""
         return inputs
@@ -356,9 +833,33 @@ class ServiceOrchestrator(DAG):
         return data
 
     def align_generator(self, gen, *args, **kwargs):
-        """Override this method in megaservice definition."""
+        """Override this method in megaservice definition.
+
+        Async generator overrides get the stream of a LLM/LVM node as an async generator. Other overrides get it
+        as a blocking iterator, and are run in a worker thread by the StreamingResponse.
+        """
         return gen
 
+    def align_stream(self, gen, *args, **kwargs):
+        """Apply align_generator to the async generator of a LLM/LVM stream."""
+        align_generator = type(self).align_generator
+        if align_generator is ServiceOrchestrator.align_generator or inspect.isasyncgenfunction(align_generator):
+            return self.align_generator(gen, *args, **kwargs)
+        return self.align_generator(self._blocking_iterator(gen, asyncio.get_running_loop()), *args, **kwargs)
+
+    @staticmethod
+    def _blocking_iterator(agen, loop: asyncio.AbstractEventLoop):
+        """Iterate an async generator from a thread other than the one running its event loop."""
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            # do not wait, the iterator may be closed by the event loop thread itself
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop)
+
     def get_all_final_outputs(self, result_dict, runtime_graph):
         final_output_dict = {}
         for leaf in runtime_graph.all_leaves():
@@ -378,12 +879,20 @@ class ServiceOrchestrator(DAG):
             chunk_str = chunk_str[: -len(suffix)]
         return chunk_str
 
-    def token_generator(self, sentence: str, token_start: float, is_first: bool, is_last: bool) -> str:
+    def split_sentences(self, text: str):
+        """Split the complete sentences off ``text``, returning them with the unfinished remainder."""
+        sentences = SENTENCE_PATTERN.findall(text)
+        return sentences, text[sum(len(sentence) for sentence in sentences) :]
+
+    def token_generator(
+        self, sentence: str, token_start: float, is_first: bool, is_last: bool, update_metrics: bool = True
+    ) -> str:
         prefix = "data: "
         suffix = "\n\n"
         tokens = re.findall(r"\s?\S+\s?", sentence, re.UNICODE)
         for token in tokens:
-            token_start = self.metrics.token_update(token_start, is_first)
+            if update_metrics:
+                token_start = self.metrics.token_update(token_start, is_first)
             yield prefix + repr(token.replace("\\n", "\n").encode("utf-8")) + suffix
             is_first = False
         if is_last:
@@ -1,15 +1,16 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import json
+import asyncio
 import re
 from collections import OrderedDict
 from typing import Dict, List, Tuple
 
-import requests
+import aiohttp
 import yaml
 
 from .dag import DAG
+from .orchestrator import CONNECTION_LIMIT, CONNECTION_LIMIT_PER_HOST, DNS_CACHE_TTL, KEEPALIVE_TIMEOUT
 
 
 class ServiceOrchestratorWithYaml(DAG):
@@ -18,17 +19,40 @@ class ServiceOrchestratorWithYaml(DAG):
     def __init__(self, yaml_file_path: str):
         self.yaml_file_path = yaml_file_path
         self.result_dict = {}  # {node: node's dict output}
+        self._session = None
+        self._session_loop = None
         super().__init__()
         self.docs, is_valid = self._load_from_yaml()
         if not is_valid:
             raise Exception("Invalid mega graph!")
 
-    def execute(self, cur_node: str, inputs: Dict):
+    def _client_session(self) -> aiohttp.ClientSession:
+        """Get the pooled client session, creating it on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            timeout = aiohttp.ClientTimeout(total=1000)
+            # the microservices are reached directly, not through the proxies of the env
+            self._session = aiohttp.ClientSession(connector=connector, trust_env=False, timeout=timeout)
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """Close the pooled connections to the services."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def execute(self, session: aiohttp.ClientSession, cur_node: str, inputs: Dict):
         # send the cur_node request/reply
         endpoint = self.docs["opea_micro_services"][cur_node]["endpoint"]
-        response = requests.post(url=endpoint, data=json.dumps(inputs), proxies={"http": None})
-        print(response)
-        return response.json()
+        async with session.post(endpoint, json=inputs) as response:
+            return await response.json()
 
     def get_all_final_outputs(self):
 
@@ -43,13 +67,32 @@ class ServiceOrchestratorWithYaml(DAG):
         return all_outputs
 
     async def schedule(self, initial_inputs: Dict):
-        for node in self.topological_sort():
-            if node in self.ind_nodes():
-                inputs = initial_inputs
-            else:
-                inputs = self.process_outputs(self.predecessors(node))
-            response = self.execute(node, inputs)
-            self.result_dict[node] = response
+        # run every node as soon as all its predecessors are finished
+        plan = self.execution_plan()
+        countdown = list(plan.in_degree)
+        session = self._client_session()
+
+        async def run(i, inputs):
+            return i, await self.execute(session, plan.nodes[i], inputs)
+
+        pending = {asyncio.create_task(run(i, initial_inputs)) for i in plan.ind_nodes}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for done_task in done:
+                    i, response = await done_task
+                    self.result_dict[plan.nodes[i]] = response
+                    for j in plan.successors[i]:
+                        countdown[j] -= 1
+                        if countdown[j] == 0:
+                            inputs = self.process_outputs([plan.nodes[k] for k in plan.predecessors[j]])
+                            pending.add(asyncio.create_task(run(j, inputs)))
+        finally:
+            # a failed node fails the whole request, stop the nodes still running
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
 
     def _load_from_yaml(self):
         """Parse the yaml and output docs, whether the mega graph is valid, the mega graph."""
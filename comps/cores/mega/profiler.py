@@ -0,0 +1,195 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import defaultdict
+from typing import Optional
+
+from prometheus_client import Gauge, Histogram
+
+from .logger import CustomLogger
+
+logger = CustomLogger("comps-core-profiler")
+
+
+class SamplingProfiler:
+    """Sample the stacks of every thread from a background thread, which only exists while profiling.
+
+    The samples are aggregated as collapsed stacks ("thread;outer;...;inner count" lines), the input format of
+    flame graph tools such as flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = defaultdict(int)  # collapsed stack => number of samples
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("the profiler is already running")
+        self.stacks.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="opea-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and get the collapsed stacks."""
+        if not self.running:
+            raise RuntimeError("the profiler is not running")
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+
+def memory_snapshot(limit: int = 25, key_type: str = "lineno") -> dict:
+    """Get the top allocations traced by tracemalloc, which must have been started."""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("memory tracing is not started")
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_memory": {"current": current, "peak": peak},
+        "top": [
+            {"location": str(stat.traceback), "size": stat.size, "count": stat.count}
+            for stat in snapshot.statistics(key_type)[:limit]
+        ],
+    }
+
+
+class EventLoopMonitor:
+    """Measure the scheduling delay of the event loop: how late a sleep wakes up compared to its deadline.
+
+    A watchdog thread also logs the stack of the event loop thread when the loop is blocked for longer than
+    `slow_callback_threshold` seconds, to point at the blocking call. It measures how late the loop runs a
+    heartbeat scheduled every quarter of the threshold, so that a blocking call is caught whenever it starts.
+    With `debug`, asyncio debug mode additionally logs every callback slower than the threshold, at the cost of
+    a slower event loop.
+    """
+
+    _metrics = None
+    _lock = threading.Lock()
+
+    def __init__(self, service: str, interval: float = 0.5, slow_callback_threshold: float = 0.25, debug: bool = False):
+        self.service = service
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.debug = debug
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._beat_interval = max(slow_callback_threshold / 4, 0.005)
+        self._next_beat = None  # monotonic time the next heartbeat is scheduled at
+        self._beat_handle: Optional[asyncio.TimerHandle] = None
+        self._loop_thread = None
+
+    @classmethod
+    def _get_metrics(cls):
+        with cls._lock:
+            # shared by every service of the process
+            if cls._metrics is None:
+                cls._metrics = (
+                    Gauge(
+                        "microservice_event_loop_lag",
+                        "Latest event loop scheduling delay in seconds (gauge)",
+                        ["service"],
+                    ),
+                    Histogram(
+                        "microservice_event_loop_delay",
+                        "Event loop scheduling delay in seconds (histogram)",
+                        ["service"],
+                        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+                    ),
+                )
+        return cls._metrics
+
+    def start(self):
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback_threshold
+        self._loop_thread = threading.get_ident()
+        self._beat()
+        self._task = loop.create_task(self._run())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="opea-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._beat_handle is not None:
+            self._beat_handle.cancel()
+            self._beat_handle = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        gauge, histogram = self._get_metrics()
+        gauge, histogram = gauge.labels(self.service), histogram.labels(self.service)
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+            gauge.set(self.lag)
+            histogram.observe(self.lag)
+
+    def _beat(self):
+        self._next_beat = time.monotonic() + self._beat_interval
+        self._beat_handle = asyncio.get_running_loop().call_later(self._beat_interval, self._beat)
+
+    def _watch(self):
+        reported = None  # scheduled heartbeat of the stall already logged
+        while not self._stop.wait(self._beat_interval):
+            next_beat = self._next_beat
+            # the loop has been blocked since before the scheduled heartbeat, and at most one interval earlier
+            blocked = time.monotonic() - next_beat
+            if blocked < self.slow_callback_threshold - self._beat_interval or reported == next_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported = next_beat
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"Event loop of {self.service} blocked for more than {blocked:.3f}s at:\n{stack}")
@@ -11,6 +11,7 @@ from io import BytesIO
 from socket import AF_INET, SOCK_STREAM, socket
 from typing import List, Optional, Union
 
+import numpy as np
 import requests
 from PIL import Image
 
@@ -263,6 +264,34 @@ class SafeContextManager:
             self.context_to_manage.__exit__(exc_type, exc_val, exc_tb)
 
 
+# dtypes of the embeddings encoded in base64, little endian as in the OpenAI API
+EMBEDDING_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+
+def encode_embedding(embedding, dtype: str = "float32") -> str:
+    """Encode an embedding vector as base64 of its raw bytes.
+
+    :param embedding: The vector, a list of floats or a numpy array.
+    :param dtype: "float32", or "float16" to halve the size at the cost of precision.
+    :return: The base64 string.
+    """
+    return base64.b64encode(np.asarray(embedding, dtype=EMBEDDING_DTYPES[dtype]).tobytes()).decode()
+
+
+def decode_embedding(embedding: Union[str, List[float]], dtype: str = "float32") -> np.ndarray:
+    """Decode an embedding vector sent either as base64 or as a list of floats.
+
+    Base64 vectors are read in place from the decoded bytes, without going through Python floats.
+
+    :param embedding: The base64 string or the list of floats.
+    :param dtype: The dtype of the base64 vector, "float32" or "float16".
+    :return: The read-only vector.
+    """
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=EMBEDDING_DTYPES[dtype])
+    return np.asarray(embedding, dtype=np.float32)
+
+
 def handle_message(messages):
     images = []
     if isinstance(messages, str):
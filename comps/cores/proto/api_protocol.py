@@ -88,6 +88,8 @@ class EmbeddingRequest(BaseModel):
     encoding_format: Optional[str] = Field("float", pattern="^(float|base64)$")
     dimensions: Optional[int] = None
     user: Optional[str] = None
+    # dtype of the base64 embeddings, float16 halves their size
+    embedding_dtype: Optional[str] = Field("float32", pattern="^(float32|float16)$")
 
     # define
     request_type: Literal["embedding"] = "embedding"
@@ -104,10 +106,12 @@ class EmbeddingResponse(BaseModel):
     model: Optional[str] = None
     data: List[EmbeddingResponseData]
     usage: Optional[UsageInfo] = None
+    embedding_dtype: Optional[str] = None  # dtype of the base64 embeddings when not float32
 
 
 class RetrievalRequest(BaseModel):
-    embedding: Union[EmbeddingResponse, List[float]] = None
+    embedding: Union[EmbeddingResponse, List[float], str] = None  # str: base64 encoded vector
+    embedding_dtype: str = Field("float32", pattern="^(float32|float16)$")
     input: Optional[str] = None  # search_type maybe need, like "mmr"
     search_type: str = "similarity"
     k: int = 4
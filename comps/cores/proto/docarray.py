@@ -94,7 +94,9 @@ class DocPath(BaseDoc):
 
 class EmbedDoc(BaseDoc):
     text: Union[str, List[str]]
-    embedding: Union[conlist(float, min_length=0), List[conlist(float, min_length=0)]]
+    # vectors as lists of floats, or base64 encoded in the compact form of embedding_dtype
+    embedding: Union[conlist(float, min_length=0), List[conlist(float, min_length=0)], str, List[str]]
+    embedding_dtype: str = Field("float32", pattern="^(float32|float16)$")
     search_type: str = "similarity"
     k: int = 4
     distance_threshold: Optional[float] = None
@@ -4,6 +4,9 @@
 import contextlib
 import inspect
 import os
+import threading
+import time
+from collections import OrderedDict, deque
 from functools import wraps
 
 from opentelemetry import trace
@@ -11,13 +14,115 @@ from opentelemetry.context.contextvars_context import ContextVarsRuntimeContext
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as HTTPSpanExporter
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
 
 from ..mega.logger import CustomLogger
 
 logger = CustomLogger("OpeaComponent")
 
+# capacity of the ring buffer keeping the latest finished spans in memory
+TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", 2048))
+# keep the spans in memory even without TELEMETRY_ENDPOINT
+TELEMETRY_IN_MEMORY = os.getenv("TELEMETRY_IN_MEMORY", "false").lower() in ("true", "1")
+# head-based sampling: ratio of the traces recorded, or max number of traces recorded per second when set
+TELEMETRY_SAMPLING_RATIO = float(os.getenv("TELEMETRY_SAMPLING_RATIO", 1.0))
+TELEMETRY_SAMPLING_RATE = float(os.getenv("TELEMETRY_SAMPLING_RATE", 0))
+
+
+class RateLimitedSampler(Sampler):
+    """Sample at most `rate` new traces per second, through a token bucket."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = max(rate, 1.0)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def should_sample(
+        self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None
+    ) -> SamplingResult:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            sampled = self._tokens >= 1
+            if sampled:
+                self._tokens -= 1
+        if sampled:
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes)
+        return SamplingResult(Decision.DROP)
+
+    def get_description(self) -> str:
+        return f"RateLimitedSampler{{{self.rate}}}"
+
+
+class RecentSpanExporter(SpanExporter):
+    """Keep the latest finished spans in a fixed-capacity ring buffer, dropping the oldest ones."""
+
+    def __init__(self, capacity: int = TELEMETRY_BUFFER_SIZE):
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def export(self, spans) -> SpanExportResult:
+        if self._stopped:
+            return SpanExportResult.FAILURE
+        with self._lock:
+            self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self):
+        with self._lock:
+            return tuple(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self):
+        self._stopped = True
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def recent_traces(self, limit: int = 20) -> list:
+        """Get the spans of the latest `limit` traces, the most recent trace first."""
+        traces = OrderedDict()  # trace id => spans, the most recent trace last
+        for span in self.get_finished_spans():
+            trace_id = span.context.trace_id
+            traces.setdefault(trace_id, []).append(span)
+            traces.move_to_end(trace_id)
+        result = []
+        for trace_id in reversed(traces):
+            if len(result) >= limit:
+                break
+            spans = traces[trace_id]
+            result.append(
+                {
+                    "trace_id": trace.format_trace_id(trace_id),
+                    "spans": [
+                        {
+                            "name": span.name,
+                            "span_id": trace.format_span_id(span.context.span_id),
+                            "parent_id": trace.format_span_id(span.parent.span_id) if span.parent else None,
+                            "start_time": span.start_time,
+                            "end_time": span.end_time,
+                            "duration": (span.end_time - span.start_time) / 1e9,
+                            "attributes": dict(span.attributes or {}),
+                        }
+                        for span in sorted(spans, key=lambda span: span.start_time)
+                    ],
+                }
+            )
+        return result
+
 
 def detach_ignore_err(self, token: object) -> None:
     """Resets Context to a previous value.
@@ -35,7 +140,11 @@ def detach_ignore_err(self, token: object) -> None:
 ContextVarsRuntimeContext.detach = detach_ignore_err
 
 resource = Resource.create({SERVICE_NAME: "opea"})
-traceProvider = TracerProvider(resource=resource)
+if TELEMETRY_SAMPLING_RATE > 0:
+    sampler = ParentBased(RateLimitedSampler(TELEMETRY_SAMPLING_RATE))
+else:
+    sampler = ParentBased(TraceIdRatioBased(TELEMETRY_SAMPLING_RATIO))
+traceProvider = TracerProvider(resource=resource, sampler=sampler)
 
 ENABLE_OPEA_TELEMETRY = False
 telemetry_endpoint = os.environ.get("TELEMETRY_ENDPOINT")
@@ -45,8 +154,12 @@ if telemetry_endpoint is not None:
     logger.info(f" Has Telemetry Endpoint :  {telemetry_endpoint}")
     traceProvider.add_span_processor(BatchSpanProcessor(HTTPSpanExporter(endpoint=telemetry_endpoint)))
 
-in_memory_exporter = InMemorySpanExporter()
-traceProvider.add_span_processor(BatchSpanProcessor(in_memory_exporter))
+# the spans are only kept in memory when tracing is on, to be queried through /v1/traces
+in_memory_exporter = RecentSpanExporter()
+if TELEMETRY_IN_MEMORY:
+    ENABLE_OPEA_TELEMETRY = True
+if ENABLE_OPEA_TELEMETRY:
+    traceProvider.add_span_processor(SimpleSpanProcessor(in_memory_exporter))
 trace.set_tracer_provider(traceProvider)
 
 tracer = trace.get_tracer(__name__)
@@ -1,7 +1,6 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import base64
 import json
 import os
@@ -10,11 +9,12 @@ from pathlib import Path
 from typing import Iterator
 
 import cv2
-import requests
 import webvtt
 import whisper
 from moviepy import VideoFileClip
 
+from comps.cores.common.http_client import get_http_client
+
 
 def create_upload_folder(upload_path):
     """Create a directory to store uploaded video data."""
@@ -240,11 +240,7 @@ async def use_lvm(endpoint: str, img_b64_string: str, prompt: str = "Provide a s
     """Generate image captions/descriptions using LVM microservice."""
     inputs = {"image": img_b64_string, "prompt": prompt, "max_new_tokens": 32}
 
-    response = await asyncio.to_thread(
-        requests.post,
-        url=endpoint,
-        data=json.dumps(inputs),
-    )
+    response = await get_http_client(endpoint).post(json=inputs)
     print(response)
     return response.json()["text"]
 
@@ -7,20 +7,11 @@ import time
 from typing import List, Optional, Union
 
 from fastapi import Body, File, Form, UploadFile
-from integrations.elasticsearch import OpeaElasticSearchDataprep
-from integrations.milvus import OpeaMilvusDataprep
-from integrations.neo4j_llamaindex import OpeaNeo4jLlamaIndexDataprep
-from integrations.opensearch import OpeaOpenSearchDataprep
-from integrations.pgvect import OpeaPgvectorDataprep
-from integrations.pipecone import OpeaPineConeDataprep
-from integrations.qdrant import OpeaQdrantDataprep
-from integrations.redis import OpeaRedisDataprep
-from integrations.redis_finance import OpeaRedisDataprepFinance
-from integrations.vdms import OpeaVdmsDataprep
 from opea_dataprep_loader import OpeaDataprepLoader
 
 from comps import (
     CustomLogger,
+    OpeaComponentRegistry,
     ServiceType,
     opea_microservices,
     register_microservice,
@@ -33,6 +24,21 @@ logger = CustomLogger("opea_dataprep_microservice")
 logflag = os.getenv("LOGFLAG", False)
 upload_folder = "./uploaded_files/"
 
+OpeaComponentRegistry.register_lazy(
+    {
+        "OPEA_DATAPREP_ELASTICSEARCH": "integrations.elasticsearch:OpeaElasticSearchDataprep",
+        "OPEA_DATAPREP_MILVUS": "integrations.milvus:OpeaMilvusDataprep",
+        "OPEA_DATAPREP_NEO4J_LLAMAINDEX": "integrations.neo4j_llamaindex:OpeaNeo4jLlamaIndexDataprep",
+        "OPEA_DATAPREP_OPENSEARCH": "integrations.opensearch:OpeaOpenSearchDataprep",
+        "OPEA_DATAPREP_PGVECTOR": "integrations.pgvect:OpeaPgvectorDataprep",
+        "OPEA_DATAPREP_PINECONE": "integrations.pipecone:OpeaPineConeDataprep",
+        "OPEA_DATAPREP_QDRANT": "integrations.qdrant:OpeaQdrantDataprep",
+        "OPEA_DATAPREP_REDIS": "integrations.redis:OpeaRedisDataprep",
+        "OPEA_DATAPREP_REDIS_FINANCE": "integrations.redis_finance:OpeaRedisDataprepFinance",
+        "OPEA_DATAPREP_VDMS": "integrations.vdms:OpeaVdmsDataprep",
+    }
+)
+
 dataprep_component_name = os.getenv("DATAPREP_COMPONENT_NAME", "OPEA_DATAPREP_REDIS")
 # Initialize OpeaComponentLoader
 loader = OpeaDataprepLoader(
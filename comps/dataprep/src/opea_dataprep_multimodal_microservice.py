@@ -7,13 +7,11 @@ import time
 from typing import List, Optional, Union
 
 from fastapi import Body, File, UploadFile
-from integrations.milvus_multimodal import OpeaMultimodalMilvusDataprep
-from integrations.redis_multimodal import OpeaMultimodalRedisDataprep
-from integrations.vdms_multimodal import OpeaMultimodalVdmsDataprep
 from opea_dataprep_loader import OpeaDataprepMultiModalLoader
 
 from comps import (
     CustomLogger,
+    OpeaComponentRegistry,
     ServiceType,
     opea_microservices,
     register_microservice,
@@ -26,6 +24,14 @@ logger = CustomLogger("opea_dataprep_multimodal_microservice")
 logflag = os.getenv("LOGFLAG", False)
 upload_folder = "./uploaded_files/"
 
+OpeaComponentRegistry.register_lazy(
+    {
+        "OPEA_DATAPREP_MULTIMODALMILVUS": "integrations.milvus_multimodal:OpeaMultimodalMilvusDataprep",
+        "OPEA_DATAPREP_MULTIMODALREDIS": "integrations.redis_multimodal:OpeaMultimodalRedisDataprep",
+        "OPEA_DATAPREP_MULTIMODALVDMS": "integrations.vdms_multimodal:OpeaMultimodalVdmsDataprep",
+    }
+)
+
 dataprep_component_name = os.getenv("DATAPREP_COMPONENT_NAME", "OPEA_DATAPREP_MULTIMODALVDMS")
 # Initialize OpeaComponentLoader
 loader = OpeaDataprepMultiModalLoader(
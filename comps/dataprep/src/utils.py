@@ -22,7 +22,6 @@ from typing import Dict, List, Union
 from urllib.parse import urlparse, urlunparse
 
 import aiofiles
-import aiohttp
 import cairosvg
 import cv2
 import docx
@@ -45,6 +44,7 @@ from langchain_community.document_loaders import (
 from langchain_community.llms import HuggingFaceEndpoint
 
 from comps import CustomLogger
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("prepare_doc_util")
 logflag = os.getenv("LOGFLAG", False)
@@ -357,14 +357,10 @@ async def load_image(image_path):
     if os.getenv("SUMMARIZE_IMAGE_VIA_LVM", None) == "1":
         query = "Please summarize this image."
         image_b64_str = base64.b64encode(await read_image_async(image_path)).decode()
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url="http://localhost:9399/v1/lvm",
-                json={"image": image_b64_str, "prompt": query},
-                headers={"Content-Type": "application/json"},
-            ) as response:
-                json_data = await response.json()
-        return json_data["text"].strip()
+        response = await get_http_client("http://localhost:9399").post(
+            "/v1/lvm", json={"image": image_b64_str, "prompt": query}
+        )
+        return response.json()["text"].strip()
 
     def load_text_from_image():
         loader = UnstructuredImageLoader(image_path)
@@ -1,12 +1,13 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import os
 
+import aiohttp
 import requests
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
+from comps.cores.common.http_client import get_http_client
 from comps.cores.proto.api_protocol import EmbeddingRequest, EmbeddingResponse, EmbeddingResponseData
 
 logger = CustomLogger("opea_multimodal_embedding_clip")
@@ -27,6 +28,7 @@ class OpeaClipEmbedding(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.EMBEDDING.name.lower(), description, config)
         self.base_url = os.getenv("CLIP_EMBEDDING_ENDPOINT", "http://localhost:6990")
+        self.client = get_http_client(self.base_url)
 
         health_status = self.check_health()
         if not health_status:
@@ -43,12 +45,7 @@ class OpeaClipEmbedding(OpeaComponent):
         """
         json_payload = input.model_dump()
         try:
-            response = await asyncio.to_thread(
-                requests.post,
-                f"{self.base_url}/v1/embeddings",
-                headers={"Content-Type": "application/json"},
-                json=json_payload,
-            )
+            response = await self.client.post("/v1/embeddings", json=json_payload, retry=True)
             response.raise_for_status()
             response_json = response.json()
 
@@ -57,7 +54,7 @@ class OpeaClipEmbedding(OpeaComponent):
                 model=response_json.get("model", input.model),
                 usage=response_json.get("usage", {}),
             )
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             raise RuntimeError(f"Failed to invoke embedding service: {str(e)}")
 
     def check_health(self) -> bool:
@@ -76,3 +73,11 @@ class OpeaClipEmbedding(OpeaComponent):
             return True
         except requests.RequestException as e:
             return False
+
+    async def check_health_async(self) -> bool:
+        """Checks if the embedding model is healthy, without blocking the event loop."""
+        try:
+            await self.client.post("/v1/embeddings", json={"input": "health check"})
+            return True
+        except aiohttp.ClientError:
+            return False
@@ -1,7 +1,6 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import base64
 import os
 
@@ -17,6 +16,7 @@ from comps import (
     TextDoc,
     TextImageDoc,
 )
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_multimodal_embedding_bridgetower")
 logflag = os.getenv("LOGFLAG", False)
@@ -33,6 +33,7 @@ class OpeaMultimodalEmbeddingBrigeTower(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.EMBEDDING.name.lower(), description, config)
         self.base_url = os.getenv("MMEI_EMBEDDING_ENDPOINT", "http://localhost:8080")
+        self.client = get_http_client(self.base_url)
         health_status = self.check_health()
         if not health_status:
             logger.error("OpeaMultimodalEmbeddingBrigeTower health check failed.")
@@ -65,9 +66,7 @@ class OpeaMultimodalEmbeddingBrigeTower(OpeaComponent):
                 "Please verify the input type and try again."
             )
 
-        response = await asyncio.to_thread(
-            requests.post, f"{self.base_url}/v1/encode", headers={"Content-Type": "application/json"}, json=json
-        )
+        response = await self.client.post("/v1/encode", json=json, retry=True)
         response_json = response.json()
         embed_vector = response_json["embedding"]
         if isinstance(input, TextDoc):
@@ -90,3 +89,7 @@ class OpeaMultimodalEmbeddingBrigeTower(OpeaComponent):
         except requests.exceptions.RequestException as e:
             logger.info(f"Health check exception: {e}")
             return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health("/v1/health_check")
@@ -1,15 +1,18 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import json
+import asyncio
+import base64
 import os
-from typing import List, Union
+from typing import List, Tuple, Union
 
+import numpy as np
 import requests
-from huggingface_hub import AsyncInferenceClient
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
-from comps.cores.mega.utils import get_access_token
+from comps.cores.common.http_client import AsyncHTTPClient, get_http_client
+from comps.cores.mega.cache import EmbeddingCache
+from comps.cores.mega.utils import decode_embedding, encode_embedding, get_access_token
 from comps.cores.proto.api_protocol import EmbeddingRequest, EmbeddingResponse
 
 logger = CustomLogger("opea_tei_embedding")
@@ -17,6 +20,43 @@ logflag = os.getenv("LOGFLAG", False)
 TOKEN_URL = os.getenv("TOKEN_URL")
 CLIENTID = os.getenv("CLIENTID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+# limits of one TEI call coalescing several requests, match TEI's --max-client-batch-size and --max-batch-tokens
+TEI_EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv("TEI_EMBEDDING_BATCH_MAX_INPUTS", 32))
+TEI_EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("TEI_EMBEDDING_BATCH_MAX_TOKENS", 16384))
+# max TEI calls sent at once for the sub-batches of one large request
+TEI_EMBEDDING_MAX_CONCURRENT_BATCHES = int(os.getenv("TEI_EMBEDDING_MAX_CONCURRENT_BATCHES", 4))
+# cache of the embeddings, disabled by default: in-process budget in MB, optional shared Redis tier, seconds to
+# keep them
+TEI_EMBEDDING_CACHE_MB = int(os.getenv("TEI_EMBEDDING_CACHE_MB", 0))
+TEI_EMBEDDING_CACHE_REDIS_URL = os.getenv("TEI_EMBEDDING_CACHE_REDIS_URL")
+TEI_EMBEDDING_CACHE_TTL = float(os.getenv("TEI_EMBEDDING_CACHE_TTL", 86400))
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens of a text, about 4 characters per token plus special tokens."""
+    return len(text) // 4 + 2
+
+
+def split_batches(texts: List[str]) -> List[Tuple[int, int]]:
+    """Split texts into consecutive sub-batches of at most TEI_EMBEDDING_BATCH_MAX_INPUTS texts and
+    TEI_EMBEDDING_BATCH_MAX_TOKENS estimated tokens, a longer text being sent alone.
+
+    Returns:
+        List[Tuple[int, int]]: The start and end indexes of each sub-batch.
+    """
+    batches = []
+    start, tokens = 0, 0
+    for i, text in enumerate(texts):
+        text_tokens = estimate_tokens(text)
+        if i > start and (
+            i - start >= TEI_EMBEDDING_BATCH_MAX_INPUTS or tokens + text_tokens > TEI_EMBEDDING_BATCH_MAX_TOKENS
+        ):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += text_tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
 
 
 @OpeaComponentRegistry.register("OPEA_TEI_EMBEDDING")
@@ -24,30 +64,31 @@ class OpeaTEIEmbedding(OpeaComponent):
     """A specialized embedding component derived from OpeaComponent for TEI embedding services.
 
     Attributes:
-        client (AsyncInferenceClient): An instance of the async client for embedding generation.
+        client (AsyncHTTPClient): The shared pooled client of the TEI service.
         model_name (str): The name of the embedding model used.
+        cache (EmbeddingCache): The cache of the embeddings, None when disabled.
     """
 
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.EMBEDDING.name.lower(), description, config)
         self.base_url = os.getenv("TEI_EMBEDDING_ENDPOINT", "http://localhost:8080")
         self.client = self._initialize_client()
+        self.cache = None
+        if TEI_EMBEDDING_CACHE_MB > 0 or TEI_EMBEDDING_CACHE_REDIS_URL:
+            self.cache = EmbeddingCache(
+                "tei_embedding",
+                max_bytes=TEI_EMBEDDING_CACHE_MB * 1024 * 1024,
+                ttl=TEI_EMBEDDING_CACHE_TTL or None,
+                redis_url=TEI_EMBEDDING_CACHE_REDIS_URL,
+            )
 
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaTEIEmbedding health check failed.")
-
-    def _initialize_client(self) -> AsyncInferenceClient:
-        """Initializes the AsyncInferenceClient."""
+    def _initialize_client(self) -> AsyncHTTPClient:
+        """Initializes the client and the authorization headers of the requests."""
         access_token = (
             get_access_token(TOKEN_URL, CLIENTID, CLIENT_SECRET) if TOKEN_URL and CLIENTID and CLIENT_SECRET else None
-        )
-        headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
-        return AsyncInferenceClient(
-            model=f"{self.base_url}/v1/embeddings",
-            token=os.getenv("HUGGINGFACEHUB_API_TOKEN"),
-            headers=headers,
-        )
+        ) or os.getenv("HUGGINGFACEHUB_API_TOKEN")
+        self.headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+        return get_http_client(self.base_url)
 
     async def invoke(self, input: EmbeddingRequest) -> EmbeddingResponse:
         """Invokes the embedding service to generate embeddings for the provided input.
@@ -58,23 +99,177 @@ class OpeaTEIEmbedding(OpeaComponent):
         Returns:
             EmbeddingResponse: The response in OpenAI embedding format, including embeddings, model, and usage information.
         """
+        texts = self._parse_texts(input)
+        embeddings = await self._embed(texts, input)
+        return EmbeddingResponse(**embeddings)
+
+    async def invoke_batch(self, inputs: List[EmbeddingRequest]) -> List[Union[EmbeddingResponse, Exception]]:
+        """Generate the embeddings of several requests, coalescing them into as few TEI calls as possible.
+
+        The texts of requests sharing the same parameters are sent together, each call holding at most
+        TEI_EMBEDDING_BATCH_MAX_INPUTS texts and TEI_EMBEDDING_BATCH_MAX_TOKENS estimated tokens.
+
+        Args:
+            inputs (List[EmbeddingRequest]): The requests in OpenAI embedding format.
+
+        Returns:
+            List[Union[EmbeddingResponse, Exception]]: The response of each request, in order, or the exception it
+            failed with. The usage of a TEI call shared by several requests can not be split, so it is only
+            reported for requests sent alone.
+        """
+        results = [None] * len(inputs)
+        calls = []  # [[(request index, texts)], number of texts, estimated tokens]
+        open_calls = {}  # request parameters -> the call still accepting texts
+        for i, input in enumerate(inputs):
+            try:
+                texts = self._parse_texts(input)
+            except (TypeError, ValueError) as e:
+                results[i] = e
+                continue
+            tokens = sum(estimate_tokens(text) for text in texts)
+            key = (input.model, input.encoding_format, input.embedding_dtype, input.user)
+            call = open_calls.get(key)
+            if call is None or (
+                call[1] + len(texts) > TEI_EMBEDDING_BATCH_MAX_INPUTS
+                or call[2] + tokens > TEI_EMBEDDING_BATCH_MAX_TOKENS
+            ):
+                call = open_calls[key] = [[], 0, 0]
+                calls.append(call)
+            call[0].append((i, texts))
+            call[1] += len(texts)
+            call[2] += tokens
+
+        responses = await asyncio.gather(
+            *[
+                self._embed([text for _, texts in members for text in texts], inputs[members[0][0]])
+                for members, _, _ in calls
+            ],
+            return_exceptions=True,
+        )
+
+        # scatter the embeddings back to the requests
+        for (members, _, _), response in zip(calls, responses):
+            if isinstance(response, Exception):
+                for i, _ in members:
+                    results[i] = response
+                continue
+            data = sorted(response["data"], key=lambda item: item["index"])
+            offset = 0
+            for i, texts in members:
+                items = [dict(item, index=index) for index, item in enumerate(data[offset : offset + len(texts)])]
+                offset += len(texts)
+                usage = response.get("usage") if len(members) == 1 else None
+                results[i] = EmbeddingResponse(
+                    model=response.get("model"),
+                    data=items,
+                    usage=usage,
+                    embedding_dtype=response.get("embedding_dtype"),
+                )
+        return results
+
+    def _parse_texts(self, input: EmbeddingRequest) -> List[str]:
         # Parse input according to the EmbeddingRequest format
         if isinstance(input.input, str):
-            texts = [input.input.replace("\n", " ")]
+            return [input.input.replace("\n", " ")]
         elif isinstance(input.input, list):
             if all(isinstance(item, str) for item in input.input):
-                texts = [text.replace("\n", " ") for text in input.input]
+                return [text.replace("\n", " ") for text in input.input]
             else:
                 raise ValueError("Invalid input format: Only string or list of strings are supported.")
         else:
             raise TypeError("Unsupported input type: input must be a string or list of strings.")
+
+    async def _embed(self, texts: List[str], input: EmbeddingRequest) -> dict:
+        """Get the embeddings of the texts, from the cache when enabled and from TEI for the missing ones."""
+        if self.cache is None:
+            return await self._request_embeddings(texts, input)
+
+        # the texts are keyed as sent to TEI, by the endpoint and model embedding them
+        model = f"{self.base_url}|{input.model or ''}"
+        keys = [EmbeddingCache.key(model, text) for text in texts]
+        vectors = dict(zip(keys, await self.cache.get_many(keys)))
+        missing = {}  # key -> text, to embed the texts repeated in the batch once
+        for key, text in zip(keys, texts):
+            if vectors[key] is None:
+                missing.setdefault(key, text)
+
+        response = {"model": input.model, "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+        if missing:
+            # get the raw float32 vectors, to cache them without going through Python floats
+            request = input.model_copy(update={"encoding_format": "base64", "embedding_dtype": "float32"})
+            response = await self._request_embeddings(list(missing.values()), request)
+            data = sorted(response["data"], key=lambda item: item["index"])
+            embedded = {key: base64.b64decode(item["embedding"]) for key, item in zip(missing, data)}
+            await self.cache.set_many(embedded)
+            vectors.update(embedded)
+
+        float16 = input.encoding_format == "base64" and input.embedding_dtype == "float16"
+        return {
+            "model": response.get("model"),
+            "data": [
+                {"index": i, "embedding": self._format_embedding(vectors[key], input)} for i, key in enumerate(keys)
+            ],
+            "usage": response.get("usage"),
+            "embedding_dtype": "float16" if float16 else None,
+        }
+
+    @staticmethod
+    def _format_embedding(vector: bytes, input: EmbeddingRequest) -> Union[List[float], str]:
+        if input.encoding_format != "base64":
+            return np.frombuffer(vector, dtype=np.float32).tolist()
+        if input.embedding_dtype == "float16":
+            return encode_embedding(np.frombuffer(vector, dtype=np.float32), "float16")
+        return base64.b64encode(vector).decode()
+
+    async def _request_embeddings(self, texts: List[str], input: EmbeddingRequest) -> dict:
+        """Request the embeddings of the texts to TEI, split into sub-batches within its limits.
+
+        The sub-batches are sent concurrently, at most TEI_EMBEDDING_MAX_CONCURRENT_BATCHES at once, and their
+        embeddings reassembled in order.
+        """
+        batches = split_batches(texts)
+        if not batches:
+            return {
+                "object": "list",
+                "model": input.model,
+                "data": [],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }
+        if len(batches) == 1:
+            return await self._post_embeddings(texts, input)
+
+        semaphore = asyncio.Semaphore(TEI_EMBEDDING_MAX_CONCURRENT_BATCHES)
+
+        async def post(start: int, end: int) -> dict:
+            async with semaphore:
+                return await self._post_embeddings(texts[start:end], input)
+
+        responses = await asyncio.gather(*[post(start, end) for start, end in batches])
+        data = []
+        usage = {"prompt_tokens": 0, "total_tokens": 0}
+        for (start, _), response in zip(batches, responses):
+            for item in response["data"]:
+                data.append(dict(item, index=start + item["index"]))
+            for key in usage:
+                usage[key] += (response.get("usage") or {}).get(key) or 0
+        data.sort(key=lambda item: item["index"])
+        return dict(responses[0], data=data, usage=usage)
+
+    async def _post_embeddings(self, texts: List[str], input: EmbeddingRequest) -> dict:
         response = await self.client.post(
+            "/v1/embeddings",
             json={"input": texts, "encoding_format": input.encoding_format, "model": input.model, "user": input.user},
-            model=f"{self.base_url}/v1/embeddings",
-            task="text-embedding",
+            headers=self.headers,
+            retry=True,
         )
-        embeddings = json.loads(response.decode())
-        return EmbeddingResponse(**embeddings)
+        response.raise_for_status()
+        embeddings = response.json()
+        if input.encoding_format == "base64" and input.embedding_dtype == "float16":
+            # TEI encodes float32 vectors, convert them to the compact form
+            for item in embeddings["data"]:
+                item["embedding"] = encode_embedding(decode_embedding(item["embedding"]), "float16")
+            embeddings["embedding_dtype"] = "float16"
+        return embeddings
 
     def check_health(self) -> bool:
         """Checks the health of the embedding service.
@@ -92,3 +287,7 @@ class OpeaTEIEmbedding(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
@@ -4,13 +4,10 @@
 import os
 import time
 
-from integrations.clip import OpeaClipEmbedding
-from integrations.predictionguard import PredictionguardEmbedding
-from integrations.tei import OpeaTEIEmbedding
-
 from comps import (
     CustomLogger,
     OpeaComponentLoader,
+    OpeaComponentRegistry,
     ServiceType,
     opea_microservices,
     register_microservice,
@@ -23,7 +20,19 @@ from comps.cores.telemetry.opea_telemetry import opea_telemetry
 logger = CustomLogger("opea_embedding_microservice")
 logflag = os.getenv("LOGFLAG", False)
 
+OpeaComponentRegistry.register_lazy(
+    {
+        "OPEA_CLIP_EMBEDDING": "integrations.clip:OpeaClipEmbedding",
+        "OPEA_PREDICTIONGUARD_EMBEDDING": "integrations.predictionguard:PredictionguardEmbedding",
+        "OPEA_TEI_EMBEDDING": "integrations.tei:OpeaTEIEmbedding",
+    }
+)
+
 embedding_component_name = os.getenv("EMBEDDING_COMPONENT_NAME", "OPEA_TEI_EMBEDDING")
+# coalesce concurrent requests into batched calls, for the components implementing invoke_batch
+dynamic_batching = os.getenv("EMBEDDING_DYNAMIC_BATCHING", "false").lower() in ("true", "1")
+dynamic_batching_timeout = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", 0.01))
+dynamic_batching_max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 32))
 # Initialize OpeaComponentLoader
 loader = OpeaComponentLoader(
     embedding_component_name,
@@ -37,6 +46,9 @@ loader = OpeaComponentLoader(
     endpoint="/v1/embeddings",
     host="0.0.0.0",
     port=6000,
+    dynamic_batching=dynamic_batching,
+    dynamic_batching_timeout=dynamic_batching_timeout,
+    dynamic_batching_max_batch_size=dynamic_batching_max_batch_size,
 )
 @opea_telemetry
 @register_statistics(names=["opea_service@embedding"])
@@ -48,8 +60,14 @@ async def embedding(input: EmbeddingRequest) -> EmbeddingResponse:
         logger.info(f"Input received: {input}")
 
     try:
-        # Use the loader to invoke the component
-        embedding_response = await loader.invoke(input)
+        if dynamic_batching and hasattr(loader.component, "invoke_batch"):
+            # Queue the request, it is embedded together with the concurrent ones
+            embedding_response = await opea_microservices["opea_service@embedding"].batch_request(
+                ServiceType.EMBEDDING, input
+            )
+        else:
+            # Use the loader to invoke the component
+            embedding_response = await loader.invoke(input)
 
         # Log the result if logging is enabled
         if logflag:
@@ -64,6 +82,13 @@ async def embedding(input: EmbeddingRequest) -> EmbeddingResponse:
         raise
 
 
+async def embedding_batch_infer(service_type: ServiceType, batch: list[dict]) -> list:
+    return await loader.component.invoke_batch([req["request"] for req in batch])
+
+
+opea_microservices["opea_service@embedding"].dynamic_batching_infer = embedding_batch_infer
+
+
 if __name__ == "__main__":
     opea_microservices["opea_service@embedding"].start()
     logger.info("OPEA Embedding Microservice is up and running successfully...")
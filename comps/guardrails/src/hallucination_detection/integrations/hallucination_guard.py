@@ -4,7 +4,6 @@
 import os
 from typing import Union
 
-import aiohttp
 import requests
 from fastapi.responses import StreamingResponse
 from langchain.schema import HumanMessage, SystemMessage
@@ -20,6 +19,7 @@ from comps import (
     SearchedDoc,
     ServiceType,
 )
+from comps.cores.common.http_client import get_http_client
 from comps.cores.proto.api_protocol import ChatCompletionRequest
 from comps.guardrails.src.hallucination_detection.integrations.template import ChatTemplate
 
@@ -61,13 +61,11 @@ class OpeaHallucinationGuard(OpeaComponent):
             payload["max_tokens"] = input.max_tokens
             payload["model"] = input.model
 
-            async with aiohttp.ClientSession() as session:
-                response = await session.post(url=llm_endpoint + "/v1/chat/completions", json=payload, headers=headers)
-                json_data = await response.json()
-                result = json_data["choices"][0]["message"]["content"]
+            response = await get_http_client(llm_endpoint).post("/v1/chat/completions", json=payload, headers=headers)
+            result = response.json()["choices"][0]["message"]["content"]
 
-                if logflag:
-                    logger.info(await response.text)
+            if logflag:
+                logger.info(response.text)
 
             return GeneratedDoc(text=result, prompt="")
         else:
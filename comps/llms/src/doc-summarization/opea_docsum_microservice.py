@@ -4,12 +4,10 @@
 import os
 import time
 
-from integrations.tgi import OpeaDocSumTgi
-from integrations.vllm import OpeaDocSumvLLM
-
 from comps import (
     CustomLogger,
     OpeaComponentLoader,
+    OpeaComponentRegistry,
     ServiceType,
     opea_microservices,
     register_microservice,
@@ -21,6 +19,13 @@ from comps.cores.proto.api_protocol import DocSumChatCompletionRequest
 logger = CustomLogger("llm_docsum")
 logflag = os.getenv("LOGFLAG", False)
 
+OpeaComponentRegistry.register_lazy(
+    {
+        "OpeaDocSumTgi": "integrations.tgi:OpeaDocSumTgi",
+        "OpeaDocSumvLLM": "integrations.vllm:OpeaDocSumvLLM",
+    }
+)
+
 llm_component_name = os.getenv("DocSum_COMPONENT_NAME", "OpeaDocSumTgi")
 # Initialize OpeaComponentLoader
 loader = OpeaComponentLoader(llm_component_name, description=f"OPEA LLM DocSum Component: {llm_component_name}")
@@ -4,12 +4,10 @@
 import os
 import time
 
-from integrations.tgi import OpeaFaqGenTgi
-from integrations.vllm import OpeaFaqGenvLLM
-
 from comps import (
     CustomLogger,
     OpeaComponentLoader,
+    OpeaComponentRegistry,
     ServiceType,
     opea_microservices,
     register_microservice,
@@ -21,6 +19,13 @@ from comps.cores.proto.api_protocol import ChatCompletionRequest
 logger = CustomLogger("llm_faqgen")
 logflag = os.getenv("LOGFLAG", False)
 
+OpeaComponentRegistry.register_lazy(
+    {
+        "OpeaFaqGenTgi": "integrations.tgi:OpeaFaqGenTgi",
+        "OpeaFaqGenvLLM": "integrations.vllm:OpeaFaqGenvLLM",
+    }
+)
+
 llm_component_name = os.getenv("FAQGen_COMPONENT_NAME", "OpeaFaqGenTgi")
 # Initialize OpeaComponentLoader
 loader = OpeaComponentLoader(llm_component_name, description=f"OPEA LLM FAQGen Component: {llm_component_name}")
@@ -58,9 +58,6 @@ class OpeaTextGenService(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.LLM.name.lower(), description, config)
         self.client = self._initialize_client()
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaTextGenService health check failed.")
 
     def _initialize_client(self) -> AsyncOpenAI:
         """Initializes the AsyncOpenAI."""
@@ -93,6 +90,15 @@ class OpeaTextGenService(OpeaComponent):
             logger.error("Health check failed")
             return False
 
+    async def check_health_async(self) -> bool:
+        """Checks that the TGI/vLLM LLM service is reachable, without blocking the event loop."""
+        try:
+            await self.client.models.list()
+            return True
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            return False
+
     def align_input(
         self, input: Union[LLMParamsDoc, ChatCompletionRequest, SearchedDoc], prompt_template, input_variables
     ):
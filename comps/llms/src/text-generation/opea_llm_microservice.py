@@ -9,6 +9,7 @@ from comps import (
     CustomLogger,
     LLMParamsDoc,
     OpeaComponentLoader,
+    OpeaComponentRegistry,
     SearchedDoc,
     ServiceType,
     opea_microservices,
@@ -26,13 +27,14 @@ llm_component_name = os.getenv("LLM_COMPONENT_NAME", "OpeaTextGenService")
 if logflag:
     logger.info(f"Get llm_component_name {llm_component_name}")
 
-if llm_component_name == "OpeaTextGenNative":
-    from integrations.native import OpeaTextGenNative
-elif llm_component_name == "OpeaTextGenBedrock":
-    from integrations.bedrock import OpeaTextGenBedrock
-else:
-    from integrations.predictionguard import OpeaTextGenPredictionguard
-    from integrations.service import OpeaTextGenService
+OpeaComponentRegistry.register_lazy(
+    {
+        "OpeaTextGenBedrock": "integrations.bedrock:OpeaTextGenBedrock",
+        "OpeaTextGenNative": "integrations.native:OpeaTextGenNative",
+        "OpeaTextGenPredictionguard": "integrations.predictionguard:OpeaTextGenPredictionguard",
+        "OpeaTextGenService": "integrations.service:OpeaTextGenService",
+    }
+)
 
 # Initialize OpeaComponentLoader
 loader = OpeaComponentLoader(llm_component_name, description=f"OPEA LLM Component: {llm_component_name}")
@@ -1,11 +1,9 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import json
 import os
 from typing import Union
 
-import aiohttp
 import requests
 from fastapi import HTTPException
 from langchain_core.prompts import PromptTemplate
@@ -20,6 +18,7 @@ from comps import (
     ServiceType,
     TextDoc,
 )
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_llava")
 logflag = os.getenv("LOGFLAG", False)
@@ -50,11 +49,9 @@ class OpeaLlavaLvm(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.LVM.name.lower(), description, config)
         self.base_url = os.getenv("LVM_ENDPOINT", "http://localhost:8399")
+        self.client = get_http_client(self.base_url, trust_env=False)
         if logflag:
             logger.info(f"MAX_IMAGES: {max_images}")
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaLlavaLvm health check failed.")
 
     async def invoke(
         self,
@@ -113,13 +110,10 @@ class OpeaLlavaLvm(OpeaComponent):
 
         inputs = {"img_b64_str": img_b64_str, "prompt": prompt, "max_new_tokens": max_new_tokens}
         # forward to the LLaVA server
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(url=f"{self.base_url}/generate", data=json.dumps(inputs), proxy=None)
-
-            json_data = await response.json()
-            result = json_data["text"]
-            if logflag:
-                logger.info(result)
+        response = await self.client.post("/generate", json=inputs)
+        result = response.json()["text"]
+        if logflag:
+            logger.info(result)
         if isinstance(request, LVMSearchedMultimodalDoc):
             retrieved_metadata = request.metadata[0]
             return_metadata = {}  # this metadata will be used to construct proof for generated text
@@ -147,3 +141,7 @@ class OpeaLlavaLvm(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
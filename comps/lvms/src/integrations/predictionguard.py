@@ -1,14 +1,13 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import json
 import os
 from typing import Union
 
-import aiohttp
 import requests
 
 from comps import CustomLogger, LVMDoc, OpeaComponent, OpeaComponentRegistry, ServiceType, TextDoc
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_predictionguard")
 logflag = os.getenv("LOGFLAG", False)
@@ -21,9 +20,7 @@ class OpeaPredictionguardLvm(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.LVM.name.lower(), description, config)
         self.base_url = os.getenv("LVM_ENDPOINT", "http://localhost:9399")
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaPredictionguardLvm health check failed.")
+        self.client = get_http_client(self.base_url, trust_env=False)
 
     async def invoke(
         self,
@@ -35,14 +32,10 @@ class OpeaPredictionguardLvm(OpeaComponent):
 
         inputs = {"image": request.image, "prompt": request.prompt, "max_new_tokens": request.max_new_tokens}
         # forward to the PredictionGuard server
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(url=f"{self.base_url}/v1/lvm", data=json.dumps(inputs), proxy=None)
-
-            json_data = await response.json()
-            result = json_data["text"]
-
-            if logflag:
-                logger.info(result)
+        response = await self.client.post("/v1/lvm", json=inputs)
+        result = response.json()["text"]
+        if logflag:
+            logger.info(result)
 
         return TextDoc(text=result)
 
@@ -62,3 +55,7 @@ class OpeaPredictionguardLvm(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
@@ -22,6 +22,7 @@ from comps import (
     TextDoc,
     statistics_dict,
 )
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_tgi_llava")
 logflag = os.getenv("LOGFLAG", False)
@@ -53,11 +54,8 @@ class OpeaTgiLlavaLvm(OpeaComponent):
         super().__init__(name, ServiceType.LVM.name.lower(), description, config)
         self.base_url = os.getenv("LVM_ENDPOINT", "http://localhost:8399")
         self.lvm_client = AsyncInferenceClient(self.base_url)
-        health_status = self.check_health()
         if logflag:
             logger.info(f"MAX_IMAGES: {max_images}")
-        if not health_status:
-            logger.error("OpeaTgiLlavaLvm health check failed.")
 
     async def invoke(
         self,
@@ -156,6 +154,7 @@ class OpeaTgiLlavaLvm(OpeaComponent):
 
             async def stream_generator(time_start):
                 first_token_latency = None
+                token_count = 0
                 chat_response = ""
                 text_generation = await self.lvm_client.text_generation(
                     prompt=image_prompt,
@@ -167,6 +166,7 @@ class OpeaTgiLlavaLvm(OpeaComponent):
                     top_p=top_p,
                 )
                 async for text in text_generation:
+                    token_count += 1
                     if first_token_latency is None:
                         first_token_latency = time.time() - time_start
                     chat_response += text
@@ -176,7 +176,9 @@ class OpeaTgiLlavaLvm(OpeaComponent):
                     yield f"data: {chunk_repr}\n\n"
                 if logflag:
                     logger.info(f"[llm - chat_stream] stream response: {chat_response}")
-                statistics_dict["opea_service@lvm"].append_latency(time.time() - time_start, first_token_latency)
+                statistics_dict["opea_service@lvm"].append_latency(
+                    time.time() - time_start, first_token_latency, token_count=token_count
+                )
                 yield "data: [DONE]\n\n"
 
             return StreamingResponse(stream_generator(t_start), media_type="text/event-stream")
@@ -218,3 +220,7 @@ class OpeaTgiLlavaLvm(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await get_http_client(self.base_url).check_health()
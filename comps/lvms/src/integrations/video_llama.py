@@ -10,6 +10,7 @@ from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
 
 from comps import CustomLogger, LVMVideoDoc, OpeaComponent, OpeaComponentRegistry, ServiceType, statistics_dict
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_video_llama")
 logflag = os.getenv("LOGFLAG", False)
@@ -22,9 +23,7 @@ class OpeaVideoLlamaLvm(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.LVM.name.lower(), description, config)
         self.base_url = os.getenv("LVM_ENDPOINT", "http://localhost:9099")
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaVideoLlamaLvm health check failed.")
+        self.client = get_http_client(self.base_url, trust_env=False)
 
     async def invoke(
         self,
@@ -59,27 +58,31 @@ class OpeaVideoLlamaLvm(OpeaComponent):
 
         t_start = time.time()
 
-        response = requests.post(url=f"{self.base_url}/generate", params=params, proxies={"http": None}, stream=True)
-        logger.info(f"[lvm] Response status code: {response.status_code}")
-        if response.status_code == 200:
+        response = await self.client.stream("POST", "/generate", params=params)
+        logger.info(f"[lvm] Response status code: {response.status}")
+        if response.status == 200:
 
-            def streamer(time_start):
+            async def streamer(time_start):
                 first_token_latency = None
                 yield f"{{'video_url': '{video_url}', 'chunk_start': {chunk_start}, 'chunk_duration': {chunk_duration}}}\n".encode(
                     "utf-8"
                 )
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        if first_token_latency is None:
-                            first_token_latency = time.time() - time_start
-                        yield chunk
-                    logger.info(f"[lvm - chat_stream] Streaming chunk of size {len(chunk)}")
+                try:
+                    async for chunk in response.content.iter_chunked(8192):
+                        if chunk:
+                            if first_token_latency is None:
+                                first_token_latency = time.time() - time_start
+                            yield chunk
+                        logger.info(f"[lvm - chat_stream] Streaming chunk of size {len(chunk)}")
+                finally:
+                    response.release()
                 logger.info("[lvm - chat_stream] stream response finished")
                 statistics_dict["opea_service@lvm"].append_latency(time.time() - time_start, first_token_latency)
 
             return StreamingResponse(streamer(t_start), media_type="text/event-stream")
         else:
-            logger.error(f"[lvm] Error: {response.text}")
+            logger.error(f"[lvm] Error: {await response.text()}")
+            response.release()
             raise HTTPException(status_code=500, detail="The upstream API responded with an error.")
 
     def check_health(self) -> bool:
@@ -98,3 +101,7 @@ class OpeaVideoLlamaLvm(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
@@ -22,6 +22,7 @@ from comps import (
     TextDoc,
     statistics_dict,
 )
+from comps.cores.common.http_client import get_http_client
 
 logger = CustomLogger("opea_vllm")
 logflag = os.getenv("LOGFLAG", False)
@@ -57,11 +58,8 @@ class OpeaVllmLvm(OpeaComponent):
         # latest AsyncInferenceClient has model hardcoded issues to "tgi"
         # so we use OpenAI client
         self.lvm_client = OpenAI(api_key="EMPTY", base_url=f"{self.base_url}/v1")
-        health_status = self.check_health()
         # if logflag:
         #     logger.info(f"MAX_IMAGES: {max_images}")
-        if not health_status:
-            logger.error("OpeaVllmLvm health check failed.")
 
     async def invoke(
         self,
@@ -128,6 +126,7 @@ class OpeaVllmLvm(OpeaComponent):
 
             def stream_generator(time_start):
                 first_token_latency = None
+                token_count = 0
                 chat_response = ""
 
                 # https://docs.vllm.ai/en/v0.5.1/getting_started/examples/openai_vision_api_client.html
@@ -153,6 +152,7 @@ class OpeaVllmLvm(OpeaComponent):
                 )
 
                 for output in text_generation:
+                    token_count += 1
                     if first_token_latency is None:
                         first_token_latency = time.time() - time_start
                     text = output.choices[0].delta.content
@@ -163,7 +163,9 @@ class OpeaVllmLvm(OpeaComponent):
                     yield f"data: {chunk_repr}\n\n"
                 if logflag:
                     logger.info(f"[llm - chat_stream] stream response: {chat_response}")
-                statistics_dict["opea_service@lvm"].append_latency(time.time() - time_start, first_token_latency)
+                statistics_dict["opea_service@lvm"].append_latency(
+                    time.time() - time_start, first_token_latency, token_count=token_count
+                )
                 yield "data: [DONE]\n\n"
 
             return StreamingResponse(stream_generator(t_start), media_type="text/event-stream")
@@ -220,3 +222,7 @@ class OpeaVllmLvm(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await get_http_client(self.base_url).check_health()
@@ -1,15 +1,14 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import json
 import os
 from typing import Union
 
 import requests
-from huggingface_hub import AsyncInferenceClient
 
 from comps import CustomLogger, LLMParamsDoc, OpeaComponentRegistry, SearchedDoc, ServiceType
 from comps.cores.common.component import OpeaComponent
+from comps.cores.common.http_client import AsyncHTTPClient, get_http_client
 from comps.cores.mega.utils import get_access_token
 from comps.cores.proto.api_protocol import (
     ChatCompletionRequest,
@@ -32,28 +31,21 @@ class OpeaTEIReranking(OpeaComponent):
     """A specialized reranking component derived from OpeaComponent for TEI reranking services.
 
     Attributes:
-        client (AsyncInferenceClient): An instance of the client for reranking generation.
+        client (AsyncHTTPClient): The shared pooled client of the TEI service.
     """
 
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.RERANK.name.lower(), description, config)
         self.base_url = os.getenv("TEI_RERANKING_ENDPOINT", "http://localhost:8808")
         self.client = self._initialize_client()
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OPEATEIReranking health check failed.")
 
-    def _initialize_client(self) -> AsyncInferenceClient:
-        """Initializes the AsyncInferenceClient."""
+    def _initialize_client(self) -> AsyncHTTPClient:
+        """Initializes the client and the authorization headers of the requests."""
         access_token = (
             get_access_token(TOKEN_URL, CLIENTID, CLIENT_SECRET) if TOKEN_URL and CLIENTID and CLIENT_SECRET else None
-        )
-        headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
-        return AsyncInferenceClient(
-            model=f"{self.base_url}/rerank",
-            token=os.getenv("HUGGINGFACEHUB_API_TOKEN"),
-            headers=headers,
-        )
+        ) or os.getenv("HUGGINGFACEHUB_API_TOKEN")
+        self.headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+        return get_http_client(self.base_url)
 
     async def invoke(
         self, input: Union[SearchedDoc, RerankingRequest, ChatCompletionRequest]
@@ -70,12 +62,11 @@ class OpeaTEIReranking(OpeaComponent):
                 query = input.input
 
             response = await self.client.post(
-                json={"query": query, "texts": docs},
-                model=f"{self.base_url}/rerank",
-                task="text-reranking",
+                "/rerank", json={"query": query, "texts": docs}, headers=self.headers, retry=True
             )
+            response.raise_for_status()
 
-            for best_response in json.loads(response.decode())[: input.top_n]:
+            for best_response in response.json()[: input.top_n]:
                 reranking_results.append(
                     {"text": input.retrieved_docs[best_response["index"]].text, "score": best_response["score"]}
                 )
@@ -118,3 +109,7 @@ class OpeaTEIReranking(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
@@ -51,6 +51,9 @@ class OpeaRedisRetriever(OpeaComponent):
         client (redis.Redis): An instance of the redis client for vector database operations.
     """
 
+    # the query vectors are converted to bytes with numpy, they can be given as arrays
+    accepts_array_embeddings = True
+
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.RETRIEVER.name.lower(), description, config)
         self.embeddings = asyncio.run(self._initialize_embedder())
@@ -6,23 +6,12 @@ import os
 import time
 from typing import Union
 
-# import for retrievers component registration
-from integrations.elasticsearch import OpeaElasticsearchRetriever
-from integrations.milvus import OpeaMilvusRetriever
-from integrations.neo4j import OpeaNeo4jRetriever
-from integrations.opensearch import OpeaOpensearchRetriever
-from integrations.pathway import OpeaPathwayRetriever
-from integrations.pgvector import OpeaPGVectorRetriever
-from integrations.pinecone import OpeaPineconeRetriever
-from integrations.qdrant import OpeaQDrantRetriever
-from integrations.redis import OpeaRedisRetriever
-from integrations.vdms import OpeaVDMsRetriever
-
 from comps import (
     CustomLogger,
     EmbedDoc,
     EmbedMultimodalDoc,
     OpeaComponentLoader,
+    OpeaComponentRegistry,
     SearchedDoc,
     SearchedMultimodalDoc,
     ServiceType,
@@ -32,8 +21,10 @@ from comps import (
     register_statistics,
     statistics_dict,
 )
+from comps.cores.mega.utils import decode_embedding
 from comps.cores.proto.api_protocol import (
     ChatCompletionRequest,
+    EmbeddingResponse,
     RetrievalRequest,
     RetrievalResponse,
     RetrievalResponseData,
@@ -42,6 +33,22 @@ from comps.cores.proto.api_protocol import (
 logger = CustomLogger("opea_retrievers_microservice")
 logflag = os.getenv("LOGFLAG", False)
 
+# retrievers component registration, only the component in use is imported
+OpeaComponentRegistry.register_lazy(
+    {
+        "OPEA_RETRIEVER_ELASTICSEARCH": "integrations.elasticsearch:OpeaElasticsearchRetriever",
+        "OPEA_RETRIEVER_MILVUS": "integrations.milvus:OpeaMilvusRetriever",
+        "OPEA_RETRIEVER_NEO4J": "integrations.neo4j:OpeaNeo4jRetriever",
+        "OPEA_RETRIEVER_OPENSEARCH": "integrations.opensearch:OpeaOpensearchRetriever",
+        "OPEA_RETRIEVER_PATHWAY": "integrations.pathway:OpeaPathwayRetriever",
+        "OPEA_RETRIEVER_PGVECTOR": "integrations.pgvector:OpeaPGVectorRetriever",
+        "OPEA_RETRIEVER_PINECONE": "integrations.pinecone:OpeaPineconeRetriever",
+        "OPEA_RETRIEVER_QDRANT": "integrations.qdrant:OpeaQDrantRetriever",
+        "OPEA_RETRIEVER_REDIS": "integrations.redis:OpeaRedisRetriever",
+        "OPEA_RETRIEVER_VDMS": "integrations.vdms:OpeaVDMsRetriever",
+    }
+)
+
 retriever_component_name = os.getenv("RETRIEVER_COMPONENT_NAME", "OPEA_RETRIEVER_REDIS")
 # Initialize OpeaComponentLoader
 loader = OpeaComponentLoader(
@@ -50,6 +57,32 @@ loader = OpeaComponentLoader(
 )
 
 
+def decode_embeddings(input, as_array: bool = False):
+    """Decode the base64 embeddings of the input in place.
+
+    The vectors are read without copy from the decoded bytes. RetrievalRequest keeps them as numpy arrays for the
+    components accepting them, otherwise they are converted to the lists of floats most vector stores expect,
+    which costs one Python float per dimension. EmbedDoc always gets lists, as docarray validates the assignment.
+    """
+
+    def convert(vector):
+        return vector if as_array else vector.tolist()
+
+    if isinstance(input, EmbedDoc):
+        if isinstance(input.embedding, str):
+            input.embedding = decode_embedding(input.embedding, input.embedding_dtype).tolist()
+        elif input.embedding and isinstance(input.embedding[0], str):
+            input.embedding = [decode_embedding(e, input.embedding_dtype).tolist() for e in input.embedding]
+    elif isinstance(input, RetrievalRequest):
+        if isinstance(input.embedding, str):
+            input.embedding = convert(decode_embedding(input.embedding, input.embedding_dtype))
+        elif isinstance(input.embedding, EmbeddingResponse):
+            dtype = input.embedding.embedding_dtype or "float32"
+            for item in input.embedding.data:
+                if isinstance(item.embedding, str):
+                    item.embedding = convert(decode_embedding(item.embedding, dtype))
+
+
 @register_microservice(
     name="opea_service@retrievers",
     service_type=ServiceType.RETRIEVER,
@@ -59,7 +92,7 @@ loader = OpeaComponentLoader(
 )
 @register_statistics(names=["opea_service@retrievers"])
 async def retrieve_docs(
-    input: Union[EmbedDoc, EmbedMultimodalDoc, RetrievalRequest, ChatCompletionRequest]
+    input: Union[EmbedDoc, EmbedMultimodalDoc, RetrievalRequest, ChatCompletionRequest],
 ) -> Union[SearchedDoc, SearchedMultimodalDoc, RetrievalResponse, ChatCompletionRequest]:
     start = time.time()
 
@@ -67,6 +100,8 @@ async def retrieve_docs(
         logger.info(f"[ retrieval ] input:{input}")
 
     try:
+        decode_embeddings(input, as_array=getattr(loader.component, "accepts_array_embeddings", False))
+
         # Use the loader to invoke the component
         response = await loader.invoke(input)
 
@@ -1,7 +1,6 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import os
 import time
 
@@ -9,6 +8,7 @@ import requests
 from fastapi.responses import StreamingResponse
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
+from comps.cores.common.http_client import HTTPResponse, get_http_client
 from comps.cores.proto.api_protocol import AudioSpeechRequest
 
 logger = CustomLogger("opea_gptsovits")
@@ -26,24 +26,17 @@ class OpeaGptsovitsTts(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.TTS.name.lower(), description, config)
         self.base_url = os.getenv("TTS_ENDPOINT", "http://localhost:9880")
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaGptsovitsTts health check failed.")
+        self.client = get_http_client(self.base_url)
 
     async def invoke(
         self,
         request: AudioSpeechRequest,
-    ) -> requests.models.Response:
+    ) -> HTTPResponse:
         """Involve the TTS service to generate speech for the provided input."""
         # make sure you change the refer_wav_path locally
         request.voice = None
 
-        response = await asyncio.to_thread(
-            requests.post,
-            f"{self.base_url}/v1/audio/speech",
-            json=request.dict(),
-        )
-        return response
+        return await self.client.post("/v1/audio/speech", json=request.dict())
 
     def check_health(self) -> bool:
         """Checks the health of the embedding service.
@@ -61,3 +54,7 @@ class OpeaGptsovitsTts(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
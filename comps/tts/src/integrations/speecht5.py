@@ -1,13 +1,13 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
-import asyncio
 import os
 
 import requests
 from fastapi.responses import StreamingResponse
 
 from comps import CustomLogger, OpeaComponent, OpeaComponentRegistry, ServiceType
+from comps.cores.common.http_client import HTTPResponse, get_http_client
 from comps.cores.proto.api_protocol import AudioSpeechRequest
 
 logger = CustomLogger("opea_speecht5")
@@ -25,14 +25,12 @@ class OpeaSpeecht5Tts(OpeaComponent):
     def __init__(self, name: str, description: str, config: dict = None):
         super().__init__(name, ServiceType.TTS.name.lower(), description, config)
         self.base_url = os.getenv("TTS_ENDPOINT", "http://localhost:7055")
-        health_status = self.check_health()
-        if not health_status:
-            logger.error("OpeaSpeecht5Tts health check failed.")
+        self.client = get_http_client(self.base_url)
 
     async def invoke(
         self,
         request: AudioSpeechRequest,
-    ) -> requests.models.Response:
+    ) -> HTTPResponse:
         """Involve the TTS service to generate speech for the provided input."""
         # validate the request parameters
         if request.model not in ["microsoft/speecht5_tts"]:
@@ -40,12 +38,7 @@ class OpeaSpeecht5Tts(OpeaComponent):
         if request.voice not in ["default", "male"] or request.speed != 1.0:
             logger.warning("Currently parameter 'speed' can only be 1.0 and 'voice' can only be default or male!")
 
-        response = await asyncio.to_thread(
-            requests.post,
-            f"{self.base_url}/v1/audio/speech",
-            json=request.dict(),
-        )
-        return response
+        return await self.client.post("/v1/audio/speech", json=request.dict())
 
     def check_health(self) -> bool:
         """Checks the health of the embedding service.
@@ -63,3 +56,7 @@ class OpeaSpeecht5Tts(OpeaComponent):
             # Handle connection errors, timeouts, etc.
             logger.error(f"Health check failed: {e}")
         return False
+
+    async def check_health_async(self) -> bool:
+        """Checks the health of the service without blocking the event loop."""
+        return await self.client.check_health()
@@ -28,9 +28,9 @@ loader = OpeaComponentLoader(tts_component_name, description=f"OPEA TTS Componen
 
 
 async def stream_forwarder(response):
-    """Forward the stream chunks to the client using iter_content."""
-    for chunk in response.iter_content(chunk_size=1024):
-        yield chunk
+    """Forward the speech to the client in chunks."""
+    for i in range(0, len(response.content), 1024):
+        yield response.content[i : i + 1024]
 
 
 @register_microservice(
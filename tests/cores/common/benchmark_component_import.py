@@ -0,0 +1,81 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare the import time and memory of the microservice components when registered eagerly or lazily.
+
+Every measure runs in a fresh interpreter: eagerly imports all the integrations of an entrypoint, as the
+entrypoints did before the lazy registration, while lazily imports only the component in use.
+
+Usage: python benchmark_component_import.py [entrypoint.py ...]
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+ENTRYPOINTS = [
+    "comps/retrievers/src/opea_retrievers_microservice.py",
+    "comps/embeddings/src/opea_embedding_microservice.py",
+    "comps/dataprep/src/opea_dataprep_microservice.py",
+    "comps/dataprep/src/opea_dataprep_multimodal_microservice.py",
+    "comps/llms/src/text-generation/opea_llm_microservice.py",
+    "comps/llms/src/doc-summarization/opea_docsum_microservice.py",
+    "comps/llms/src/faq-generation/opea_faqgen_microservice.py",
+]
+
+MEASURE = """
+import importlib, json, resource, sys, time
+import comps
+modules = sys.argv[1:]
+failed = []
+start = time.perf_counter()
+for module in modules:
+    try:
+        importlib.import_module(module)
+    except Exception as e:
+        failed.append(f"{module}: {type(e).__name__}: {e}")
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "failed": failed}))
+"""
+
+
+def lazy_components(entrypoint: str) -> dict:
+    """Get the name => "module:Class" map the entrypoint registers lazily."""
+    with open(entrypoint) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "register_lazy":
+            return ast.literal_eval(node.args[0])
+    raise ValueError(f"{entrypoint} does not register components lazily")
+
+
+def measure(src_dir: str, modules: list) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([src_dir, ROOT]))
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE, *modules], cwd=src_dir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(entrypoints):
+    print(f"{'entrypoint / component':<60}{'import (s)':>12}{'max RSS (MB)':>14}")
+    for entrypoint in entrypoints:
+        path = os.path.join(ROOT, entrypoint)
+        src_dir = os.path.dirname(path)
+        components = lazy_components(path)
+        modules = sorted({target.split(":")[0] for target in components.values()})
+        result = measure(src_dir, modules)
+        print(f"{entrypoint:<60}{result['seconds']:>12.3f}{result['max_rss_mb']:>14.1f}  (eager, all components)")
+        for failure in result["failed"]:
+            print(f"    import failed, {failure}")
+        for name, target in sorted(components.items()):
+            result = measure(src_dir, [target.split(":")[0]])
+            status = "  (import failed)" if result["failed"] else ""
+            print(f"  {name:<58}{result['seconds']:>12.3f}{result['max_rss_mb']:>14.1f}{status}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ENTRYPOINTS)
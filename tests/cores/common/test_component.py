@@ -2,6 +2,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
+import os
+import sys
+import tempfile
 import unittest
 
 from comps import OpeaComponent, OpeaComponentLoader, OpeaComponentRegistry
@@ -80,6 +83,32 @@ class TestOpeaComponentRegistry(unittest.TestCase):
         with self.assertRaises(KeyError):
             OpeaComponentRegistry.get("MockComponent")
 
+    def test_register_lazy_component(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "lazy_integration.py"), "w") as f:
+                f.write(
+                    "from comps import OpeaComponent, OpeaComponentRegistry\n\n"
+                    "@OpeaComponentRegistry.register('LazyComponent')\n"
+                    "class LazyComponent(OpeaComponent):\n"
+                    "    def check_health(self):\n"
+                    "        return True\n\n"
+                    "    async def invoke(self, *args, **kwargs):\n"
+                    "        return 'Service accessed'\n"
+                )
+            sys.path.insert(0, tmpdir)
+            try:
+                OpeaComponentRegistry.register_lazy({"LazyComponent": "lazy_integration:LazyComponent"})
+                # the module is only imported by the loader
+                self.assertNotIn("lazy_integration", sys.modules)
+                loader = OpeaComponentLoader("LazyComponent", type="embedding", description="Test component")
+                self.assertIn("lazy_integration", sys.modules)
+                self.assertIs(OpeaComponentRegistry.get("LazyComponent"), sys.modules["lazy_integration"].LazyComponent)
+                self.assertEqual(asyncio.run(loader.invoke()), "Service accessed")
+            finally:
+                sys.path.remove(tmpdir)
+                sys.modules.pop("lazy_integration", None)
+                OpeaComponentRegistry.unregister("LazyComponent")
+
 
 class TestOpeaComponentLoader(unittest.TestCase):
     def test_invoke_registered_component(self):
@@ -113,5 +142,46 @@ class TestOpeaComponentLoader(unittest.TestCase):
             OpeaComponentLoader("UnregisteredComponent")
 
 
+class TestOpeaComponentReadiness(unittest.IsolatedAsyncioTestCase):
+    class SlowComponent(OpeaComponent):
+        def __init__(self, name, type, description, config=None):
+            super().__init__(name, type, description, config)
+            self.checks = 0
+
+        def check_health(self) -> bool:
+            return True
+
+        async def check_health_async(self) -> bool:
+            self.checks += 1
+            # the dependency hangs on the first check and fails on the second one
+            if self.checks == 1:
+                await asyncio.sleep(10)
+            return self.checks > 2
+
+        async def invoke(self, *args, **kwargs):
+            return "Service accessed"
+
+    def setUp(self):
+        OpeaComponentRegistry.register("SlowComponent")(self.SlowComponent)
+
+    def tearDown(self):
+        OpeaComponentLoader.stop_readiness_checks()
+        OpeaComponentRegistry.unregister("SlowComponent")
+
+    async def test_readiness_checks(self):
+        loader = OpeaComponentLoader("SlowComponent", type="embedding", description="Test component")
+        self.assertFalse(OpeaComponentLoader.readiness()["SlowComponent"])
+
+        self.assertFalse(await loader.check_readiness(timeout=0.05))
+        # retried in the background until the check succeeds
+        await asyncio.wait_for(loader.wait_until_ready(interval=0.01), 1)
+        self.assertTrue(OpeaComponentLoader.readiness()["SlowComponent"])
+        self.assertEqual(loader.component.checks, 3)
+
+    async def test_default_check_health_async(self):
+        loader = OpeaComponentLoader("SlowComponent", type="embedding", description="Test component")
+        self.assertTrue(await OpeaComponent.check_health_async(loader.component))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import threading
+import unittest
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from comps.cores.common.http_client import AsyncHTTPClient, get_http_client
+
+
+class TestAsyncHTTPClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = 0
+
+        async def flaky(request):
+            self.calls += 1
+            if self.calls < 3:
+                return web.Response(status=503)
+            return web.json_response({"calls": self.calls, "echo": await request.json()})
+
+        async def slow(request):
+            self.calls += 1
+            await asyncio.sleep(1)
+            return web.Response(text="late")
+
+        async def health(request):
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_post("/v1/flaky", flaky)
+        app.router.add_get("/v1/flaky", flaky)
+        app.router.add_get("/v1/slow", slow)
+        app.router.add_get("/health", health)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.base_url = str(self.server.make_url(""))
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_retry_transient_status(self):
+        client = AsyncHTTPClient(self.base_url, retries=2, backoff=0.01)
+        response = await client.post("/v1/flaky", json={"text": "opea"}, retry=True)
+        self.assertTrue(response.ok)
+        self.assertEqual(response.json(), {"calls": 3, "echo": {"text": "opea"}})
+
+        self.calls = 0
+        client.retries = 1
+        response = await client.post("/v1/flaky", json={"text": "opea"}, retry=True)
+        self.assertEqual(response.status, 503)
+        with self.assertRaises(aiohttp.ClientResponseError):
+            response.raise_for_status()
+        await client.close()
+
+    async def test_retry_idempotent_only(self):
+        client = AsyncHTTPClient(self.base_url, retries=2, backoff=0.01)
+        response = await client.post("/v1/flaky", json={"text": "opea"})
+        self.assertEqual(response.status, 503)
+        self.assertEqual(self.calls, 1)
+
+        response = await client.get("/v1/flaky", json={"text": "opea"})
+        self.assertTrue(response.ok)
+        self.assertEqual(self.calls, 3)
+        await client.close()
+
+    async def test_no_retry_on_timeout(self):
+        client = AsyncHTTPClient(self.base_url, retries=2, backoff=0.01, timeout=0.2)
+        with self.assertRaises(asyncio.TimeoutError):
+            await client.get("/v1/slow")
+        self.assertEqual(self.calls, 1)
+        await client.close()
+
+    async def test_close_session_of_previous_loop(self):
+        client = AsyncHTTPClient(self.base_url)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            response = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.get("/health"), loop))
+            self.assertTrue(response.ok)
+            stale = client._session
+
+            self.assertTrue(await client.check_health())
+            self.assertIsNot(client._session, stale)
+            for _ in range(100):
+                if stale.closed:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertTrue(stale.closed)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        await client.close()
+
+    async def test_check_health(self):
+        client = get_http_client(self.base_url + "/")
+        self.assertIs(client, get_http_client(self.base_url))
+        with self.assertLogs("comps-core-http-client", level="WARNING") as cm:
+            self.assertIs(client, get_http_client(self.base_url, trust_env=False, retries=client.retries))
+        self.assertIn("{'trust_env': False}", cm.output[0])
+        self.assertTrue(await client.check_health())
+        self.assertFalse(await client.check_health("/missing"))
+        self.assertFalse(await AsyncHTTPClient("http://127.0.0.1:1").check_health())
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
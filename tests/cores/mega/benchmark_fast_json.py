@@ -0,0 +1,118 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare the JSON handling of FastAPI with the orjson one of HTTPService on embedding and retrieval payloads.
+
+Usage: python benchmark_fast_json.py [--requests 200] [--dimension 1024] [--batch 32] [--docs 20]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from fastapi.datastructures import Default
+
+from comps.cores.mega.fast_json import OrjsonResponse, OrjsonRoute
+from comps.cores.proto.api_protocol import (
+    EmbeddingRequest,
+    EmbeddingResponse,
+    RetrievalRequest,
+    RetrievalResponse,
+    RetrievalResponseData,
+)
+
+
+def create_app(fast: bool, args) -> FastAPI:
+    if fast:
+        app = FastAPI(default_response_class=Default(OrjsonResponse))
+        app.router.route_class = OrjsonRoute
+    else:
+        app = FastAPI()
+
+    embeddings = np.random.rand(args.batch, args.dimension).astype(np.float32)
+    embedding_response = EmbeddingResponse(
+        data=[{"index": i, "embedding": e.tolist()} for i, e in enumerate(embeddings)]
+    ).model_dump()
+    text = "".join(random.choices("abcdefghij ", k=1000))
+    retrieval_response = RetrievalResponse(
+        retrieved_docs=[RetrievalResponseData(text=text, metadata={"source": f"doc{i}"}) for i in range(args.docs)]
+    ).model_dump()
+
+    @app.post("/v1/embeddings")
+    async def embeddings_typed(request: EmbeddingRequest) -> EmbeddingResponse:
+        return embedding_response
+
+    @app.post("/v1/embeddings/untyped")
+    async def embeddings_untyped(request: EmbeddingRequest):
+        return embedding_response
+
+    @app.post("/v1/retrieval")
+    async def retrieval_typed(request: RetrievalRequest) -> RetrievalResponse:
+        return retrieval_response
+
+    @app.post("/v1/retrieval/untyped")
+    async def retrieval_untyped(request: RetrievalRequest):
+        return retrieval_response
+
+    if fast:
+
+        @app.post("/v1/embeddings/numpy")
+        async def embeddings_numpy(request: EmbeddingRequest):
+            return OrjsonResponse(
+                {"object": "list", "data": [{"index": i, "embedding": e} for i, e in enumerate(embeddings)]}
+            )
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, payload: dict, requests: int) -> float:
+    """Get the mean latency in milliseconds of a route."""
+    for _ in range(10):
+        (await client.post(path, json=payload)).raise_for_status()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await client.post(path, json=payload)
+    return (time.perf_counter() - start) / requests * 1000
+
+
+async def main(args):
+    payloads = {
+        "/v1/embeddings": {"input": ["What is the revenue of Nike in 2023?"] * args.batch},
+        "/v1/retrieval": {"text": "What is OPEA?", "embedding": np.random.rand(args.dimension).tolist()},
+    }
+    paths = [
+        ("/v1/embeddings", "/v1/embeddings"),
+        ("/v1/embeddings/untyped", "/v1/embeddings"),
+        ("/v1/embeddings/numpy", "/v1/embeddings"),
+        ("/v1/retrieval", "/v1/retrieval"),
+        ("/v1/retrieval/untyped", "/v1/retrieval"),
+    ]
+    results = {}
+    for fast in (False, True):
+        transport = httpx.ASGITransport(app=create_app(fast, args))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path, payload in paths:
+                if path.endswith("numpy") and not fast:
+                    continue
+                results[(path, fast)] = await measure(client, path, payloads[payload], args.requests)
+
+    print(f"{'route':<26}{'fastapi (ms)':>14}{'orjson (ms)':>14}{'speedup':>10}")
+    for path, _ in paths:
+        base, fast = results.get((path, False)), results[(path, True)]
+        if base is None:
+            print(f"{path:<26}{'-':>14}{fast:>14.3f}{'-':>10}")
+        else:
+            print(f"{path:<26}{base:>14.3f}{fast:>14.3f}{base / fast:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--docs", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+
+from comps.cores.mega.admission import AdmissionController
+
+
+class TestAdmissionController(unittest.IsolatedAsyncioTestCase):
+    async def test_priority_queue(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_size=3)
+        await controller.acquire()
+        order = []
+
+        async def request(name, priority):
+            await controller.acquire(priority)
+            order.append(name)
+            controller.release()
+
+        tasks = [
+            asyncio.create_task(request("low", 1)),
+            asyncio.create_task(request("high", 0)),
+            asyncio.create_task(request("low2", 1)),
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(controller.queued, 3)
+
+        # the queue is full
+        with self.assertRaises(HTTPException) as cm:
+            await controller.acquire()
+        self.assertEqual(cm.exception.status_code, 429)
+
+        controller.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(order, ["high", "low", "low2"])
+        self.assertEqual((controller.active, controller.queued), (0, 0))
+
+    async def test_queue_timeout(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_size=1, queue_timeout=0.05)
+        await controller.acquire()
+        with self.assertRaises(HTTPException) as cm:
+            await controller.acquire()
+        self.assertEqual(cm.exception.status_code, 429)
+        self.assertEqual(controller.queued, 0)
+
+        # the timed out waiter does not take the released slot
+        controller.release()
+        self.assertEqual(controller.active, 0)
+        await controller.acquire()
+        self.assertEqual(controller.active, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,15 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
+import itertools
 import json
 import multiprocessing
+import threading
 import time
 import unittest
+from unittest import mock
 
+import numpy as np
 import requests
 
 from comps import (
@@ -17,6 +21,7 @@ from comps import (
     register_statistics,
     statistics_dict,
 )
+from comps.cores.mega.base_statistics import BaseStatistics, QuantileSketch
 
 
 @register_microservice(name="s1", host="0.0.0.0", port=8083, endpoint="/v1/add")
@@ -58,5 +63,76 @@ class TestBaseStatistics(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(int(p50), int(p99))
 
 
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles(self):
+        values = np.random.default_rng(0).lognormal(size=10000)
+        sketch = QuantileSketch()
+        for value in values:
+            sketch.add(value)
+        for q in (0.5, 0.9, 0.99):
+            self.assertAlmostEqual(sketch.quantile(q), np.quantile(values, q), delta=np.quantile(values, q) * 0.02)
+        self.assertAlmostEqual(sketch.average(), np.average(values))
+        self.assertLess(len(sketch.buckets), 2000)
+
+    @mock.patch("comps.cores.mega.base_statistics.time.time", return_value=1_000_005.0)
+    def test_merge_and_windows(self, _):
+        statistics = BaseStatistics()
+        for latency in (1.0, 2.0):
+            statistics.append_latency(latency, 0.1)
+        # an old measurement, only in the 1h window
+        statistics.response_times.add(8.0, 1_000_005.0 - 600)
+
+        merged = BaseStatistics()
+        merged.merge_state(json.loads(json.dumps(statistics.state())))
+        merged.merge_state(json.loads(json.dumps(statistics.state())))
+
+        result = merged.calculate_statistics()
+        self.assertEqual(result["request_count"], 6)
+        self.assertAlmostEqual(result["p50_latency"], 2.0, delta=0.02)
+        self.assertAlmostEqual(merged.calculate_first_token_statistics()["p99_latency_first_token"], 0.1, delta=0.01)
+        self.assertIsNone(merged.calculate_inter_token_statistics()["p50_latency_inter_token"])
+
+        windows = merged.calculate_window_statistics()
+        self.assertEqual(windows["1m"]["request_count"], 4)
+        # the oldest 10s slot of the window started 65s ago
+        self.assertAlmostEqual(windows["1m"]["throughput"], 4 / 65)
+        self.assertAlmostEqual(windows["1m"]["p99_latency"], 2.0, delta=0.02)
+        self.assertEqual(windows["1h"]["request_count"], 6)
+        self.assertAlmostEqual(windows["1h"]["p99_latency"], 8.0, delta=0.1)
+
+    def test_inter_token_latency(self):
+        statistics = BaseStatistics()
+        # 11 tokens, the 10 after the first one took 2s
+        statistics.append_latency(2.5, 0.5, token_count=11)
+        statistics.append_latency(1.0, 0.5, token_count=1)
+        result = statistics.calculate_inter_token_statistics()
+        self.assertAlmostEqual(result["average_latency_inter_token"], 0.2)
+        self.assertEqual(statistics.inter_token_latencies.total.count, 1)
+
+    def test_concurrent_append(self):
+        statistics = BaseStatistics()
+        stop = threading.Event()
+
+        def append():
+            while not stop.is_set():
+                statistics.append_latency(1.0, 0.5, token_count=3)
+
+        # every call falls in a new time slot, adding and pruning the slots while the windows are read
+        clock = itertools.count(1_000_000, 10)
+        with mock.patch("comps.cores.mega.base_statistics.time.time", side_effect=lambda: next(clock)):
+            threads = [threading.Thread(target=append) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            try:
+                for _ in range(50):
+                    windows = statistics.calculate_window_statistics()
+                    self.assertLessEqual(windows["1m"]["request_count"], windows["1h"]["request_count"])
+                    json.dumps(statistics.state())
+            finally:
+                stop.set()
+                for thread in threads:
+                    thread.join()
+
+
 if __name__ == "__main__":
     unittest.main()
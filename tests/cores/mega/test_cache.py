@@ -0,0 +1,67 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+import unittest
+
+from comps.cores.mega.cache import EmbeddingCache, LRUCache, ResultCache, canonical_hash
+
+
+class TestCache(unittest.IsolatedAsyncioTestCase):
+    def test_canonical_hash(self):
+        self.assertEqual(canonical_hash({"a": 1, "b": [1, 2]}), canonical_hash({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(canonical_hash({"a": 1}), canonical_hash({"a": 2}))
+
+    def test_lru_cache(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        # "b" is the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+        cache = LRUCache(max_size=2, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("a"))
+
+    def test_lru_cache_max_bytes(self):
+        cache = LRUCache(max_size=None, max_bytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"5678")
+        self.assertEqual(cache.get("a"), b"1234")
+        cache.set("c", b"90ab")
+        # "b" is evicted to fit the budget
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.nbytes, 8)
+        cache.set("a", b"12")
+        self.assertEqual(cache.nbytes, 6)
+        # larger than the whole budget
+        cache.set("d", b"x" * 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(len(cache), 2)
+
+    async def test_embedding_cache(self):
+        cache = EmbeddingCache("test", max_bytes=1024)
+        keys = [EmbeddingCache.key("model", text) for text in ("hello", "world")]
+        self.assertNotEqual(keys[0], EmbeddingCache.key("other", "hello"))
+        self.assertEqual(await cache.get_many(keys), [None, None])
+        await cache.set_many({keys[0]: b"\x00" * 16})
+        self.assertEqual(await cache.get_many(keys), [b"\x00" * 16, None])
+        self.assertEqual(cache.hit_ratio, 0.25)
+        self.assertEqual(cache.local.nbytes, 16)
+
+    async def test_result_cache(self):
+        cache = ResultCache(max_size=2)
+        await cache.set("k", {"text": "hello"})
+        result = await cache.get("k")
+        self.assertEqual(result, {"text": "hello"})
+        result["text"] = "changed"
+        self.assertEqual(await cache.get("k"), {"text": "hello"})
+        self.assertIsNone(await cache.get("missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@
 import unittest
 from collections import OrderedDict
 
-from comps.cores.mega.dag import DAG
+from comps.cores.mega.dag import DAG, RuntimeGraph
 
 
 class TestDAG(unittest.TestCase):
@@ -38,6 +38,48 @@ class TestDAG(unittest.TestCase):
         self.assertEqual(dag2.graph, OrderedDict([("a", {"d"}), ("b", {"c"}), ("c", {"d"}), ("d", set())]))
         dag2.delete_node("c")
         self.assertEqual(dag2.graph, OrderedDict([("a", {"d"}), ("b", set()), ("d", set())]))
+        self.assertEqual(dag2.predecessors("d"), ["a"])
+
+    def test_cycle(self):
+        dag = DAG()
+        dag.from_dict({"a": ["b"], "b": ["c"], "c": []})
+        with self.assertRaises(Exception):
+            dag.add_edge("c", "a")
+        with self.assertRaises(Exception):
+            dag.add_edge("b", "b")
+        self.assertEqual(dag.graph, OrderedDict([("a", {"b"}), ("b", {"c"}), ("c", set())]))
+        self.assertEqual(dag.predecessors("a"), [])
+
+        dag.add_edge("a", "c")
+        self.assertEqual(dag.predecessors("c"), ["b", "a"])
+
+        with self.assertRaises(Exception):
+            dag.from_dict({"a": ["b"], "b": ["a"]})
+        self.assertEqual(dag.size(), 0)
+
+    def test_execution_plan(self):
+        dag = DAG()
+        dag.from_dict({"a": ["b", "d"], "b": ["c"], "c": ["d"], "d": []})
+        plan = dag.execution_plan()
+        self.assertIs(dag.execution_plan(), plan)
+        self.assertEqual([plan.nodes[i] for i in plan.order], ["a", "b", "c", "d"])
+        self.assertEqual(plan.in_degree, [0, 1, 1, 2])
+        self.assertEqual([plan.nodes[i] for i in plan.ind_nodes], ["a"])
+
+        runtime_graph = RuntimeGraph(plan)
+        self.assertEqual(runtime_graph.graph, dag.graph)
+        runtime_graph.delete_edge("a", "b")
+        self.assertEqual(runtime_graph.downstream("a"), ["d"])
+        self.assertEqual(runtime_graph.predecessors("b"), [])
+        runtime_graph.keep_reachable()
+        self.assertEqual(runtime_graph.graph, OrderedDict([("a", {"d"}), ("d", set())]))
+        self.assertEqual(runtime_graph.all_leaves(), ["d"])
+        # the plan and the graph it was compiled from are left untouched
+        self.assertEqual(sorted(dag.downstream("a")), ["b", "d"])
+        self.assertEqual(RuntimeGraph(plan).size(), 4)
+
+        dag.add_node("e")
+        self.assertIsNot(dag.execution_plan(), plan)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,13 @@
 
 import asyncio
 import multiprocessing
+import time
 import unittest
 from enum import Enum
 
 import aiohttp
 
-from comps import ServiceType, TextDoc, opea_microservices, register_microservice
+from comps import MicroService, ServiceType, TextDoc, opea_microservices, register_microservice
 
 
 async def dynamic_batching_infer(service_type: Enum, batch: list[dict]):
@@ -28,14 +29,10 @@ async def dynamic_batching_infer(service_type: Enum, batch: list[dict]):
     dynamic_batching_max_batch_size=32,
 )
 async def add(request: TextDoc) -> dict:
-    response_future = asyncio.get_event_loop().create_future()
-
     cur_microservice = opea_microservices["s1"]
     cur_microservice.dynamic_batching_infer = dynamic_batching_infer
 
-    async with cur_microservice.buffer_lock:
-        cur_microservice.request_buffer[ServiceType.EMBEDDING].append({"request": request, "response": response_future})
-    result = await response_future
+    result = await cur_microservice.batch_request(ServiceType.EMBEDDING, request)
     return result
 
 
@@ -49,14 +46,10 @@ async def add(request: TextDoc) -> dict:
     dynamic_batching_max_batch_size=32,
 )
 async def add2(request: TextDoc) -> dict:
-    response_future = asyncio.get_event_loop().create_future()
-
     cur_microservice = opea_microservices["s1"]
     cur_microservice.dynamic_batching_infer = dynamic_batching_infer
 
-    async with cur_microservice.buffer_lock:
-        cur_microservice.request_buffer[ServiceType.EMBEDDING].append({"request": request, "response": response_future})
-    result = await response_future
+    result = await cur_microservice.batch_request(ServiceType.EMBEDDING, request)
     return result
 
 
@@ -90,5 +83,60 @@ class TestMicroService(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(response2["result"], "processed: OPEA Project!")
 
 
+class TestBatchTriggers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = MicroService(
+            name="batcher",
+            port=8089,
+            dynamic_batching=True,
+            dynamic_batching_timeout=0.2,
+            dynamic_batching_max_batch_size=2,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.stop()
+
+    def setUp(self):
+        self.batches = []
+        self.service.dynamic_batching_infer = self.infer
+
+    def run_requests(self, n):
+        # the batch processor runs in the service's event loop
+        requests = [self.service.batch_request(ServiceType.EMBEDDING, i) for i in range(n)]
+
+        async def gather():
+            return await asyncio.gather(*requests)
+
+        return self.service.event_loop.run_until_complete(gather())
+
+    async def infer(self, service_type, batch):
+        self.batches.append([req["request"] for req in batch])
+        await asyncio.sleep(0.05)
+        return [req["request"] * 2 for req in batch]
+
+    def test_triggers(self):
+        # a full batch runs at once, the leftover request when its max wait expires
+        start = time.monotonic()
+        self.assertEqual(self.run_requests(3), [0, 2, 4])
+        self.assertEqual(self.batches, [[0, 1], [2]])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+        self.batches.clear()
+        start = time.monotonic()
+        self.run_requests(2)
+        self.assertEqual(self.batches, [[0, 1]])
+        self.assertLess(time.monotonic() - start, 0.2)
+
+    def test_failure(self):
+        async def infer(service_type, batch):
+            raise RuntimeError("inference failed")
+
+        self.service.dynamic_batching_infer = infer
+        with self.assertRaises(RuntimeError):
+            self.run_requests(1)
+
+
 if __name__ == "__main__":
     unittest.main()
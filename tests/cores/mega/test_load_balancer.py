@@ -0,0 +1,78 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import random
+import unittest
+from unittest import mock
+
+from comps import MicroService, ServiceOrchestrator
+from comps.cores.mega.load_balancer import POWER_OF_TWO, ReplicaPool
+
+
+class TestReplicaPool(unittest.TestCase):
+    def test_least_pending(self):
+        pool = ReplicaPool(["http://a/v1", "http://b/v1", "http://c/v1"])
+        replicas = [pool.acquire() for _ in range(3)]
+        self.assertEqual(
+            sorted(replica.endpoint for replica in replicas), ["http://a/v1", "http://b/v1", "http://c/v1"]
+        )
+
+        pool.release(replicas[1])
+        self.assertIs(pool.acquire(), replicas[1])
+
+    def test_power_of_two(self):
+        # seeded, the bound on the random choices must hold on every run
+        state = random.getstate()
+        random.seed(0)
+        try:
+            pool = ReplicaPool(["http://a/v1", "http://b/v1", "http://c/v1"], strategy=POWER_OF_TWO)
+            for _ in range(30):
+                pool.acquire()
+        finally:
+            random.setstate(state)
+        self.assertEqual(sum(replica.pending for replica in pool.replicas), 30)
+        self.assertLessEqual(max(replica.pending for replica in pool.replicas), 11)
+
+        # the less loaded of the two sampled replicas is picked
+        pool = ReplicaPool(["http://a/v1", "http://b/v1", "http://c/v1"], strategy=POWER_OF_TWO)
+        pool.replicas[0].pending, pool.replicas[1].pending, pool.replicas[2].pending = 0, 5, 3
+        with mock.patch("random.sample", return_value=pool.replicas[1:]):
+            self.assertIs(pool.acquire(), pool.replicas[2])
+
+    def test_ejection(self):
+        pool = ReplicaPool(["http://a/v1", "http://b/v1"], max_fails=2, fail_timeout=60)
+        bad = pool.replicas[0]
+        for _ in range(2):
+            bad.pending += 1
+            pool.release(bad, failed=True)
+        self.assertEqual(pool.healthy(), [pool.replicas[1]])
+        for _ in range(5):
+            self.assertIsNot(pool.acquire(), bad)
+
+        # every replica ejected: fall back to all of them
+        good = pool.replicas[1]
+        for _ in range(2):
+            good.pending += 1
+            pool.release(good, failed=True)
+        self.assertEqual(pool.healthy(), pool.replicas)
+
+    def test_orchestrator_replicas(self):
+        service = MicroService(
+            name="s1",
+            host="fakehost",
+            port=8008,
+            endpoint="/v1/add",
+            use_remote_service=True,
+            replicas=["fakehost1:8008", "fakehost2:8008"],
+        )
+        self.assertEqual(service.endpoint_paths, ["http://fakehost1:8008/v1/add", "http://fakehost2:8008/v1/add"])
+
+        service_builder = ServiceOrchestrator()
+        service_builder.add(service)
+        pool = service_builder.replica_pool(service.name)
+        self.assertIs(service_builder.replica_pool(service.name), pool)
+        self.assertEqual([replica.endpoint for replica in pool.replicas], service.endpoint_paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
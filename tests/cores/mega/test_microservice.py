@@ -5,9 +5,10 @@ import json
 import multiprocessing
 import unittest
 
+import numpy as np
 from fastapi.testclient import TestClient
 
-from comps import MicroService, TextDoc, opea_microservices, register_microservice
+from comps import MicroService, OrjsonResponse, TextDoc, opea_microservices, register_microservice
 
 
 @register_microservice(name="s1", host="0.0.0.0", port=8080, endpoint="/v1/add")
@@ -23,6 +24,10 @@ def sum_test():
     return 1 + 1
 
 
+def embedding_test():
+    return OrjsonResponse({"embedding": np.arange(3, dtype=np.float32), "doc": TextDoc(text="OPEA")})
+
+
 class TestMicroService(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(opea_microservices["s1"].app)
@@ -51,9 +56,30 @@ class TestMicroService(unittest.TestCase):
             {"Service Title": "s1", "Version": "1.2", "Service Description": "OPEA Microservice Infrastructure"},
         )
 
+        response = self.client.get("/v1/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"ready": True, "components": {}})
+
         response = self.client.get("/v1/sum")
         self.assertEqual(response.json(), 2)
 
 
+class TestOrjson(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(opea_microservices["s1"].app)
+        opea_microservices["s1"].add_route("/v1/embedding", embedding_test, methods=["GET"])
+
+    def test_orjson(self):
+        response = self.client.get("/v1/embedding").json()
+        self.assertEqual(response["embedding"], [0.0, 1.0, 2.0])
+        self.assertEqual(response["doc"]["text"], "OPEA")
+
+        headers = {"Content-Type": "application/json"}
+        response = self.client.post("/v1/add", content=b'{"text": "Hello, \\u00e9 "}', headers=headers)
+        self.assertEqual(response.json()["text"], "Hello, \u00e9 OPEA Project!")
+        response = self.client.post("/v1/add", content=b'{"text": ', headers=headers)
+        self.assertEqual(response.status_code, 422)
+
+
 if __name__ == "__main__":
     unittest.main()
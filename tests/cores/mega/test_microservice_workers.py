@@ -0,0 +1,64 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import multiprocessing
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from comps import TextDoc, opea_microservices, register_microservice, register_statistics, statistics_dict
+from comps.cores.mega import http_service
+
+
+@register_microservice(name="s1", host="0.0.0.0", port=8090, endpoint="/v1/pid", workers=2)
+@register_statistics(names=["opea_service@s1_pid"])
+async def pid(request: TextDoc) -> TextDoc:
+    start = time.time()
+    # block the worker, the next requests are accepted by the other one
+    time.sleep(0.5)
+    statistics_dict["opea_service@s1_pid"].append_latency(time.time() - start, None)
+    return {"text": str(os.getpid())}
+
+
+def post(_):
+    return requests.post("http://localhost:8090/v1/pid", json={"text": "hello"}).json()["text"]
+
+
+class TestMicroServiceWorkers(unittest.TestCase):
+    def setUp(self):
+        http_service.STATISTICS_SYNC_INTERVAL = 0.1
+        self.process1 = multiprocessing.Process(target=opea_microservices["s1"].start, daemon=False, name="s1")
+        self.process1.start()
+        for _ in range(50):
+            if http_service.HTTPService.check_server_readiness("localhost:8090/v1/health_check"):
+                break
+            time.sleep(0.1)
+
+    def tearDown(self):
+        opea_microservices["s1"].stop()
+        self.process1.terminate()
+        self.process1.join()
+
+    def test_workers(self):
+        pids = set()
+        # the second worker may still be starting up
+        for _ in range(5):
+            with ThreadPoolExecutor(4) as executor:
+                pids.update(executor.map(post, range(4)))
+            if len(pids) > 1:
+                break
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(str(self.process1.pid), pids)
+
+        # every worker reports the statistics of all of them
+        time.sleep(0.3)
+        for _ in range(4):
+            res = requests.get("http://localhost:8090/v1/statistics").json()
+            self.assertGreaterEqual(res["opea_service@s1_pid"]["p50_latency"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import threading
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+from comps.cores.mega import http_service
+from comps.cores.mega.profiler import EventLoopMonitor, SamplingProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def blocking_call():
+    time.sleep(0.4)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_sampling_profiler(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        thread.start()
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        time.sleep(0.2)
+        collapsed = profiler.stop()
+        stop.set()
+        thread.join()
+
+        self.assertFalse(profiler.running)
+        stacks = [line.rsplit(" ", 1) for line in collapsed.splitlines()]
+        busy = [(stack, int(count)) for stack, count in stacks if stack.startswith("busy;")]
+        self.assertTrue(busy)
+        self.assertTrue(all("busy_loop (" in stack for stack, _ in busy))
+        self.assertNotIn("opea-profiler", collapsed)
+
+    def test_profile_routes(self):
+        http_service.PROFILING = True
+        try:
+            service = http_service.HTTPService(
+                runtime_args={"protocol": "http", "host": "localhost", "port": 8091, "title": "s1", "description": ""}
+            )
+        finally:
+            http_service.PROFILING = False
+        with TestClient(service.app) as client:
+            response = client.get("/v1/profile/cpu", params={"seconds": 0.1})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("MainThread;", response.text)
+            self.assertEqual(client.post("/v1/profile/cpu/stop").status_code, 409)
+
+            self.assertEqual(client.get("/v1/profile/memory").status_code, 409)
+            self.assertEqual(client.post("/v1/profile/memory/start").status_code, 200)
+            data = [bytearray(1000) for _ in range(100)]
+            response = client.get("/v1/profile/memory", params={"limit": 5})
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json()["top"]), 5)
+            self.assertGreater(response.json()["traced_memory"]["current"], 100000)
+            self.assertEqual(client.post("/v1/profile/memory/stop").status_code, 200)
+            del data
+
+            self.assertGreaterEqual(client.get("/v1/profile/loop").json()["lag"], 0)
+
+    def test_event_loop_monitor(self):
+        monitor = EventLoopMonitor("s1", interval=0.05, slow_callback_threshold=0.1)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.1)
+            blocking_call()
+            # the overdue tick measures the lag
+            await asyncio.sleep(0.01)
+            monitor.stop()
+
+        with self.assertLogs("comps-core-profiler", level="WARNING") as cm:
+            asyncio.run(run())
+        self.assertGreater(monitor.lag, 0.3)
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("blocking_call", cm.output[0])
+
+    def test_event_loop_monitor_block_within_interval(self):
+        # a 0.3s block starting 0.3s into the 0.5s sleep of the lag measurement delays it by 0.1s only
+        monitor = EventLoopMonitor("s1", interval=0.5, slow_callback_threshold=0.25)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.3)
+            time.sleep(0.3)
+            await asyncio.sleep(0.05)
+            monitor.stop()
+
+        with self.assertLogs("comps-core-profiler", level="WARNING") as cm:
+            asyncio.run(run())
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("run", cm.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@
 import json
 import multiprocessing
 import unittest
+from unittest import mock
 
 from comps import ServiceOrchestrator, TextDoc, opea_microservices, register_microservice
 
@@ -52,6 +53,49 @@ class TestServiceOrchestrator(unittest.IsolatedAsyncioTestCase):
         result_dict, _ = await self.service_builder.schedule(initial_inputs={"text": "hello, "})
         self.assertEqual(result_dict[self.s2.name]["text"], "hello, opea project!")
 
+    async def test_schedule_reuses_session(self):
+        await self.service_builder.schedule(initial_inputs={"text": "hello, "})
+        session = self.service_builder._client_session()
+        result_dict, _ = await self.service_builder.schedule(initial_inputs={"text": "hi, "})
+        self.assertEqual(result_dict[self.s2.name]["text"], "hi, opea project!")
+        self.assertIs(self.service_builder._client_session(), session)
+
+        await self.service_builder.close()
+        self.assertTrue(session.closed)
+
+    async def test_schedule_with_cache(self):
+        service_builder = ServiceOrchestrator()
+        service_builder.add(self.s1).add(self.s2)
+        service_builder.flow_to(self.s1, self.s2)
+        service_builder.enable_cache(self.s1)
+
+        session = service_builder._client_session()
+        with mock.patch.object(session, "post", wraps=session.post) as post:
+            for _ in range(2):
+                result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+                self.assertEqual(result_dict[self.s2.name]["text"], "hello, opea project!")
+        self.assertEqual(len(service_builder._caches[self.s1.name].local), 1)
+        # the second request got the result of s1 from the cache, only s2 was called again
+        endpoints = [call.args[0] for call in post.call_args_list]
+        self.assertEqual(endpoints, [self.s1.endpoint_path, self.s2.endpoint_path, self.s2.endpoint_path])
+        await service_builder.close()
+
+    async def test_schedule_in_process(self):
+        service_builder = ServiceOrchestrator(in_process_dispatch=True)
+        service_builder.add(self.s1).add(self.s2)
+        service_builder.flow_to(self.s1, self.s2)
+        self.assertIsNotNone(service_builder.local_handler(self.s1.name))
+        self.assertIsNone(self.service_builder.local_handler(self.s1.name))
+
+        session = service_builder._client_session()
+        with mock.patch.object(session, "post", wraps=session.post) as post:
+            result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+        self.assertEqual(result_dict[self.s1.name]["text"], "hello, opea ")
+        self.assertEqual(result_dict[self.s2.name]["text"], "hello, opea project!")
+        # both handlers were called in-process, without any HTTP hop
+        post.assert_not_called()
+        await service_builder.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import multiprocessing
+import unittest
+
+from fastapi.responses import StreamingResponse
+
+from comps import ServiceOrchestrator, ServiceType, TextDoc, opea_microservices, register_microservice
+
+
+@register_microservice(name="llm", host="0.0.0.0", port=8086, endpoint="/v1/add", service_type=ServiceType.LLM)
+async def llm_add(request: TextDoc) -> TextDoc:
+    async def token_generator():
+        for i in [" OPEA", " is", " great.", " I", " think ", " so."]:
+            yield i
+
+    return StreamingResponse(token_generator(), media_type="text/event-stream")
+
+
+@register_microservice(name="upper", host="0.0.0.0", port=8087, endpoint="/v1/add")
+async def upper_add(request: TextDoc) -> TextDoc:
+    return {"text": request.text.upper()}
+
+
+@register_microservice(name="echo", host="0.0.0.0", port=8088, endpoint="/v1/add")
+async def echo_add(request: TextDoc) -> TextDoc:
+    return {"text": request.text + " !"}
+
+
+@register_microservice(name="long_llm", host="0.0.0.0", port=8090, endpoint="/v1/add", service_type=ServiceType.LLM)
+async def long_llm_add(request: TextDoc) -> TextDoc:
+    async def token_generator():
+        for i in range(8):
+            yield f" Sentence {i}."
+
+    return StreamingResponse(token_generator(), media_type="text/event-stream")
+
+
+@register_microservice(name="broken", host="0.0.0.0", port=8089, endpoint="/v1/add")
+async def broken_add(request: TextDoc):
+    # not a text response, forwarding a sentence to this node fails
+    return {"answer": request.text}
+
+
+class TestServiceOrchestratorStreamTee(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.llm = opea_microservices["llm"]
+        cls.upper = opea_microservices["upper"]
+        cls.echo = opea_microservices["echo"]
+        cls.long_llm = opea_microservices["long_llm"]
+        cls.broken = opea_microservices["broken"]
+        cls.processes = [
+            multiprocessing.Process(target=service.start, daemon=False, name=service.name)
+            for service in (cls.llm, cls.upper, cls.echo, cls.long_llm, cls.broken)
+        ]
+        for process in cls.processes:
+            process.start()
+
+        cls.service_builder = ServiceOrchestrator()
+        cls.service_builder.add(cls.llm).add(cls.upper).add(cls.echo)
+        cls.service_builder.flow_to(cls.llm, cls.upper)
+        cls.service_builder.flow_to(cls.llm, cls.echo)
+
+    @classmethod
+    def tearDownClass(cls):
+        for service in (cls.llm, cls.upper, cls.echo, cls.long_llm, cls.broken):
+            service.stop()
+        for process in cls.processes:
+            process.terminate()
+
+    async def test_schedule(self):
+        result_dict, runtime_graph = await self.service_builder.schedule(initial_inputs={"text": "hello, "})
+        self.assertEqual(sorted(runtime_graph.all_leaves()), sorted([self.upper.name, self.echo.name]))
+
+        expected = {
+            self.upper.name: ["OPEA", "IS", "GREAT.", "I", "THINK", "SO."],
+            self.echo.name: ["OPEA", "is", "great.", "!", "I", "think", "so.", "!"],
+        }
+        for node, tokens in expected.items():
+            response = result_dict[node]
+            self.assertIsInstance(response, StreamingResponse)
+            chunks = [
+                self.service_builder.extract_chunk_str(k).strip()
+                async for k in response.__reduce__()[2]["body_iterator"]
+            ]
+            self.assertEqual(chunks, tokens)
+
+    async def test_failed_consumer(self):
+        # the failed node must not block the reader once its single buffered sentence is full
+        service_builder = ServiceOrchestrator(stream_buffer_size=1, stream_downstream_window=1)
+        service_builder.add(self.long_llm).add(self.broken).add(self.upper)
+        service_builder.flow_to(self.long_llm, self.broken)
+        service_builder.flow_to(self.long_llm, self.upper)
+        result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+
+        async def read(node):
+            return [service_builder.extract_chunk_str(k).strip() async for k in result_dict[node].body_iterator]
+
+        chunks = await asyncio.wait_for(read(self.upper.name), 10)
+        self.assertEqual(chunks, [token for i in range(8) for token in ("SENTENCE", f"{i}.")])
+        with self.assertRaises(Exception):
+            await asyncio.wait_for(read(self.broken.name), 10)
+        await service_builder.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
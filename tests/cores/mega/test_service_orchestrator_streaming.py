@@ -1,10 +1,13 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 import json
 import multiprocessing
+import os
 import time
 import unittest
+from unittest import mock
 
 import requests
 from fastapi.responses import StreamingResponse
@@ -20,6 +23,9 @@ async def s1_add(request: TextDoc) -> TextDoc:
     req = request.model_dump_json()
     req_dict = json.loads(req)
     text = req_dict["text"]
+    if "great" in text:
+        # finish after the next sentence to check the stream keeps the sentence order
+        await asyncio.sleep(0.2)
     text += " ~~~"
     return {"text": text}
 
@@ -111,6 +117,83 @@ class TestServiceOrchestratorStreaming(unittest.IsolatedAsyncioTestCase):
         res = self.service_builder.extract_chunk_str("data: b'example test.'\n\n")
         self.assertEqual(res, "example test.")
 
+    async def test_stream_admission_release(self):
+        service_builder = ServiceOrchestrator(max_concurrency=1)
+        service_builder.add(self.s0).add(self.s1)
+        service_builder.flow_to(self.s0, self.s1)
+        admission = service_builder.admission
+
+        # read to the end, then closed: the slot is released once
+        result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+        response = result_dict["s1/MicroService"]
+        self.assertEqual(admission.active, 1)
+        async for _ in response.body_iterator:
+            pass
+        await response.background()
+        self.assertEqual(admission.active, 0)
+
+        # the client left before the stream started: closing the response releases the slot
+        llm_builder = ServiceOrchestrator(max_concurrency=1)
+        llm_builder.add(self.s0)
+        result_dict, _ = await llm_builder.schedule(initial_inputs={"text": "hello, "})
+        self.assertEqual(llm_builder.admission.active, 1)
+        await result_dict["s0/MicroService"].background()
+        self.assertEqual(llm_builder.admission.active, 0)
+        await service_builder.close()
+        await llm_builder.close()
+
+    async def test_stream_replica_release(self):
+        llm_builder = ServiceOrchestrator()
+        llm_builder.add(self.s0)
+        replica = llm_builder.replica_pool("s0/MicroService").replicas[0]
+        result_dict, _ = await llm_builder.schedule(initial_inputs={"text": "hello, "})
+        self.assertEqual(replica.pending, 1)
+        # the client left before the stream started: closing the response gives the replica back, once
+        await result_dict["s0/MicroService"].background()
+        self.assertEqual(replica.pending, 0)
+        await result_dict["s0/MicroService"].background()
+        self.assertEqual(replica.pending, 0)
+
+        # read to the end, then closed
+        result_dict, _ = await llm_builder.schedule(initial_inputs={"text": "hello, "})
+        response = result_dict["s0/MicroService"]
+        async for _ in response.body_iterator:
+            pass
+        await response.background()
+        self.assertEqual(replica.pending, 0)
+        await llm_builder.close()
+
+    async def test_stream_without_proxy(self):
+        service_builder = ServiceOrchestrator()
+        service_builder.add(self.s0).add(self.s1)
+        service_builder.flow_to(self.s0, self.s1)
+        # the services are reached directly, whatever the proxies of the env
+        with mock.patch.dict(os.environ, {"http_proxy": "http://127.0.0.1:1", "no_proxy": "", "NO_PROXY": ""}):
+            result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+            tokens = [
+                service_builder.extract_chunk_str(k).strip() async for k in result_dict["s1/MicroService"].body_iterator
+            ]
+        self.assertEqual(tokens, ["OPEA", "is", "great.", "~~~", "I", "think", "so.", "~~~"])
+        await service_builder.close()
+
+    async def test_sync_align_generator(self):
+        class SyncOrchestrator(ServiceOrchestrator):
+            def align_generator(self, gen, **kwargs):
+                # overrides written for the former blocking generators keep working
+                for line in gen:
+                    yield line.upper()
+
+        service_builder = SyncOrchestrator()
+        service_builder.add(self.s0).add(self.s1)
+        service_builder.flow_to(self.s0, self.s1)
+        result_dict, _ = await service_builder.schedule(initial_inputs={"text": "hello, "})
+        tokens = [
+            service_builder.extract_chunk_str(k.lower()).strip()
+            async for k in result_dict["s1/MicroService"].body_iterator
+        ]
+        self.assertEqual(tokens, ["opea", "is", "great.", "~~~", "i", "think", "so.", "~~~"])
+        await service_builder.close()
+
     def test_token_generator(self):
         start = time.time()
         sentence = "I write an example test.</s>"
@@ -1,10 +1,14 @@
 # Copyright (C) 2024 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 import json
 import multiprocessing
+import time
 import unittest
 
+import aiohttp
+
 from comps import ServiceOrchestratorWithYaml, TextDoc, opea_microservices, register_microservice
 
 
@@ -26,21 +30,39 @@ async def s2_add(request: TextDoc) -> TextDoc:
     return {"text": text}
 
 
+@register_microservice(name="p1", host="0.0.0.0", port=8091, endpoint="/v1/add")
+async def p1_add(request: TextDoc) -> TextDoc:
+    await asyncio.sleep(1)
+    return {"text": request.text + "opea "}
+
+
+@register_microservice(name="p2", host="0.0.0.0", port=8092, endpoint="/v1/add")
+async def p2_add(request: TextDoc) -> TextDoc:
+    await asyncio.sleep(1)
+    return {"text": request.text + "opea "}
+
+
 class TestYAMLOrchestrator(unittest.IsolatedAsyncioTestCase):
-    def setUp(self) -> None:
-        self.s1 = opea_microservices["s1"]
-        self.s2 = opea_microservices["s2"]
+    @classmethod
+    def setUpClass(cls):
+        cls.s1 = opea_microservices["s1"]
+        cls.s2 = opea_microservices["s2"]
+        cls.p1 = opea_microservices["p1"]
+        cls.p2 = opea_microservices["p2"]
 
-        self.process1 = multiprocessing.Process(target=self.s1.start, daemon=False, name="s1")
-        self.process2 = multiprocessing.Process(target=self.s2.start, daemon=False, name="s2")
-        self.process1.start()
-        self.process2.start()
+        cls.processes = [
+            multiprocessing.Process(target=service.start, daemon=False, name=service.name)
+            for service in (cls.s1, cls.s2, cls.p1, cls.p2)
+        ]
+        for process in cls.processes:
+            process.start()
 
-    def tearDown(self):
-        self.s1.stop()
-        self.s2.stop()
-        self.process1.terminate()
-        self.process2.terminate()
+    @classmethod
+    def tearDownClass(cls):
+        for service in (cls.s1, cls.s2, cls.p1, cls.p2):
+            service.stop()
+        for process in cls.processes:
+            process.terminate()
 
     async def test_schedule(self):
         service_builder = ServiceOrchestratorWithYaml(yaml_file_path="megaservice.yaml")
@@ -48,6 +70,28 @@ class TestYAMLOrchestrator(unittest.IsolatedAsyncioTestCase):
         result_dict = service_builder.result_dict
         self.assertEqual(result_dict["s2"]["text"], "Hello, opea project!")
 
+    async def test_schedule_parallel(self):
+        service_builder = ServiceOrchestratorWithYaml(yaml_file_path="megaservice_parallel.yaml")
+        start = time.monotonic()
+        await service_builder.schedule(initial_inputs={"text": "Hello, "})
+        # p1 and p2 take one second each and run at the same time
+        self.assertLess(time.monotonic() - start, 1.8)
+        self.assertEqual(service_builder.result_dict["s2"]["text"], "Hello, opea project!")
+        await service_builder.close()
+
+    async def test_schedule_failure_cancels_siblings(self):
+        service_builder = ServiceOrchestratorWithYaml(yaml_file_path="megaservice_parallel.yaml")
+        service_builder.reset_graph()
+        service_builder._construct_dag_from_rules(["(p1, broken) >> s2"])
+        start = time.monotonic()
+        with self.assertRaises(aiohttp.ClientConnectionError):
+            await service_builder.schedule(initial_inputs={"text": "Hello, "})
+        # p1 is cancelled instead of being waited for
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+        self.assertNotIn("p1", service_builder.result_dict)
+        await service_builder.close()
+
 
 if __name__ == "__main__":
     unittest.main()
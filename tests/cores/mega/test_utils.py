@@ -0,0 +1,39 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import unittest
+
+import numpy as np
+
+from comps.cores.mega.utils import decode_embedding, encode_embedding
+
+
+class TestEmbeddingCodec(unittest.TestCase):
+    def test_base64_roundtrip(self):
+        embedding = [0.1, -0.25, 3.5]
+        encoded = encode_embedding(embedding)
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(decode_embedding(encoded).tolist(), decode_embedding(embedding).tolist())
+
+        # float16 halves the payload
+        encoded16 = encode_embedding(embedding, "float16")
+        self.assertLess(len(encoded16), len(encoded))
+        self.assertEqual(decode_embedding(encoded16, "float16").tolist(), [0.0999755859375, -0.25, 3.5])
+
+    def test_decode_in_place(self):
+        encoded = encode_embedding(np.arange(4, dtype=np.float32))
+        decoded = decode_embedding(encoded)
+        self.assertEqual(decoded.dtype, np.float32)
+        # the vector is a view on the decoded bytes, not a copy
+        self.assertFalse(decoded.flags.owndata)
+        self.assertFalse(decoded.flags.writeable)
+        self.assertEqual(decoded.tolist(), [0.0, 1.0, 2.0, 3.0])
+
+    def test_decode_list(self):
+        decoded = decode_embedding([1, 2])
+        self.assertIsInstance(decoded, np.ndarray)
+        self.assertEqual(decoded.dtype, np.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
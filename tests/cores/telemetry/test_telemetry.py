@@ -7,7 +7,16 @@ import time
 import unittest
 
 os.environ["TELEMETRY_ENDPOINT"] = "http://jaeger:4318/v1/traces"
-from comps.cores.telemetry.opea_telemetry import in_memory_exporter, opea_telemetry
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.sampling import Decision
+
+from comps.cores.telemetry.opea_telemetry import (
+    RateLimitedSampler,
+    RecentSpanExporter,
+    in_memory_exporter,
+    opea_telemetry,
+)
 
 
 @opea_telemetry
@@ -71,5 +80,31 @@ class TestTelemetry(unittest.TestCase):
         in_memory_exporter.clear()
 
 
+class TestSpanBuffer(unittest.TestCase):
+    def test_ring_buffer(self):
+        exporter = RecentSpanExporter(capacity=3)
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer(__name__)
+        for i in range(2):
+            with tracer.start_as_current_span(f"parent{i}"):
+                with tracer.start_as_current_span(f"child{i}"):
+                    pass
+
+        # the oldest span was dropped
+        self.assertEqual([span.name for span in exporter.get_finished_spans()], ["parent0", "child1", "parent1"])
+        traces = exporter.recent_traces(limit=1)
+        self.assertEqual(len(traces), 1)
+        self.assertEqual([span["name"] for span in traces[0]["spans"]], ["parent1", "child1"])
+        self.assertEqual(traces[0]["spans"][1]["parent_id"], traces[0]["spans"][0]["span_id"])
+
+    def test_rate_limited_sampler(self):
+        sampler = RateLimitedSampler(rate=2)
+        decisions = [sampler.should_sample(None, i, "span").decision for i in range(5)]
+        self.assertEqual(decisions.count(Decision.RECORD_AND_SAMPLE), 2)
+        time.sleep(0.5)
+        self.assertEqual(sampler.should_sample(None, 5, "span").decision, Decision.RECORD_AND_SAMPLE)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,180 @@
+# Copyright (C) 2024 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import base64
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from comps.cores.mega.cache import EmbeddingCache
+from comps.cores.proto.api_protocol import EmbeddingRequest
+from comps.embeddings.src.integrations.tei import OpeaTEIEmbedding, split_batches
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+async def fake_tei(path, json, headers, **kwargs):
+    """Embed each text as [its length, its position in the call], like TEI /v1/embeddings."""
+    data = []
+    for i, text in enumerate(json["input"]):
+        vector = np.array([len(text), i], dtype=np.float32)
+        embedding = (
+            base64.b64encode(vector.tobytes()).decode() if json["encoding_format"] == "base64" else vector.tolist()
+        )
+        data.append({"index": i, "object": "embedding", "embedding": embedding})
+    usage = {"prompt_tokens": len(json["input"]), "total_tokens": len(json["input"])}
+    return FakeResponse({"object": "list", "model": "tei", "data": data, "usage": usage})
+
+
+class TestSplitBatches(unittest.TestCase):
+    def test_split_on_inputs(self):
+        with mock.patch("comps.embeddings.src.integrations.tei.TEI_EMBEDDING_BATCH_MAX_INPUTS", 2):
+            self.assertEqual(split_batches(["a"] * 5), [(0, 2), (2, 4), (4, 5)])
+
+    def test_split_on_tokens(self):
+        # 8 characters are estimated to 4 tokens
+        with mock.patch("comps.embeddings.src.integrations.tei.TEI_EMBEDDING_BATCH_MAX_TOKENS", 10):
+            self.assertEqual(split_batches(["a" * 8] * 3), [(0, 2), (2, 3)])
+            # a text over the budget is sent alone
+            self.assertEqual(split_batches(["a", "a" * 100, "a"]), [(0, 1), (1, 2), (2, 3)])
+
+    def test_split_empty(self):
+        self.assertEqual(split_batches([]), [])
+
+
+class TestOpeaTEIEmbedding(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.component = OpeaTEIEmbedding("OPEA_TEI_EMBEDDING", "TEI embedding")
+        self.component.cache = None
+        self.component.client = mock.Mock()
+        self.component.client.post = mock.AsyncMock(side_effect=fake_tei)
+
+    def sent_inputs(self):
+        return [call.kwargs["json"]["input"] for call in self.component.client.post.call_args_list]
+
+    async def test_invoke_batch_coalesces_by_parameters(self):
+        results = await self.component.invoke_batch(
+            [
+                EmbeddingRequest(input="a"),
+                EmbeddingRequest(input="bb", encoding_format="base64"),
+                EmbeddingRequest(input=["ccc", "dddd"]),
+            ]
+        )
+        # the requests with the same parameters share one TEI call
+        self.assertEqual(sorted(self.sent_inputs()), [["a", "ccc", "dddd"], ["bb"]])
+
+        # the embeddings are scattered back to their requests, indexed from 0
+        self.assertEqual([item.embedding for item in results[0].data], [[1.0, 0.0]])
+        self.assertEqual([item.index for item in results[2].data], [0, 1])
+        self.assertEqual([item.embedding for item in results[2].data], [[3.0, 1.0], [4.0, 2.0]])
+        vector = np.frombuffer(base64.b64decode(results[1].data[0].embedding), dtype=np.float32)
+        self.assertEqual(vector.tolist(), [2.0, 0.0])
+
+        # the usage of a shared call can not be split
+        self.assertIsNone(results[0].usage)
+        self.assertIsNone(results[2].usage)
+        self.assertEqual(results[1].usage.prompt_tokens, 1)
+
+    async def test_invoke_batch_splits_on_limits(self):
+        with mock.patch("comps.embeddings.src.integrations.tei.TEI_EMBEDDING_BATCH_MAX_INPUTS", 2):
+            results = await self.component.invoke_batch([EmbeddingRequest(input=text) for text in ("a", "b", "c")])
+        self.assertEqual(self.sent_inputs(), [["a", "b"], ["c"]])
+        self.assertEqual([result.data[0].embedding for result in results], [[1.0, 0.0], [1.0, 1.0], [1.0, 0.0]])
+
+    async def test_invoke_batch_returns_exceptions(self):
+        async def failing_tei(path, json, headers, **kwargs):
+            if "boom" in json["input"]:
+                raise RuntimeError("TEI failed")
+            return await fake_tei(path, json, headers)
+
+        self.component.client.post.side_effect = failing_tei
+        results = await self.component.invoke_batch(
+            [
+                EmbeddingRequest(input=[1, 2, 3]),
+                EmbeddingRequest(input="a"),
+                EmbeddingRequest(input="boom", model="other"),
+            ]
+        )
+        # an invalid request and a failed TEI call only fail their own requests
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(results[1].data[0].embedding, [1.0, 0.0])
+        self.assertIsInstance(results[2], RuntimeError)
+
+    async def test_invoke_sends_sub_batches_concurrently(self):
+        running, max_running = 0, 0
+
+        async def slow_tei(path, json, headers, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            # the later sub-batches answer first
+            await asyncio.sleep(0.05 / len(json["input"][0]))
+            running -= 1
+            return await fake_tei(path, json, headers)
+
+        self.component.client.post.side_effect = slow_tei
+        texts = ["a" * n for n in range(1, 8)]
+        with mock.patch("comps.embeddings.src.integrations.tei.TEI_EMBEDDING_BATCH_MAX_INPUTS", 2), mock.patch(
+            "comps.embeddings.src.integrations.tei.TEI_EMBEDDING_MAX_CONCURRENT_BATCHES", 2
+        ):
+            response = await self.component.invoke(EmbeddingRequest(input=texts))
+
+        self.assertEqual(self.sent_inputs(), [texts[0:2], texts[2:4], texts[4:6], texts[6:7]])
+        self.assertEqual(max_running, 2)
+        # reassembled in order, with the usage of every sub-batch
+        self.assertEqual([item.index for item in response.data], list(range(7)))
+        self.assertEqual([item.embedding[0] for item in response.data], [float(n) for n in range(1, 8)])
+        self.assertEqual(response.usage.prompt_tokens, 7)
+        self.assertEqual(response.usage.total_tokens, 7)
+
+    async def test_invoke_empty_input(self):
+        response = await self.component.invoke(EmbeddingRequest(input=[]))
+        self.component.client.post.assert_not_called()
+        self.assertEqual(response.data, [])
+
+    async def test_invoke_embeds_cache_misses_only(self):
+        self.component.cache = EmbeddingCache("test_tei_embedding", max_bytes=1024 * 1024)
+
+        response = await self.component.invoke(EmbeddingRequest(input=["a", "bb", "a"]))
+        # the repeated text is embedded once, as raw float32 vectors to cache
+        self.assertEqual(self.sent_inputs(), [["a", "bb"]])
+        self.assertEqual(self.component.client.post.call_args.kwargs["json"]["encoding_format"], "base64")
+        # and returned as requested
+        self.assertEqual([item.embedding for item in response.data], [[1.0, 0.0], [2.0, 1.0], [1.0, 0.0]])
+        self.assertEqual(response.usage.prompt_tokens, 2)
+
+        self.component.client.post.reset_mock()
+        response = await self.component.invoke(
+            EmbeddingRequest(input=["bb", "ccc"], encoding_format="base64", embedding_dtype="float16")
+        )
+        # only the text missing from the cache is sent
+        self.assertEqual(self.sent_inputs(), [["ccc"]])
+        self.assertEqual(response.embedding_dtype, "float16")
+        vectors = [np.frombuffer(base64.b64decode(item.embedding), dtype=np.float16) for item in response.data]
+        self.assertEqual([vector.tolist() for vector in vectors], [[2.0, 1.0], [3.0, 0.0]])
+
+        self.component.client.post.reset_mock()
+        await self.component.invoke(EmbeddingRequest(input="bb", model="other"))
+        # the texts are cached by model
+        self.assertEqual(self.sent_inputs(), [["bb"]])
+
+        self.component.client.post.reset_mock()
+        response = await self.component.invoke(EmbeddingRequest(input="ccc"))
+        self.component.client.post.assert_not_called()
+        self.assertEqual(response.data[0].embedding, [3.0, 0.0])
+        self.assertEqual(response.usage.prompt_tokens, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()